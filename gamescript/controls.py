@@ -4,6 +4,7 @@ import pygame
 import json
 import os
 from .debug_utils import debugger   # Importar el módulo de depuración
+from .core.inputs import INPUT_ACTIONS, INPUT_HARD_DROP
 
 # Ruta al archivo de configuración de teclas
 KEYBINDINGS_FILE = "keybindings.json"
@@ -73,6 +74,9 @@ def get_default_keybindings():
                 {"key": "K_UP", "description": "Flecha arriba"},
                 {"key": "K_w", "description": "Tecla W"}
             ],
+            "rotate_180": [
+                {"key": "K_v", "description": "Tecla V"}
+            ],
             "soft_drop": [
                 {"key": "K_DOWN", "description": "Flecha abajo"},
                 {"key": "K_s", "description": "Tecla S"}
@@ -440,6 +444,72 @@ def get_gamepad_input_state(gamepad_idx, input_type, input_idx):
     
     return False if input_type == 'button' else 0.0
 
+# Botones de juego como bits INPUT_* (para grabar repeticiones)
+def get_held_inputs(keybindings=None):
+    """
+    Acciones de juego que se mantienen pulsadas ahora en el teclado o en un gamepad.
+    
+    Args:
+        keybindings (dict, optional): Configuración de teclas personalizada
+        
+    Returns:
+        int: Bits INPUT_* (ver core/inputs.py)
+    """
+    if keybindings is None:
+        keybindings = load_keybindings()
+    
+    pressed = pygame.key.get_pressed()
+    inputs = 0
+    for action, bit in INPUT_ACTIONS.items():
+        for binding in keybindings["keyboard"].get(action, ()):
+            pygame_key = key_string_to_pygame_key(binding["key"])
+            if pygame_key is not None and pressed[pygame_key]:
+                inputs |= bit
+                break
+        else:
+            # Se lee el estado directamente: check_gamepad_action descarta repeticiones
+            # por tiempo y consultarlo aquí se comería pulsaciones del juego
+            for binding in keybindings.get("gamepad", {}).get(action, ()):
+                if any(_gamepad_binding_held(index, binding) for index in range(len(gamepads))):
+                    inputs |= bit
+                    break
+    return inputs
+
+def _gamepad_binding_held(gamepad_idx, binding):
+    button_type = binding.get("button_type")
+    if button_type == "button" and "button" in binding:
+        return bool(get_gamepad_input_state(gamepad_idx, 'button', binding["button"]))
+    if button_type == "axis" and "axis" in binding and "value" in binding:
+        value = get_gamepad_input_state(gamepad_idx, 'axis', binding["axis"])
+        return value <= binding["value"] if binding["value"] < 0 else value >= binding["value"]
+    return False
+
+def get_event_inputs(event, keybindings=None):
+    """
+    Acciones de juego que activa un evento de teclado. Sirve para no perder las
+    pulsaciones que se sueltan antes del siguiente frame.
+    
+    Args:
+        event: Evento de pygame
+        keybindings (dict, optional): Configuración de teclas personalizada
+        
+    Returns:
+        int: Bits INPUT_* (ver core/inputs.py)
+    """
+    if event.type != pygame.KEYDOWN:
+        return 0
+    if keybindings is None:
+        keybindings = load_keybindings()
+    
+    inputs = 0
+    for action, bit in INPUT_ACTIONS.items():
+        if is_key_action(event, action, keybindings):
+            inputs |= bit
+    # El hard drop con Espacio se atiende en game.py aunque no esté en la configuración
+    if event.key == pygame.K_SPACE:
+        inputs |= INPUT_HARD_DROP
+    return inputs
+
 # Funciones auxiliares para el menú de opciones
 def handle_options_left_input(selected, options, current_res_index, resolution_keys, settings, sfx_cursor):
     """
@@ -501,6 +571,9 @@ def handle_options_confirm(selected, options, settings, sfx_enter, sfx_back):
         # Actualizar inmediatamente el volumen de los SFX
         sfx_vol = 0 if settings['mute'] else (settings['volume_general'] * settings['volume_sfx'])
         sfx_enter.set_volume(sfx_vol)
+    elif options[selected] == "Pista":
+        sfx_enter.play()
+        settings['show_hint'] = not settings.get('show_hint', False)
     elif options[selected] == "Controles":
         sfx_enter.play()
         # El menú de controles se maneja en options.py ahora
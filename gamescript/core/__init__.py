@@ -0,0 +1,26 @@
+# core
+# Núcleo del juego sin pygame: reglas, piezas, relojes y modos de juego.
+# Puede importarse desde procesos de simulación sin cargar gráficos ni audio.
+
+from .actions import (
+    ACTION_LEFT, ACTION_RIGHT, ACTION_SOFT_DROP, ACTION_ROTATE_CW, ACTION_ROTATE_CCW,
+    ACTION_ROTATE_180, ACTION_HOLD, ACTION_HARD_DROP, ACTION_SONIC_DROP, ACTION_LOCK, ACTION_PLACE,
+    EVENT_LINES_CLEARED, EVENT_TSPIN, EVENT_PERFECT_CLEAR, EVENT_LEVEL_UP,
+    EVENT_GAME_OVER, EVENT_INVALID_PLACEMENT, TSPIN_NONE, TSPIN_MINI, TSPIN_FULL,
+)
+from .ai import HeuristicPlayer, HeuristicWeights, DEFAULT_WEIGHTS, play_headless
+from .clock import RealClock, ManualClock, FrameClock
+from .engine import TetrisGame, FIELD_ENGINES
+from .inputs import (
+    FPS, INPUT_ACTIONS, INPUT_LEFT, INPUT_RIGHT, INPUT_SOFT_DROP, INPUT_HARD_DROP,
+    INPUT_ROTATE_CW, INPUT_ROTATE_CCW, INPUT_ROTATE_180, INPUT_HOLD,
+)
+from .modes import ClassicMode, TimeAttackMode, MarathonMode, UltraMode, AIMode, create_game_mode
+from .movegen import Placement, generate_placements, generate_positions, clear_placement_cache
+from .pieces import COLORS, SHAPES, PIECE_GEOMETRY, PieceGeometry, TSPIN_CORNERS, spawn_column
+from .zobrist import ZobristKeys, get_zobrist_keys
+from .search import (
+    BeamSearchPlayer, SearchWorker, ProcessSearchWorker, IN_GAME_TIME_BUDGET, HINT_TIME_BUDGET,
+)
+from .pc import PerfectClearSolver, PC_MAX_HEIGHT, PC_TIME_BUDGET
+from .rotation import RotationSystem, ROTATION_SYSTEMS, get_rotation_system, register_rotation_system
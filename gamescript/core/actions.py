@@ -0,0 +1,34 @@
+# actions.py
+# Acciones de alto nivel y eventos para aplicar jugadas en bloque (TetrisGame.apply_many)
+
+# Acciones simples: un entero por acción
+ACTION_LEFT = 0
+ACTION_RIGHT = 1
+ACTION_SOFT_DROP = 2  # Baja una celda (puntúa como caída suave)
+ACTION_ROTATE_CW = 3
+ACTION_ROTATE_CCW = 4
+ACTION_ROTATE_180 = 5
+ACTION_HOLD = 6
+ACTION_HARD_DROP = 7
+ACTION_SONIC_DROP = 9  # Baja la pieza hasta apoyarla sin fijarla (puntúa como caída suave)
+ACTION_LOCK = 10  # Fija la pieza donde está apoyada, como al agotarse el retardo de bloqueo
+
+# Acción con argumentos: (ACTION_PLACE, x, rotación) coloca la pieza en esa columna y
+# rotación y la deja caer; (ACTION_PLACE, x, rotación, y) parte de la fila indicada
+ACTION_PLACE = 8
+
+# Tipos de evento. Cada evento es una tupla (índice_de_acción, tipo, valor)
+EVENT_LINES_CLEARED = 0  # valor: número de líneas
+EVENT_TSPIN = 1  # valor: TSPIN_MINI o TSPIN_FULL
+EVENT_PERFECT_CLEAR = 2  # valor: número de líneas
+EVENT_LEVEL_UP = 3  # valor: nuevo nivel
+EVENT_GAME_OVER = 4  # valor: 0
+EVENT_INVALID_PLACEMENT = 5  # valor: la acción rechazada
+
+# Tipos de T-spin en los eventos
+TSPIN_NONE = 0
+TSPIN_MINI = 1
+TSPIN_FULL = 2
+
+# Conversión desde el resultado de TetrisGame.is_tspin()
+TSPIN_KINDS = {False: TSPIN_NONE, "T-spin mini": TSPIN_MINI, "T-spin": TSPIN_FULL}
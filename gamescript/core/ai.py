@@ -0,0 +1,275 @@
+# ai.py
+# Jugador automático: puntúa con pesos cada colocación alcanzable y elige la mejor
+
+from collections import namedtuple
+
+from .actions import ACTION_HOLD
+from .movegen import generate_placements
+from .pieces import PIECE_GEOMETRY
+
+# Pesos del evaluador. Cada característica del tablero resultante se multiplica por
+# su peso y se suman; gana la colocación con la puntuación más alta.
+# - height: suma de las alturas de las columnas
+# - holes: celdas vacías con algún bloque encima
+# - bumpiness: suma de las diferencias de altura entre columnas vecinas
+# - wells: profundidad de los pozos (1 + 2 + ... + profundidad por pozo)
+# - lines: líneas eliminadas por la colocación
+# - tspin_slots: huecos con forma de T listos para un T-spin doble
+# - tspin_clear: bonificación por línea eliminada con un T-spin
+HeuristicWeights = namedtuple(
+    "HeuristicWeights",
+    ["height", "holes", "bumpiness", "wells", "lines", "tspin_slots", "tspin_clear"]
+)
+
+DEFAULT_WEIGHTS = HeuristicWeights(
+    height=-0.51,
+    holes=-3.6,
+    bumpiness=-0.18,
+    wells=-0.1,
+    lines=0.76,
+    tspin_slots=0.9,
+    tspin_clear=1.5,
+)
+
+# Ritmo simulado de las partidas sin interfaz: unas 2 piezas por segundo, como un
+# jugador humano rápido. Con el reloj parado no caducan los combos ni terminan los
+# modos con tiempo.
+DEFAULT_MS_PER_PIECE = 500
+
+
+class HeuristicPlayer:
+    """
+    Jugador que evalúa todas las colocaciones de la pieza actual (y de la de hold).
+
+    No guarda estado entre jugadas, así que una misma instancia puede compartirse
+    entre partidas. Trabaja sobre las máscaras de bits de las filas, sin clonar la
+    partida, para decidir en pocos milisegundos incluso en niveles altos.
+
+    Args:
+        weights (HeuristicWeights): Pesos del evaluador (por defecto DEFAULT_WEIGHTS)
+        use_hold (bool): Si también se prueba a cambiar la pieza por la de hold
+        opening_book (OpeningBook): Libro de aperturas que se consulta antes de
+            evaluar (None = sin libro)
+    """
+
+    def __init__(self, weights=None, use_hold=True, opening_book=None):
+        self.weights = weights if weights is not None else DEFAULT_WEIGHTS
+        self.use_hold = use_hold
+        self.opening_book = opening_book
+
+    def choose(self, game):
+        """
+        Elige la colocación para la pieza actual.
+
+        Args:
+            game (TetrisGame): Partida en juego (no se modifica)
+
+        Returns:
+            Placement: La mejor colocación, con el camino de acciones para llegar a ella
+                (empieza por ACTION_HOLD si conviene cambiar de pieza), o None si la
+                pieza no puede colocarse
+        """
+        if self.opening_book is not None:
+            placement = self.opening_book.lookup(game, use_hold=self.use_hold)
+            if placement is not None:
+                return placement
+        best = None
+        for entry in self.score_placements(game):
+            if best is None or entry[0] > best[0]:
+                best = entry
+        if best is None:
+            return None
+        return with_hold(best[2]) if best[3] else best[2]
+
+    def score_placements(self, game):
+        """
+        Puntúa todas las colocaciones de la pieza actual y, si se usa hold, las de la
+        pieza que saldría al cambiarla.
+
+        Args:
+            game (TetrisGame): Partida en juego (no se modifica)
+
+        Returns:
+            list: Tuplas (puntuación, bonificación_por_líneas, Placement, usa_hold). La
+                bonificación es la parte de la puntuación que aportan las líneas eliminadas;
+                si usa_hold es True el camino del Placement empieza en la posición de
+                aparición de la pieza de hold (ver with_hold())
+        """
+        if game.use_bitboard:
+            rows = game.field_rows
+        else:
+            rows = [sum(1 << x for x, cell in enumerate(row) if cell != 0) for row in game.field]
+
+        scored = self._score(generate_placements(game), game.piece_type, rows, game.width, False)
+
+        if self.use_hold and not game.hold_used:
+            hold_type = game.hold_piece_type
+            if hold_type is None:
+                hold_type = game.next_pieces[0]
+            if hold_type != game.piece_type:
+                scored.extend(self._score(
+                    _placements_after_hold(game, hold_type), hold_type, rows, game.width, True))
+        return scored
+
+    def _score(self, placements, piece_type, rows, width, uses_hold):
+        scored = []
+        evaluate = self.evaluate
+        clear_bonus = self.clear_bonus
+        geometries = PIECE_GEOMETRY[piece_type]
+        full_row_mask = (1 << width) - 1
+        for placement in placements:
+            geometry = geometries[placement.rotation]
+            if placement.y + geometry.min_row < 0:
+                continue  # Quedaría fuera del tablero: fin de la partida
+            board = list(rows)
+            shift = placement.x + geometry.min_col
+            cleared = 0
+            for row, mask in geometry.row_masks:
+                y = placement.y + row
+                bits = board[y] | (mask << shift)
+                board[y] = bits
+                if bits == full_row_mask:
+                    cleared += 1
+            if cleared:
+                remaining = [bits for bits in board if bits != full_row_mask]
+                board = [0] * cleared + remaining
+            scored.append((
+                evaluate(board, width, cleared, placement.spin),
+                clear_bonus(cleared, placement.spin) if cleared else 0.0,
+                placement,
+                uses_hold,
+            ))
+        return scored
+
+    def clear_bonus(self, lines, spin=0):
+        """Parte de la puntuación que aportan las líneas eliminadas (y el T-spin)"""
+        weights = self.weights
+        bonus = weights.lines * lines
+        if spin and lines:
+            bonus += weights.tspin_clear * lines
+        return bonus
+
+    def evaluate(self, board, width, lines=0, spin=0):
+        """
+        Puntúa un tablero ya con la pieza fijada y las líneas eliminadas.
+
+        Args:
+            board (list): Máscara de bits de cada fila (bit x = columna x)
+            width (int): Ancho del tablero
+            lines (int): Líneas eliminadas por la colocación
+            spin (int): TSPIN_NONE, TSPIN_MINI o TSPIN_FULL
+
+        Returns:
+            float: Puntuación (más alta es mejor)
+        """
+        weights = self.weights
+        height = len(board)
+        top = 0
+        while top < height and not board[top]:
+            top += 1
+
+        # Alturas y agujeros en una pasada de arriba abajo: covered acumula las
+        # columnas que ya tienen un bloque por encima de la fila actual
+        heights = [0] * width
+        covered = 0
+        holes = 0
+        for y in range(top, height):
+            bits = board[y]
+            new = bits & ~covered
+            while new:
+                lowest = new & -new
+                heights[lowest.bit_length() - 1] = height - y
+                new ^= lowest
+            holes += bin(covered & ~bits).count("1")
+            covered |= bits
+
+        bumpiness = 0
+        wells = 0
+        previous = height  # Las paredes cuentan como columnas llenas
+        for x in range(width):
+            current = heights[x]
+            following = heights[x + 1] if x + 1 < width else height
+            if x:
+                bumpiness += abs(current - previous)
+            depth = (previous if previous < following else following) - current
+            if depth > 0:
+                wells += depth * (depth + 1) // 2
+            previous = current
+
+        # Huecos para T-spin: tres celdas libres en una fila, debajo solo la central
+        # libre con bloques a ambos lados, y un saliente encima de uno de los lados
+        tspin_slots = 0
+        inner = ((1 << width) - 1) & ~1 & ~(1 << (width - 1))
+        for y in range(max(top, 1), height - 1):
+            above = board[y - 1]
+            row = board[y]
+            below = board[y + 1]
+            slots = (~(row | (row << 1) | (row >> 1)) & inner
+                     & ~below & (below << 1) & (below >> 1)
+                     & ((above << 1) | (above >> 1)) & ~above)
+            if slots:
+                tspin_slots += bin(slots).count("1")
+
+        score = (weights.height * sum(heights)
+                 + weights.holes * holes
+                 + weights.bumpiness * bumpiness
+                 + weights.wells * wells
+                 + weights.tspin_slots * tspin_slots)
+        if lines:
+            score += self.clear_bonus(lines, spin)
+        return score
+
+
+def with_hold(placement):
+    """Placement con ACTION_HOLD al principio del camino"""
+    return placement._replace(path=(ACTION_HOLD,) + placement.path)
+
+
+def _placements_after_hold(game, piece_type):
+    """Colocaciones de piece_type saliendo desde su posición de aparición"""
+    saved = (game.piece_type, game.piece_x, game.piece_y, game.rotation)
+    game.piece_type = piece_type
+    game.piece_x = game.spawn_columns[piece_type]
+    game.piece_y = 0
+    game.rotation = 0
+    try:
+        return generate_placements(game)
+    finally:
+        game.piece_type, game.piece_x, game.piece_y, game.rotation = saved
+
+
+def play_headless(game, player=None, max_pieces=None, ms_per_piece=0, recorder=None):
+    """
+    Juega una partida completa sin interfaz (kioscos, pruebas de carga, simulaciones).
+
+    Args:
+        game (TetrisGame): Partida a jugar; conviene usar un ManualClock para no esperar
+        player (HeuristicPlayer): Jugador automático (por defecto uno con los pesos estándar)
+        max_pieces (int): Número máximo de piezas a colocar (None = hasta perder)
+        ms_per_piece (float): Milisegundos simulados por pieza: avanzan el reloj (que
+            debe tener advance(), como ManualClock) para que corran los combos y los
+            modos con tiempo (DEFAULT_MS_PER_PIECE es un ritmo realista); 0 deja
+            el reloj parado
+        recorder (PlacementRecorder): Si se indica, guarda cada decisión (ver core/dataset.py)
+
+    Returns:
+        int: Número de piezas colocadas
+    """
+    if player is None:
+        player = HeuristicPlayer()
+    pieces = 0
+    while not game.game_over and (max_pieces is None or pieces < max_pieces):
+        if recorder is not None:
+            recorder.observe(game)
+        placement = player.choose(game)
+        if placement is None:
+            game.game_over = True
+            break
+        game.apply_many(placement.path)
+        pieces += 1
+        if ms_per_piece:
+            game.clock.advance(ms_per_piece)
+            game.update()
+    if recorder is not None:
+        recorder.finish(game)
+    return pieces
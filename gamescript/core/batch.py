@@ -0,0 +1,412 @@
+# batch.py
+# Simulador por lotes con NumPy: muchas partidas avanzando a la vez con operaciones vectoriales
+#
+# Requiere numpy (dependencia opcional: el juego y el resto del núcleo no la usan).
+
+import numpy as np
+
+from .ai import DEFAULT_WEIGHTS
+from .engine import LINE_CLEAR_POINTS
+from .log import debugger
+from .pieces import PIECE_GEOMETRY, spawn_column
+from .randomizer import NUM_PIECES
+
+BATCH_RANDOMIZERS = ("7bag", "random")
+
+# Cada fila es una máscara de 16 bits (bit x = columna x)
+ROW_DTYPE = np.uint16
+
+# Valor de landing_rows() para las colocaciones no válidas. La fila de una colocación
+# válida puede ser negativa si las filas de arriba de la matriz de la pieza están vacías
+NO_LANDING = -(1 << 30)
+
+
+def _compile_tables(width):
+    """
+    Pasa PIECE_GEOMETRY a arrays indexados por [pieza, rotación, k].
+
+    Las piezas tienen como mucho 4 columnas y 4 filas ocupadas; las entradas que
+    sobran se marcan como no válidas (y sus valores no afectan a los cálculos).
+    """
+    shape = (NUM_PIECES, 4, 4)
+    tables = {
+        "col_offset": np.zeros(shape, np.int64),
+        "col_top": np.zeros(shape, np.int64),
+        "col_bottom": np.zeros(shape, np.int64),
+        "col_valid": np.zeros(shape, bool),
+        "row_offset": np.zeros(shape, np.int64),
+        "row_mask": np.zeros(shape, np.int64),
+        "min_col": np.zeros(shape[:2], np.int64),
+        "max_col": np.zeros(shape[:2], np.int64),
+        "min_row": np.zeros(shape[:2], np.int64),
+    }
+    for piece_type, rotations in enumerate(PIECE_GEOMETRY):
+        for rotation, geometry in enumerate(rotations):
+            tables["min_col"][piece_type, rotation] = geometry.min_col
+            tables["max_col"][piece_type, rotation] = geometry.max_col
+            tables["min_row"][piece_type, rotation] = geometry.min_row
+            for k, (col, bottom) in enumerate(geometry.column_bottoms):
+                tables["col_offset"][piece_type, rotation, k] = col
+                tables["col_top"][piece_type, rotation, k] = min(
+                    row for cell_col, row, _ in geometry.cells if cell_col == col)
+                tables["col_bottom"][piece_type, rotation, k] = bottom
+                tables["col_valid"][piece_type, rotation, k] = True
+            for k, (row, mask) in enumerate(geometry.row_masks):
+                tables["row_offset"][piece_type, rotation, k] = row
+                tables["row_mask"][piece_type, rotation, k] = mask
+    # Colocaciones distintas de cada pieza: (x, rotación) dentro del tablero, sin
+    # repetir rotaciones que ocupan las mismas celdas (O, y las parejas de I, S y Z)
+    candidates = []
+    for rotations in PIECE_GEOMETRY:
+        seen = set()
+        piece_candidates = []
+        for rotation, geometry in enumerate(rotations):
+            for x in range(-geometry.min_col, width - geometry.max_col):
+                cells = frozenset(
+                    (x + col, row - geometry.min_row) for col, row, _ in geometry.cells)
+                if cells not in seen:
+                    seen.add(cells)
+                    piece_candidates.append((x, rotation))
+        candidates.append(np.array(piece_candidates, np.int64))
+    tables["candidates"] = candidates
+    return tables
+
+
+class BatchGame:
+    """
+    N partidas simuladas a la vez sobre un array de máscaras de bits (N, alto).
+
+    Cada paso coloca una pieza en cada partida viva: la pieza cae en vertical desde
+    la fila 0 en la columna y rotación indicadas (como ACTION_PLACE en
+    TetrisGame.apply_many) y se fija, se eliminan las líneas y sale la siguiente
+    pieza de la cola. La puntuación sigue las reglas de TetrisGame con un
+    ManualClock parado: 2 puntos por celda de caída, LINE_CLEAR_POINTS por nivel
+    con el multiplicador de combo (máximo 5x) y un nivel cada 10 líneas.
+
+    No hay hold ni giros con kicks (así que tampoco T-spins): está pensado para
+    evaluar pesos del evaluador en decenas de miles de partidas.
+
+    Args:
+        count (int): Número de partidas
+        width (int): Ancho del tablero (como mucho 16)
+        height (int): Alto del tablero
+        seed (int): Semilla del generador de piezas del lote
+        randomizer (str): '7bag' o 'random'
+        preview_count (int): Piezas visibles en la cola de cada partida
+    """
+
+    def __init__(self, count, width=10, height=20, seed=None, randomizer="7bag", preview_count=3):
+        if width > 16:
+            raise ValueError(f"Ancho no soportado por el simulador por lotes: {width}")
+        if randomizer not in BATCH_RANDOMIZERS:
+            debugger.warning(f"Generador de piezas desconocido: {randomizer}. Usando 7bag.")
+            randomizer = "7bag"
+        self.count = count
+        self.width = width
+        self.height = height
+        self.randomizer_type = randomizer
+        self.full_row_mask = (1 << width) - 1
+        self.tables = _compile_tables(width)
+        self.spawn_columns = np.array(
+            [spawn_column(piece_type, width) for piece_type in range(NUM_PIECES)], np.int64)
+        # Número de bits activos de cada máscara de fila
+        self.popcount = np.array([bin(bits).count("1") for bits in range(1 << width)], np.int64)
+        self.rng = np.random.default_rng(seed)
+
+        self.rows = np.zeros((count, height), ROW_DTYPE)
+        self.score = np.zeros(count, np.int64)
+        self.level = np.ones(count, np.int64)
+        self.lines_cleared = np.zeros(count, np.int64)
+        self.combo_count = np.zeros(count, np.int64)
+        self.pieces_placed = np.zeros(count, np.int64)
+        self.game_over = np.zeros(count, bool)
+
+        self._bags = np.zeros((count, NUM_PIECES), np.int64)
+        self._bag_index = np.full(count, NUM_PIECES, np.int64)
+        everyone = np.arange(count)
+        self.piece_type = self._draw(everyone)
+        self.next_pieces = np.stack(
+            [self._draw(everyone) for _ in range(max(1, preview_count))], axis=1)
+
+    def reset_boards(self, boards):
+        """
+        Empieza partidas nuevas en las posiciones indicadas.
+
+        Args:
+            boards (ndarray): Índices de las partidas a reiniciar
+        """
+        boards = np.asarray(boards, np.int64)
+        self.rows[boards] = 0
+        self.score[boards] = 0
+        self.level[boards] = 1
+        self.lines_cleared[boards] = 0
+        self.combo_count[boards] = 0
+        self.pieces_placed[boards] = 0
+        self.game_over[boards] = False
+        self._bag_index[boards] = NUM_PIECES  # Bolsa nueva
+        self.piece_type[boards] = self._draw(boards)
+        for slot in range(self.next_pieces.shape[1]):
+            self.next_pieces[boards, slot] = self._draw(boards)
+
+    def _draw(self, boards):
+        """Saca la siguiente pieza del generador de cada partida de boards"""
+        if self.randomizer_type == "random":
+            return self.rng.integers(0, NUM_PIECES, len(boards))
+        empty = boards[self._bag_index[boards] >= NUM_PIECES]
+        if len(empty):
+            self._bags[empty] = np.argsort(self.rng.random((len(empty), NUM_PIECES)), axis=1)
+            self._bag_index[empty] = 0
+        pieces = self._bags[boards, self._bag_index[boards]]
+        self._bag_index[boards] += 1
+        return pieces
+
+    def column_tops(self, rows=None):
+        """
+        Primera fila ocupada de cada columna (alto si está vacía).
+
+        Args:
+            rows (ndarray): Tableros (M, alto); por defecto los del lote
+
+        Returns:
+            ndarray: Array (M, ancho)
+        """
+        if rows is None:
+            rows = self.rows
+        tops = np.empty((rows.shape[0], self.width), np.int64)
+        for x in range(self.width):
+            occupied = (rows & (1 << x)) != 0
+            tops[:, x] = np.where(occupied.any(axis=1), occupied.argmax(axis=1), self.height)
+        return tops
+
+    def landing_rows(self, piece_type, x, rotation, tops):
+        """
+        Fila en la que queda la pieza al caer en vertical desde la fila 0.
+
+        Returns:
+            ndarray: Fila de aterrizaje (como piece_y), o NO_LANDING si la pieza se sale
+                por los lados o alguna de sus celdas queda por encima del tablero
+        """
+        tables = self.tables
+        in_bounds = ((x + tables["min_col"][piece_type, rotation] >= 0)
+                     & (x + tables["max_col"][piece_type, rotation] < self.width))
+        boards = np.arange(len(x))
+        landing = np.full(len(x), self.height, np.int64)
+        for k in range(4):
+            valid = tables["col_valid"][piece_type, rotation, k]
+            column = np.clip(x + tables["col_offset"][piece_type, rotation, k], 0, self.width - 1)
+            column_landing = tops[boards, column] - 1 - tables["col_bottom"][piece_type, rotation, k]
+            landing = np.where(valid, np.minimum(landing, column_landing), landing)
+        # Como en HeuristicPlayer: fin de la partida solo si alguna celda queda fuera
+        inside = landing + tables["min_row"][piece_type, rotation] >= 0
+        return np.where(in_bounds & inside, landing, NO_LANDING)
+
+    def _lock(self, rows, piece_type, x, rotation, landing):
+        """Fija las piezas en rows (en el sitio) y elimina las líneas; devuelve las líneas de cada tablero"""
+        tables = self.tables
+        boards = np.arange(len(x))
+        shift = x + tables["min_col"][piece_type, rotation]
+        for k in range(4):
+            mask = tables["row_mask"][piece_type, rotation, k]
+            y = landing + tables["row_offset"][piece_type, rotation, k]
+            rows[boards, y] |= (mask << shift).astype(ROW_DTYPE)  # Las entradas no válidas tienen máscara 0
+        full = rows == self.full_row_mask
+        lines = full.sum(axis=1)
+        cleared = np.nonzero(lines)[0]
+        if len(cleared):
+            # Orden estable: primero las filas completas (que se vacían) y después el
+            # resto en su orden original, que así bajan tantas filas como líneas haya debajo
+            order = np.argsort(~full[cleared], axis=1, kind="stable")
+            compacted = np.take_along_axis(rows[cleared], order, axis=1)
+            compacted[np.arange(self.height) < lines[cleared, None]] = 0
+            rows[cleared] = compacted
+        return lines
+
+    def place(self, x, rotation, active=None):
+        """
+        Coloca la pieza actual de cada partida viva en (x, rotación) y la deja caer.
+
+        Las partidas en las que la colocación no es válida terminan (como si la pila
+        hubiese llegado arriba).
+
+        Args:
+            x (ndarray): Columna de cada partida (como piece_x en TetrisGame)
+            rotation (ndarray): Rotación de cada partida
+            active (ndarray): Máscara de las partidas que juegan en este paso (por
+                defecto todas las vivas)
+
+        Returns:
+            ndarray: Líneas eliminadas en cada partida (0 en las terminadas)
+        """
+        lines = np.zeros(self.count, np.int64)
+        playing = ~self.game_over
+        if active is not None:
+            playing &= active
+        alive = np.nonzero(playing)[0]
+        if not len(alive):
+            return lines
+        x = np.asarray(x, np.int64)[alive]
+        rotation = np.asarray(rotation, np.int64)[alive]
+        piece_type = self.piece_type[alive]
+        landing = self.landing_rows(piece_type, x, rotation, self.column_tops(self.rows[alive]))
+        placed = landing != NO_LANDING
+        self.game_over[alive[~placed]] = True
+        alive = alive[placed]
+        if not len(alive):
+            return lines
+
+        rows = self.rows[alive]
+        count = self._lock(rows, piece_type[placed], x[placed], rotation[placed], landing[placed])
+        self.rows[alive] = rows
+        lines[alive] = count
+        self.pieces_placed[alive] += 1
+
+        # Puntuación como en TetrisGame: hard drop, líneas por nivel y combo
+        self.score[alive] += np.maximum(landing[placed], 0) * 2
+        clearing = alive[count > 0]
+        self.combo_count[clearing] += 1
+        points = np.array([LINE_CLEAR_POINTS.get(n, 0) for n in range(5)], np.int64)
+        self.score[clearing] += (points[lines[clearing]] * self.level[clearing]
+                                 * np.minimum(5, self.combo_count[clearing]))
+        self.lines_cleared[clearing] += lines[clearing]
+        self.level[clearing] = np.maximum(self.level[clearing], 1 + self.lines_cleared[clearing] // 10)
+
+        # Siguiente pieza: la primera de la cola, y se repone la cola
+        self.piece_type[alive] = self.next_pieces[alive, 0]
+        self.next_pieces[alive, :-1] = self.next_pieces[alive, 1:]
+        self.next_pieces[alive, -1] = self._draw(alive)
+        self._check_spawn(alive)
+        return lines
+
+    def _check_spawn(self, boards):
+        """Termina las partidas en las que la nueva pieza no cabe en su posición de aparición"""
+        tables = self.tables
+        piece_type = self.piece_type[boards]
+        shift = self.spawn_columns[piece_type] + tables["min_col"][piece_type, 0]
+        blocked = np.zeros(len(boards), bool)
+        for k in range(4):
+            y = tables["row_offset"][piece_type, 0, k]
+            blocked |= (self.rows[boards, y] & (tables["row_mask"][piece_type, 0, k] << shift)) != 0
+        self.game_over[boards[blocked]] = True
+
+    def evaluate(self, rows, lines, weights=DEFAULT_WEIGHTS, tops=None):
+        """
+        Puntúa tableros con los pesos de HeuristicWeights (las mismas características
+        que HeuristicPlayer.evaluate, sin la bonificación de T-spin).
+
+        Args:
+            rows (ndarray): Tableros (M, alto) ya con las líneas eliminadas
+            lines (ndarray): Líneas eliminadas al llegar a cada tablero
+            weights (HeuristicWeights): Pesos del evaluador
+            tops (ndarray): column_tops(rows) si ya se conoce
+
+        Returns:
+            ndarray: Puntuación de cada tablero (float64)
+        """
+        height = self.height
+        popcount = self.popcount
+        full = self.full_row_mask
+        if tops is None:
+            tops = self.column_tops(rows)
+        heights = height - tops
+        covered = np.bitwise_or.accumulate(rows, axis=1)
+
+        # Agujeros: celdas vacías con alguna celda ocupada encima
+        holes = popcount[covered[:, :-1] & ~rows[:, 1:] & full].sum(axis=1)
+
+        bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+        walls = np.full((rows.shape[0], 1), height, np.int64)
+        padded = np.concatenate([walls, heights, walls], axis=1)
+        depth = np.minimum(padded[:, :-2], padded[:, 2:]) - heights
+        depth = np.maximum(depth, 0)
+        wells = (depth * (depth + 1) // 2).sum(axis=1)
+
+        # Huecos para T-spin, con la misma definición que HeuristicPlayer.evaluate
+        above = rows[:, :-2]
+        row = rows[:, 1:-1]
+        below = rows[:, 2:]
+        inner = full & ~1 & ~(1 << (self.width - 1))
+        slots = (~(row | (row << 1) | (row >> 1)) & inner
+                 & ~below & (below << 1) & (below >> 1)
+                 & ((above << 1) | (above >> 1)) & ~above)
+        tspin_slots = popcount[slots & full].sum(axis=1)
+
+        return (weights.height * heights.sum(axis=1)
+                + weights.holes * holes
+                + weights.bumpiness * bumpiness
+                + weights.wells * wells
+                + weights.tspin_slots * tspin_slots
+                + weights.lines * lines)
+
+    def choose_placements(self, weights=DEFAULT_WEIGHTS):
+        """
+        Elige para cada partida la mejor caída vertical (columna y rotación) según los pesos.
+
+        Returns:
+            tuple: Arrays (x, rotación) listos para place()
+        """
+        x = np.zeros(self.count, np.int64)
+        rotation = np.zeros(self.count, np.int64)
+        tops = self.column_tops()
+        for piece_type in range(NUM_PIECES):
+            boards = np.nonzero((self.piece_type == piece_type) & ~self.game_over)[0]
+            if not len(boards):
+                continue
+            candidates = self.tables["candidates"][piece_type]
+            n = len(boards)
+            c = len(candidates)
+            # Todas las colocaciones de todas las partidas del grupo en un solo lote (n * c)
+            board_index = np.repeat(boards, c)
+            candidate_x = np.tile(candidates[:, 0], n)
+            candidate_rotation = np.tile(candidates[:, 1], n)
+            pieces = np.full(n * c, piece_type, np.int64)
+            candidate_tops = tops[board_index]
+            landing = self.landing_rows(pieces, candidate_x, candidate_rotation, candidate_tops)
+            valid = landing != NO_LANDING
+            landing = np.where(valid, landing, 0)
+            rows = self.rows[board_index]
+            lines = self._lock(rows, pieces, candidate_x, candidate_rotation, landing)
+
+            # Alturas tras fijar la pieza: solo cambian sus columnas, salvo si hubo líneas
+            new_tops = self._tops_after_lock(candidate_tops, pieces, candidate_x, candidate_rotation, landing)
+            cleared = np.nonzero(lines)[0]
+            if len(cleared):
+                new_tops[cleared] = self.column_tops(rows[cleared])
+            scores = np.where(valid, self.evaluate(rows, lines, weights, new_tops), -np.inf)
+            best = scores.reshape(n, c).argmax(axis=1)
+            x[boards] = candidates[best, 0]
+            rotation[boards] = candidates[best, 1]
+        return x, rotation
+
+    def _tops_after_lock(self, tops, piece_type, x, rotation, landing):
+        """column_tops tras fijar las piezas, sin contar la eliminación de líneas"""
+        tables = self.tables
+        tops = tops.copy()
+        boards = np.arange(len(x))
+        for k in range(4):
+            valid = tables["col_valid"][piece_type, rotation, k]
+            column = np.clip(x + tables["col_offset"][piece_type, rotation, k], 0, self.width - 1)
+            piece_top = landing + tables["col_top"][piece_type, rotation, k]
+            current = tops[boards, column]
+            tops[boards, column] = np.where(valid, np.minimum(current, piece_top), current)
+        return tops
+
+    def run(self, weights=DEFAULT_WEIGHTS, max_pieces=None):
+        """
+        Juega todas las partidas con choose_placements() hasta que terminen.
+
+        Args:
+            weights (HeuristicWeights): Pesos del evaluador
+            max_pieces (int): Piezas por partida como máximo (None = hasta perder)
+
+        Returns:
+            int: Pasos simulados
+        """
+        steps = 0
+        while not self.game_over.all() and (max_pieces is None or steps < max_pieces):
+            self.place(*self.choose_placements(weights))
+            steps += 1
+        return steps
+
+    def boards(self):
+        """Tableros como array (N, alto, ancho) de uint8 con 1 en las celdas ocupadas"""
+        return ((self.rows[:, :, None] >> np.arange(self.width)) & 1).astype(np.uint8)
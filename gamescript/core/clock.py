@@ -0,0 +1,104 @@
+# clock.py
+# Relojes para la lógica del juego: tiempo real o tiempo simulado
+
+import time
+
+
+class RealClock:
+    """
+    Reloj de tiempo real. Devuelve milisegundos desde su creación,
+    con la misma semántica que pygame.time.get_ticks().
+    """
+    def __init__(self):
+        self._start = time.perf_counter()
+
+    def get_ticks(self):
+        """Milisegundos transcurridos desde que se creó el reloj"""
+        return int((time.perf_counter() - self._start) * 1000)
+
+    def tick(self, fps=60):
+        """El tiempo real avanza solo: no hace nada"""
+        return self.get_ticks()
+
+    def get_state(self):
+        return None
+
+    def set_state(self, state):
+        pass
+
+    def clone(self):
+        """Las copias de una partida en tiempo real comparten el reloj"""
+        return self
+
+
+class ManualClock:
+    """
+    Reloj manual: el tiempo solo avanza cuando se llama a advance() o tick().
+    Permite simular partidas sin esperar al tiempo real (bots, pruebas, balanceo).
+    """
+    def __init__(self, start_ms=0):
+        self._now = float(start_ms)
+
+    def get_ticks(self):
+        """Milisegundos simulados transcurridos"""
+        return int(self._now)
+
+    def advance(self, ms):
+        """
+        Avanza el reloj la cantidad de milisegundos indicada.
+
+        Args:
+            ms (float): Milisegundos a avanzar
+
+        Returns:
+            int: Nuevo valor del reloj en milisegundos
+        """
+        self._now += ms
+        return int(self._now)
+
+    def tick(self, fps=60):
+        """Avanza el reloj la duración de un frame a los FPS indicados"""
+        return self.advance(1000.0 / fps)
+
+    def get_state(self):
+        """Tiempo simulado actual (para guardarlo en las instantáneas de partida)"""
+        return self._now
+
+    def set_state(self, state):
+        self._now = state
+
+    def clone(self):
+        """Copia independiente: cada partida simulada avanza su propio tiempo"""
+        return ManualClock(self._now)
+
+
+class FrameClock:
+    """
+    Reloj por frames: cuenta frames enteros y deriva los milisegundos de ellos.
+
+    Es el reloj pensado para TetrisGame.tick(): como el tiempo es un número entero
+    de frames no se acumulan errores de coma flotante y dos partidas con las mismas
+    entradas dan exactamente el mismo resultado.
+    """
+    def __init__(self, fps=60, start_frame=0):
+        self.fps = fps
+        self.frame = start_frame
+
+    def get_ticks(self):
+        """Milisegundos correspondientes a los frames transcurridos"""
+        return self.frame * 1000 // self.fps
+
+    def tick(self, fps=None):
+        """Avanza un frame (fps se ignora: el reloj usa siempre sus propios FPS)"""
+        self.frame += 1
+        return self.get_ticks()
+
+    def get_state(self):
+        return self.frame
+
+    def set_state(self, state):
+        self.frame = state
+
+    def clone(self):
+        return FrameClock(self.fps, self.frame)
+
@@ -0,0 +1,387 @@
+# dataset.py
+# Exportación de posiciones jugadas a ficheros .npy por bloques, para entrenar modelos
+#
+# Requiere numpy (dependencia opcional: el juego y el resto del núcleo no la usan).
+#
+# Cada fila del conjunto es una decisión: la posición cuando aparece la pieza (tablero,
+# pieza, cola y hold), la colocación elegida y la recompensa (puntos ganados hasta la
+# siguiente decisión). Las filas se escriben en bloques de chunk_size, con un fichero .npy
+# por campo y bloque abierto como memmap, así que ni el escritor ni el lector tienen el
+# conjunto en memoria. index.json guarda las dimensiones y cuántas filas válidas tiene
+# cada bloque (los ficheros se crean con chunk_size filas desde el principio).
+#
+# Estructura:
+#   directorio/index.json
+#   directorio/00000/rows.npy, piece.npy, queue.npy, hold.npy, placement.npy, ...
+#   directorio/00001/...
+
+import json
+import os
+
+import numpy as np
+
+from .randomizer import NUM_PIECES
+
+# Filas por bloque por defecto (unos 4 MB por bloque con el tablero estándar)
+DATASET_CHUNK_SIZE = 65536
+
+DATASET_VERSION = 1
+
+# Campos de cada fila: nombre -> (tipo, forma de una fila); hold vale NUM_PIECES si está
+# vacío y las celdas de la cola que falten también. rows son las máscaras de bits de las
+# filas del tablero (como TetrisGame.field_rows) y placement es (hold, x, y, rotación)
+# con x e y las de piece_x/piece_y al fijarse (como ACTION_PLACE con y).
+DATASET_FIELDS = {
+    "rows": (None, ("height",)),
+    "piece": (np.int8, ()),
+    "queue": (np.int8, ("preview_count",)),
+    "hold": (np.int8, ()),
+    "placement": (np.int8, (4,)),
+    "reward": (np.float32, ()),
+    "episode": (np.int32, ()),
+}
+
+INDEX_FILE = "index.json"
+
+
+def _row_dtype(width):
+    """Tipo entero donde caben las máscaras de bits de una fila"""
+    if width <= 16:
+        return np.uint16
+    if width <= 32:
+        return np.uint32
+    return np.uint64
+
+
+def _field_layout(width, height, preview_count):
+    """Tipo y forma de una fila de cada campo"""
+    sizes = {"height": height, "preview_count": preview_count}
+    layout = {}
+    for name, (dtype, shape) in DATASET_FIELDS.items():
+        layout[name] = (dtype if dtype is not None else _row_dtype(width),
+                        tuple(sizes.get(size, size) for size in shape))
+    return layout
+
+
+def _read_index(directory):
+    with open(os.path.join(directory, INDEX_FILE), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _chunk_path(directory, chunk, name):
+    return os.path.join(directory, f"{chunk:05d}", f"{name}.npy")
+
+
+class DatasetWriter:
+    """
+    Añade filas a un conjunto de datos en disco.
+
+    Si el directorio ya tiene un conjunto se sigue escribiendo a continuación (en el
+    último bloque si no estaba lleno), así que varias sesiones pueden ir ampliando el
+    mismo conjunto. Solo debe haber un escritor por directorio; para escribir desde
+    varios procesos cada uno usa su propio subdirectorio (DatasetReader los une).
+
+    Las filas escritas pasan a formar parte del conjunto al llamar a flush() o close(),
+    y también al completarse cada bloque.
+
+    Args:
+        directory (str): Directorio del conjunto (se crea si no existe)
+        width (int): Ancho del tablero
+        height (int): Alto del tablero
+        preview_count (int): Piezas de la cola que se guardan
+        chunk_size (int): Filas por bloque (solo al crear el conjunto)
+    """
+
+    def __init__(self, directory, width=10, height=20, preview_count=3,
+                 chunk_size=DATASET_CHUNK_SIZE):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(os.path.join(directory, INDEX_FILE)):
+            self.index = _read_index(directory)
+            found = (self.index["width"], self.index["height"], self.index["preview_count"])
+            if found != (width, height, preview_count):
+                raise ValueError(f"El conjunto de {directory} es de {found} "
+                                 f"(ancho, alto, cola), no de {(width, height, preview_count)}")
+        else:
+            self.index = {
+                "version": DATASET_VERSION,
+                "width": width,
+                "height": height,
+                "preview_count": preview_count,
+                "chunk_size": chunk_size,
+                "chunks": [],
+                "episodes": 0,
+            }
+        self.chunk_size = self.index["chunk_size"]
+        self.layout = _field_layout(width, height, preview_count)
+        self._arrays = None
+        self._length = 0
+
+    def __len__(self):
+        chunks = self.index["chunks"]
+        if self._arrays is None:
+            return sum(chunks)
+        return sum(chunks[:-1]) + self._length
+
+    def new_episode(self):
+        """Reserva un identificador de partida para las filas siguientes"""
+        episode = self.index["episodes"]
+        self.index["episodes"] = episode + 1
+        return episode
+
+    def append(self, rows, piece, queue, hold, placement, reward, episode):
+        """
+        Añade una fila.
+
+        Args:
+            rows (sequence): Máscara de bits de cada fila del tablero, de arriba abajo
+            piece (int): Pieza actual
+            queue (sequence): Cola de piezas (preview_count)
+            hold (int): Pieza en hold (NUM_PIECES si está vacío)
+            placement (sequence): (hold, x, y, rotación) de la colocación elegida
+            reward (float): Recompensa de la colocación
+            episode (int): Partida a la que pertenece la fila
+        """
+        if self._arrays is None or self._length == self.chunk_size:
+            self._open_chunk()
+        arrays = self._arrays
+        index = self._length
+        arrays["rows"][index] = rows
+        arrays["piece"][index] = piece
+        arrays["queue"][index] = queue
+        arrays["hold"][index] = hold
+        arrays["placement"][index] = placement
+        arrays["reward"][index] = reward
+        arrays["episode"][index] = episode
+        self._length = index + 1
+
+    def _open_chunk(self):
+        """Abre el bloque donde va la siguiente fila (el último si le queda sitio)"""
+        chunks = self.index["chunks"]
+        if self._arrays is not None:
+            self.flush()  # Bloque lleno: queda cerrado en el índice
+        if chunks and chunks[-1] < self.chunk_size:
+            chunk = len(chunks) - 1
+            mode = "r+"
+        else:
+            chunk = len(chunks)
+            chunks.append(0)
+            os.makedirs(os.path.dirname(_chunk_path(self.directory, chunk, "rows")), exist_ok=True)
+            mode = "w+"
+        self._arrays = {
+            name: np.lib.format.open_memmap(
+                _chunk_path(self.directory, chunk, name), mode=mode, dtype=dtype,
+                shape=(self.chunk_size,) + shape)
+            for name, (dtype, shape) in self.layout.items()
+        }
+        self._length = chunks[-1]
+
+    def flush(self):
+        """Escribe a disco las filas pendientes y actualiza el índice"""
+        if self._arrays is not None:
+            for array in self._arrays.values():
+                array.flush()
+            self.index["chunks"][-1] = self._length
+        # Se escribe aparte y se renombra, para que el índice nunca quede a medias
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(self.index, file)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        """Cierra el conjunto (se puede volver a abrir con otro DatasetWriter)"""
+        if self._arrays is not None or not os.path.exists(os.path.join(self.directory, INDEX_FILE)):
+            self.flush()
+        self._arrays = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DatasetReader:
+    """
+    Lee un conjunto escrito con DatasetWriter sin cargarlo en memoria.
+
+    Si el directorio no tiene index.json se unen todos los conjuntos de sus
+    subdirectorios (por ejemplo, uno por proceso de un torneo), en orden alfabético.
+    Todos deben tener las mismas dimensiones.
+
+    Indexar con un entero, un slice o un array de índices devuelve un dict con un array
+    por campo (solo se leen las filas pedidas); chunks() recorre el conjunto bloque a
+    bloque como vistas sobre los ficheros.
+
+    Args:
+        directory (str): Directorio del conjunto
+    """
+
+    def __init__(self, directory):
+        directories = [directory]
+        if not os.path.exists(os.path.join(directory, INDEX_FILE)):
+            directories = sorted(
+                os.path.join(directory, name) for name in os.listdir(directory)
+                if os.path.exists(os.path.join(directory, name, INDEX_FILE)))
+            if not directories:
+                raise FileNotFoundError(f"No hay ningún conjunto de datos en {directory}")
+
+        self.width = self.height = self.preview_count = None
+        self._chunks = []
+        for path in directories:
+            index = _read_index(path)
+            dimensions = (index["width"], index["height"], index["preview_count"])
+            if self.width is None:
+                self.width, self.height, self.preview_count = dimensions
+                self.layout = _field_layout(*dimensions)
+            elif dimensions != (self.width, self.height, self.preview_count):
+                raise ValueError(f"El conjunto de {path} tiene otras dimensiones: {dimensions}")
+            for chunk, length in enumerate(index["chunks"]):
+                if length:
+                    self._chunks.append({
+                        name: np.load(_chunk_path(path, chunk, name), mmap_mode="r")[:length]
+                        for name in self.layout
+                    })
+        lengths = [len(arrays["piece"]) for arrays in self._chunks]
+        # Primera fila global de cada bloque (y el total al final)
+        self._offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    def chunks(self):
+        """Recorre el conjunto por bloques: dict campo -> array (vista sobre el fichero)"""
+        return iter(self._chunks)
+
+    def __getitem__(self, key):
+        total = len(self)
+        if isinstance(key, slice):
+            start, stop, step = key.indices(total)
+            if step == 1:
+                return self._read_range(start, stop)
+            key = np.arange(start, stop, step)
+        elif np.ndim(key) == 0:
+            index = int(key)
+            if index < 0:
+                index += total
+            if not 0 <= index < total:
+                raise IndexError(f"Índice fuera del conjunto: {key}")
+            return {name: values[0] for name, values in self._read_range(index, index + 1).items()}
+
+        indices = np.asarray(key, dtype=np.int64)
+        indices = np.where(indices < 0, indices + total, indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= total):
+            raise IndexError("Índices fuera del conjunto")
+        chunk_of = np.searchsorted(self._offsets, indices, side="right") - 1
+        result = self._empty(len(indices))
+        for chunk in np.unique(chunk_of):
+            selected = chunk_of == chunk
+            local = indices[selected] - self._offsets[chunk]
+            for name, array in self._chunks[chunk].items():
+                result[name][selected] = array[local]
+        return result
+
+    def _read_range(self, start, stop):
+        """Filas [start, stop) copiadas de los bloques que las contienen"""
+        result = self._empty(max(0, stop - start))
+        if stop <= start:
+            return result
+        first = np.searchsorted(self._offsets, start, side="right") - 1
+        last = np.searchsorted(self._offsets, stop - 1, side="right") - 1
+        for chunk in range(first, last + 1):
+            begin = max(start, self._offsets[chunk])
+            end = min(stop, self._offsets[chunk + 1])
+            local = slice(begin - self._offsets[chunk], end - self._offsets[chunk])
+            target = slice(begin - start, end - start)
+            for name, array in self._chunks[chunk].items():
+                result[name][target] = array[local]
+        return result
+
+    def _empty(self, count):
+        return {name: np.empty((count,) + shape, dtype)
+                for name, (dtype, shape) in self.layout.items()}
+
+    def boards(self, rows):
+        """Convierte máscaras de filas (..., alto) en tableros (..., alto, ancho) de 0 y 1"""
+        rows = np.asarray(rows)
+        return ((rows[..., None] >> np.arange(self.width, dtype=rows.dtype)) & 1).astype(np.uint8)
+
+
+class PlacementRecorder:
+    """
+    Convierte una partida en filas de un DatasetWriter.
+
+    observe() se llama al menos una vez por pieza (en el juego, una vez por frame;
+    con bots, antes de cada decisión): al aparecer una pieza guarda la posición y,
+    cuando la pieza se ha fijado y ya sale la siguiente, escribe la fila con la
+    colocación (TetrisGame.last_lock) y los puntos ganados entre las dos decisiones.
+    Una partida nueva (otro objeto) empieza un episodio nuevo.
+
+    Args:
+        writer (DatasetWriter): Destino de las filas
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self._game = None
+        self._episode = None
+        self._placed = 0
+        self._decision = None
+
+    def observe(self, game):
+        """Registra lo que haya cambiado desde la última llamada"""
+        if game is not self._game:
+            self._game = game
+            self._episode = self.writer.new_episode()
+            self._placed = game.pieces_placed
+            self._decision = None
+
+        if game.pieces_placed != self._placed:
+            if game.animating_clear:
+                return  # Los puntos de las líneas se suman al terminar la animación
+            self._placed = game.pieces_placed
+            if self._decision is not None:
+                self._write(game)
+
+        if self._decision is None and not game.game_over and not game.animating_clear:
+            self._decision = self._capture(game)
+
+    def _capture(self, game):
+        """Posición al aparecer la pieza"""
+        if game.use_bitboard:
+            rows = tuple(game.field_rows)
+        else:
+            rows = tuple(sum(1 << x for x, cell in enumerate(row) if cell != 0) for row in game.field)
+        preview_count = self.writer.index["preview_count"]
+        queue = tuple(game.next_pieces)[:preview_count]
+        queue += (NUM_PIECES,) * (preview_count - len(queue))
+        hold = game.hold_piece_type if game.hold_piece_type is not None else NUM_PIECES
+        return rows, game.piece_type, queue, hold, game.score
+
+    def _write(self, game):
+        rows, piece, queue, hold, score = self._decision
+        _, x, y, rotation, uses_hold, _ = game.last_lock
+        self.writer.append(rows, piece, queue, hold, (int(uses_hold), x, y, rotation),
+                           game.score - score, self._episode)
+        self._decision = None
+
+    def finish(self, game=None):
+        """
+        Cierra la partida: escribe la última colocación si falta y vuelca las filas a disco.
+
+        Args:
+            game (TetrisGame): Partida (por defecto, la última observada)
+        """
+        if game is None:
+            game = self._game
+        if game is not None:
+            self.observe(game)
+        self._decision = None
+        self.writer.flush()
+
+    def close(self):
+        """Termina la partida en curso y cierra el conjunto"""
+        if self._game is not None:
+            self.finish()
+            self._game = None
+        self.writer.close()
@@ -0,0 +1,1228 @@
+# engine.py
+# Motor de reglas del Tetris (sin dependencias de pygame)
+
+import operator
+import random
+from collections import deque
+
+from .actions import (
+    ACTION_SOFT_DROP, ACTION_HARD_DROP, ACTION_SONIC_DROP, ACTION_LOCK, ACTION_PLACE, TSPIN_KINDS,
+    EVENT_LINES_CLEARED, EVENT_TSPIN, EVENT_PERFECT_CLEAR, EVENT_LEVEL_UP,
+    EVENT_GAME_OVER, EVENT_INVALID_PLACEMENT,
+)
+from .clock import RealClock
+from .inputs import (
+    FPS, ms_to_frames, INPUT_LEFT, INPUT_RIGHT, INPUT_SOFT_DROP, INPUT_HARD_DROP,
+    INPUT_ROTATE_CW, INPUT_ROTATE_CCW, INPUT_ROTATE_180, INPUT_HOLD,
+)
+from .log import debugger
+from .pieces import SHAPES, PIECE_GEOMETRY, TSPIN_CORNERS, spawn_column
+from .randomizer import create_randomizer
+from .rotation import get_rotation_system, TURN_CW, TURN_CCW, TURN_180
+from .state import GameSnapshot
+from .zobrist import get_zobrist_keys, POSITION_MARGIN
+
+# Motores de tablero disponibles:
+# - "bitboard": cada fila es un entero con un bit por columna (motor por defecto)
+# - "reference": la implementación original con listas de listas, útil para validar
+FIELD_ENGINES = ("bitboard", "reference")
+
+# Puntos base por número de líneas eliminadas (se multiplican por nivel y combo)
+LINE_CLEAR_POINTS = {1: 40, 2: 100, 3: 300, 4: 1200}
+
+# Tiempos por defecto de la simulación por frames (tick), equivalentes a los de la
+# interfaz: DAS_DELAY y ARR_INTERVAL de controls.py y el retardo de bloqueo de 500 ms
+DAS_FRAMES = ms_to_frames(180)
+ARR_FRAMES = ms_to_frames(50)
+SOFT_DROP_FRAMES = ms_to_frames(50)
+LOCK_DELAY_FRAMES = ms_to_frames(500)
+
+
+class TetrisGame:
+    # Todos los campos del motor se declaran aquí: sin __dict__ cada partida ocupa
+    # menos memoria y el acceso a atributos es más rápido. Los modos de juego
+    # declaran sus propios __slots__ con los campos adicionales que necesitan.
+    __slots__ = (
+        # Configuración
+        "width", "height", "seed", "randomizer_type", "preview_count", "clock",
+        "field_engine", "use_bitboard", "full_row_mask", "spawn_columns",
+        "combo_timeout", "lock_delay_ms", "rotation_system",
+        "das_frames", "arr_frames", "soft_drop_frames", "lock_delay_frames",
+        # Datos del modo de juego
+        "mode_name", "mode_description", "game_over_reason", "game_won", "ai_player",
+        # Tablero
+        "field", "field_rows", "_empty_row", "occupied_cells", "column_tops",
+        "field_version", "_ghost_cache", "zobrist", "field_hash",
+        # Pieza activa, cola y hold
+        "piece_type", "piece_x", "piece_y", "rotation",
+        "next_pieces", "next_piece_type", "next_piece_shape", "randomizer",
+        "hold_piece_type", "hold_used",
+        # Puntuación y progreso
+        "score", "level", "lines_cleared", "game_speed", "soft_drop_score",
+        "combo_count", "last_clear_time", "back_to_back", "level_up_event",
+        # Rotación y T-spin
+        "last_move_was_rotation", "last_rotation_kick",
+        # Bloqueo, animación de líneas y estado general
+        "on_ground", "lock_timer", "lines_to_clear", "clear_animation_time",
+        "animating_clear", "game_over", "paused", "pieces_placed", "last_lock", "lock_history",
+        # Simulación por frames (tick)
+        "frame", "held_inputs", "das_direction", "das_counter", "gravity_counter",
+        "lock_frames", "clear_frames",
+    )
+    
+    # Sistema de rotación por defecto; un modo puede sobrescribirlo
+    default_rotation_system = "srs"
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _register_slots(cls)
+    
+    def __init__(self, width=10, height=20, field_engine="bitboard", clock=None,
+                 seed=None, randomizer="7bag", preview_count=3, rotation_system=None):
+        self.width = width
+        self.height = height
+        # Semilla de la partida: si no se indica se elige una, para poder reproducir la secuencia
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.randomizer_type = randomizer  # Nombre del generador ('7bag', '14bag', 'tgm', 'random')
+        self.preview_count = max(1, preview_count)  # Número de piezas visibles en la cola
+        # Reloj del motor: RealClock para jugar, ManualClock para simular sin esperar
+        self.clock = clock if clock is not None else RealClock()
+        if field_engine not in FIELD_ENGINES:
+            debugger.warning(f"Motor de tablero desconocido: {field_engine}. Usando bitboard.")
+            field_engine = "bitboard"
+        self.field_engine = field_engine
+        self.use_bitboard = field_engine == "bitboard"
+        self.full_row_mask = (1 << width) - 1
+        # Sistema de rotación ('srs', 'srs+', 'ars', 'nes'): tablas de kicks ya compiladas
+        self.rotation_system = get_rotation_system(
+            rotation_system if rotation_system is not None else self.default_rotation_system)
+        # Claves de Zobrist compartidas por las partidas del mismo tamaño (ver state_hash)
+        self.zobrist = get_zobrist_keys(width, height, self.preview_count)
+        self.spawn_columns = tuple(spawn_column(piece_type, width) for piece_type in range(len(SHAPES)))
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.game_speed = 500
+        self.next_piece_type = None  # Para compatibilidad con código antiguo
+        self.next_piece_shape = None  # Para compatibilidad con código antiguo
+        self.next_pieces = deque()  # Cola de las siguientes piezas (preview_count)
+        self.combo_count = 0  # Contador de combos consecutivos
+        self.last_clear_time = 0  # Para el temporizador de combo
+        self.combo_timeout = 5000  # Tiempo en ms para resetear combo (5 segundos)
+        self.level_up_event = False  # Flag to signal a level up event
+        self.soft_drop_score = 0  # Puntuación acumulada por soft drop
+        
+        # Tiempos de la simulación por frames (ver tick())
+        self.das_frames = DAS_FRAMES  # Frames antes de la auto-repetición lateral
+        self.arr_frames = ARR_FRAMES  # Frames entre repeticiones (0 = hasta la pared)
+        self.soft_drop_frames = SOFT_DROP_FRAMES  # Frames por celda en caída suave
+        self.lock_delay_frames = LOCK_DELAY_FRAMES  # Frames apoyada antes de fijarse
+        
+        # Datos del modo de juego (cada modo los sobrescribe)
+        self.mode_name = None
+        self.mode_description = None
+        self.game_over_reason = None  # Mensaje de fin de partida propio del modo
+        self.game_won = False
+        self.ai_player = None  # Jugador automático que controla la pieza (modo IA)
+        # Lista a la que se añade el last_lock de cada pieza fijada, para quien necesite
+        # todas aunque se fijen varias entre dos consultas (None = no se guardan)
+        self.lock_history = None
+        self.reset()
+
+    def reset(self):
+        # field guarda los colores (para el renderizado y el motor de referencia);
+        # field_rows guarda la ocupación de cada fila como máscara de bits
+        self.field = [[0 for _ in range(self.width)] for _ in range(self.height)]
+        self.field_rows = [0] * self.height
+        self._empty_row = [0] * self.width  # Plantilla para vaciar filas sin crear listas nuevas
+        self.occupied_cells = 0  # Número de celdas ocupadas en el tablero
+        # Índice de superficie: fila del bloque más alto de cada columna (height si está vacía)
+        self.column_tops = [self.height] * self.width
+        self.field_version = 0  # Se incrementa cada vez que cambia el tablero
+        self._ghost_cache = None  # (pieza, rotación, x, field_version, ghost_y)
+        self.field_hash = 0  # Hash de Zobrist de las celdas ocupadas, actualizado al fijar y compactar
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.game_over = False
+        self.paused = False
+        self.lock_timer = 0
+        self.on_ground = False
+        self.lock_delay_ms = 500
+        self.pieces_placed = 0  # Piezas fijadas en la partida
+        self.last_lock = None  # (pieza, x, y, rotación, hold_usado, spin) de la última pieza fijada
+        self.hold_piece_type = None
+        self.hold_used = False
+        self.next_pieces = deque()  # Inicializar cola vacía para las próximas piezas
+        self.lines_to_clear = []
+        self.clear_animation_time = 0
+        self.animating_clear = False
+        self.combo_count = 0
+        self.level_up_event = False
+        self.soft_drop_score = 0
+        
+        # Variables para el sistema SRS y detección de T-spin
+        self.last_move_was_rotation = False
+        self.last_rotation_kick = (0, 0)
+        self.back_to_back = 0  # Contador para técnicas consecutivas (Tetris y T-spin)
+        
+        # Estado de la simulación por frames
+        self.frame = 0
+        self.held_inputs = 0  # Botones mantenidos en el último frame
+        self.das_direction = 0  # -1 izquierda, 1 derecha, 0 sin desplazamiento
+        self.das_counter = 0
+        self.gravity_counter = 0
+        self.lock_frames = 0
+        self.clear_frames = 0
+        
+        # Inicializar el generador de piezas con la semilla de la partida
+        self.randomizer = create_randomizer(self.randomizer_type, self.seed)
+        
+        # Inicializar la pieza actual y las próximas piezas
+        self.prepare_first_piece()
+
+    def prepare_first_piece(self):
+        """
+        Inicializa la primera pieza del juego y las piezas siguientes.
+        """
+        # Obtener la pieza actual
+        self.piece_type = self.randomizer.next_piece()
+        self.rotation = 0
+        
+        # Generar las piezas siguientes
+        self.next_pieces.clear()
+        for _ in range(self.preview_count):
+            self.next_pieces.append(self.randomizer.next_piece())
+            
+        # Mantener compatibilidad con el código existente
+        self.next_piece_type = self.next_pieces[0]
+        self.next_piece_shape = SHAPES[self.next_piece_type][0]
+        
+        # Posicionar la pieza en el tablero
+        self.piece_x = self.spawn_columns[self.piece_type]
+        self.piece_y = 0
+        
+        # Verificar game over
+        if not self.is_valid_position():
+            self.game_over = True
+    
+    def new_piece(self):
+        """
+        Genera una nueva pieza para el jugador tomando la primera de la cola de piezas siguientes,
+        y añade una nueva pieza al final de la cola para mantener preview_count piezas visibles.
+        """
+        # Tomar la primera pieza de la cola como la pieza actual
+        self.piece_type = self.next_pieces.popleft()
+        
+        # Añadir una nueva pieza al final de la cola
+        self.next_pieces.append(self.randomizer.next_piece())
+        
+        # Actualizar next_piece_type para mantener compatibilidad
+        self.next_piece_type = self.next_pieces[0]
+        self.next_piece_shape = SHAPES[self.next_piece_type][0]
+        
+        # Resetear la rotación
+        self.rotation = 0
+        
+        # Posicionar la pieza en el tablero
+        self.piece_x = self.spawn_columns[self.piece_type]
+        self.piece_y = 0
+        
+        # Verificar game over
+        if not self.is_valid_position():
+            self.game_over = True
+
+    def is_valid_position(self, x=None, y=None, rotation=None):
+        if x is None:
+            x = self.piece_x
+        if y is None:
+            y = self.piece_y
+        if rotation is None:
+            rotation = self.rotation
+
+        geometry = PIECE_GEOMETRY[self.piece_type][rotation]
+        if (x + geometry.min_col < 0 or x + geometry.max_col >= self.width
+                or y + geometry.max_row >= self.height):
+            return False
+
+        if self.use_bitboard:
+            shift = x + geometry.min_col
+            field_rows = self.field_rows
+            for row, mask in geometry.row_masks:
+                field_y = y + row
+                if field_y >= 0 and field_rows[field_y] & (mask << shift):
+                    return False
+            return True
+
+        field = self.field
+        for col, row, _ in geometry.cells:
+            field_y = y + row
+            if field_y >= 0 and field[field_y][x + col] != 0:
+                return False
+
+        return True
+
+    def get_wall_kicks(self, piece_type, rotation_from, rotation_to):
+        """
+        Devuelve los kicks a probar para una rotación según el sistema de rotación
+        de la partida. Las tablas están precompiladas en core.rotation, así que
+        es una simple consulta por índices.
+        
+        Returns:
+            tuple: Desplazamientos (dx, dy) en orden de prueba; vacía si el giro no está permitido
+        """
+        return self.rotation_system.kicks[piece_type][rotation_from][(rotation_to - rotation_from) % 4]
+    
+    def _rotate(self, turn):
+        """
+        Gira la pieza `turn` cuartos de vuelta en sentido horario probando los kicks
+        del sistema de rotación.
+        
+        Returns:
+            bool: True si la pieza rotó
+        """
+        # No rotar si es game over
+        if self.game_over:
+            return False
+        
+        new_rotation = (self.rotation + turn) % 4
+        kicks = self.rotation_system.kicks[self.piece_type][self.rotation][turn]
+        
+        # Intentar cada posible kick
+        for dx, dy in kicks:
+            new_x = self.piece_x + dx
+            new_y = self.piece_y + dy
+            if self.is_valid_position(x=new_x, y=new_y, rotation=new_rotation):
+                self.piece_x = new_x
+                self.piece_y = new_y
+                self.rotation = new_rotation
+                
+                # Si es pieza T, registrar que hubo rotación para detección de T-spin
+                if self.piece_type == 5:  # T-piece
+                    self.last_move_was_rotation = True
+                    # Guardar el tipo de kick para distinguir entre T-spin normal y mini
+                    self.last_rotation_kick = (dx, dy)
+                else:
+                    self.last_move_was_rotation = False
+                
+                return True
+                
+        return False
+    
+    def rotate(self):
+        """
+        Clockwise rotation (X key)
+        """
+        return self._rotate(TURN_CW)
+        
+    def rotate_inv(self):
+        """
+        Counter-clockwise rotation (Z key)
+        """
+        return self._rotate(TURN_CCW)
+    
+    def rotate_180(self):
+        """
+        Rotación de 180° (solo en los sistemas que la permiten, como SRS+)
+        """
+        return self._rotate(TURN_180)
+
+    def move_left(self):
+        if self.is_valid_position(x=self.piece_x - 1):
+            self.piece_x -= 1
+            # Resetear el flag de rotación para T-spin (un movimiento horizontal invalida el T-spin)
+            if self.piece_type == 5:  # T-piece
+                self.last_move_was_rotation = False
+            return True
+        return False
+
+    def move_right(self):
+        if self.is_valid_position(x=self.piece_x + 1):
+            self.piece_x += 1
+            # Resetear el flag de rotación para T-spin (un movimiento horizontal invalida el T-spin)
+            if self.piece_type == 5:  # T-piece
+                self.last_move_was_rotation = False
+            return True
+        return False
+
+    def move_down(self, is_soft_drop=False):
+        """
+        Mueve la pieza hacia abajo.
+        
+        Args:
+            is_soft_drop (bool): True si el movimiento es iniciado por el jugador (tecla abajo)
+        
+        Returns:
+            bool: True si la pieza se movió exitosamente
+        """
+        if self.is_valid_position(y=self.piece_y + 1):
+            self.piece_y += 1
+            self.on_ground = False
+            self.lock_timer = 0
+            
+            # Resetear el flag de rotación para T-spin (un movimiento vertical invalida el T-spin)
+            if self.piece_type == 5:  # T-piece
+                self.last_move_was_rotation = False
+            
+            # Solo incrementar puntuación si es soft drop manual
+            if is_soft_drop:
+                self.soft_drop_score += 1
+                # Actualizar la puntuación total en tiempo real
+                self.score += 1
+                
+            return True
+        else:
+            if not self.on_ground:
+                self.on_ground = True
+                self.lock_timer = self.clock.get_ticks()
+            return False
+
+    def drop(self):
+        # Calcular la posición final con el índice de alturas (igual que la pieza fantasma)
+        drop_y = self.get_ghost_position()
+        drop_distance = drop_y - self.piece_y
+        
+        self.piece_y = drop_y
+        
+        # Añadir puntuación por hard drop (2 puntos por cada celda que cae)
+        hard_drop_score = drop_distance * 2
+        self.score += hard_drop_score
+        
+        # Resetear el flag de rotación para T-spin (hard drop invalida el T-spin)
+        if self.piece_type == 5:  # T-piece
+            self.last_move_was_rotation = False
+            
+        # Devolver la distancia caída para posibles efectos visuales
+        return drop_distance
+
+    def hold_piece(self):
+        """
+        Intercambia la pieza actual con la pieza en hold, o toma la primera pieza de next_pieces
+        si es la primera vez que se usa el hold.
+        """
+        # No se puede usar hold si ya se usó o si el juego terminó
+        if self.hold_used or self.game_over:
+            return
+            
+        # Guardar la pieza actual temporalmente
+        current = self.piece_type
+        
+        if self.hold_piece_type is None:
+            # Primera vez que se usa hold: tomar la primera pieza de next_pieces
+            # La nueva pieza actual será la primera de la cola
+            self.piece_type = self.next_pieces.popleft()
+            
+            # Añadir una nueva pieza al final para mantener llena la cola
+            self.next_pieces.append(self.randomizer.next_piece())
+        else:
+            # Intercambiar la pieza actual con la pieza en hold
+            self.piece_type, self.hold_piece_type = self.hold_piece_type, current
+        
+        # Guardar la pieza actual en hold
+        self.hold_piece_type = current
+        
+        # Actualizar next_piece_type para compatibilidad
+        self.next_piece_type = self.next_pieces[0]
+        self.next_piece_shape = SHAPES[self.next_piece_type][0]
+        
+        # Resetear la posición y rotación de la pieza
+        self.rotation = 0
+        self.piece_x = self.spawn_columns[self.piece_type]
+        self.piece_y = 0
+        
+        # Marcar que hold ya fue usado
+        self.hold_used = True
+        
+        # Verificar si la posición es válida (game over si no lo es)
+        if not self.is_valid_position():
+            self.game_over = True
+
+    def should_lock(self):
+        if self.on_ground:
+            elapsed = self.clock.get_ticks() - self.lock_timer
+            return elapsed >= self.lock_delay_ms
+        return False
+
+    def is_tspin(self):
+        """
+        Detecta si la última rotación resultó en un T-spin según las reglas modernas de SRS.
+        
+        En el sistema moderno:
+        - Un T-spin ocurre cuando la última acción fue una rotación de la pieza T
+          Y al menos 3 de las 4 esquinas alrededor del centro de la T están ocupadas
+        - Se distingue entre T-spin normal y T-spin mini según el tipo de rotación
+          y la posición final de los bloques
+          
+        Referencia: https://harddrop.com/wiki/List_of_twists#Twists_with_T_.28or_T-Spin.29
+        """
+        # Solo aplica a la pieza T (índice 5 en SHAPES)
+        if self.piece_type != 5:
+            return False
+        
+        # Verificar si la última acción fue una rotación (requisito de SRS moderno)
+        if not self.last_move_was_rotation:
+            return False
+        
+        return self.classify_tspin(self.piece_x, self.piece_y, self.rotation, self.last_rotation_kick)
+    
+    def classify_tspin(self, piece_x, piece_y, rotation, rotation_kick):
+        """
+        Tipo de T-spin de una pieza T que acaba de girar hasta (piece_x, piece_y, rotation)
+        con el kick rotation_kick. Lo usan is_tspin() y el generador de jugadas.
+        
+        Returns:
+            str o bool: "T-spin", "T-spin mini" o False
+        """
+        # Verificar las 4 esquinas alrededor de la pieza T usando la tabla precalculada,
+        # que ya indica cuáles son las esquinas frontales para la rotación actual
+        corners_blocked = 0
+        front_blocked = 0
+        for dx, dy, is_front in TSPIN_CORNERS[rotation]:
+            x = piece_x + dx
+            y = piece_y + dy
+            
+            # Verificar si la esquina está bloqueada (fuera del campo o con un bloque)
+            if x < 0 or x >= self.width or y < 0 or y >= self.height or self.field[y][x] != 0:
+                corners_blocked += 1
+                if is_front:
+                    front_blocked += 1
+        
+        # Determinar el tipo de T-spin
+        # Según SRS moderno:
+        # - T-spin normal: 3 o 4 esquinas bloqueadas con al menos 2 frontales bloqueadas
+        # - T-spin mini: 3 esquinas bloqueadas pero menos de 2 frontales bloqueadas
+        if corners_blocked >= 3:
+            # Verificar si el último kick fue un test 4 o 5 (típicamente kicks especiales)
+            # que pueden convertir un mini T-spin en un T-spin completo
+            if rotation_kick != (0, 0):
+                # Si el kick no fue (0,0) y es el último test, considerarlo T-spin completo
+                kick_index = 0
+                kicks = self.get_wall_kicks(5, (rotation-1)%4, rotation)
+                if rotation_kick in kicks:
+                    kick_index = kicks.index(rotation_kick)
+                
+                # Verificar si es un T-spin mini o completo
+                if front_blocked >= 2 or kick_index >= 3:
+                    return "T-spin"
+                else:
+                    return "T-spin mini"
+            else:
+                # Sin kick especial, usar la regla estándar de esquinas frontales
+                if front_blocked >= 2:
+                    return "T-spin"
+                else:
+                    return "T-spin mini"
+        
+        return False
+
+    def fix_piece(self):
+        # Verificar T-spin antes de fijar la pieza
+        tspin_result = self.is_tspin()
+        self.pieces_placed += 1
+        self.last_lock = (self.piece_type, self.piece_x, self.piece_y, self.rotation, self.hold_used,
+                          TSPIN_KINDS[tspin_result])
+        if self.lock_history is not None:
+            self.lock_history.append(self.last_lock)
+        
+        geometry = PIECE_GEOMETRY[self.piece_type][self.rotation]
+        field = self.field
+        column_tops = self.column_tops
+        cell_keys = self.zobrist.cells
+        piece_x = self.piece_x
+        piece_y = self.piece_y
+        height = self.height
+        field_hash = self.field_hash
+        for col, row, cell in geometry.cells:
+            field_y = piece_y + row
+            if 0 <= field_y < height:
+                field_x = piece_x + col
+                field[field_y][field_x] = cell
+                self.occupied_cells += 1
+                field_hash ^= cell_keys[field_y][field_x]
+                if field_y < column_tops[field_x]:
+                    column_tops[field_x] = field_y
+        self.field_hash = field_hash
+        self.field_version += 1
+
+        if self.use_bitboard:
+            shift = piece_x + geometry.min_col
+            field_rows = self.field_rows
+            for row, mask in geometry.row_masks:
+                field_y = piece_y + row
+                if 0 <= field_y < height:
+                    field_rows[field_y] |= mask << shift
+
+        # No necesitamos añadir la puntuación de soft drop aquí porque ya se agregó en tiempo real
+        # Solo reseteamos el contador para la siguiente pieza
+        self.soft_drop_score = 0
+
+        # Solo pueden haberse completado las filas que ocupa la pieza
+        line_clear_result = self.clear_lines(range(
+            max(0, piece_y + geometry.min_row), min(height, piece_y + geometry.max_row + 1)))
+        self.hold_used = False
+        
+        # Agregar información de T-spin al resultado si es aplicable
+        if line_clear_result and tspin_result:
+            # Determinar el tipo exacto de T-spin para calcular la puntuación
+            tspin_type = tspin_result  # "T-spin" o "T-spin mini"
+            line_clear_result["is_tspin"] = True
+            line_clear_result["tspin_type"] = tspin_type
+            
+            # Puntuación para T-spins según el sistema moderno
+            if tspin_type == "T-spin":
+                # T-spin normal
+                points_table = {
+                    0: 400,    # T-spin sin líneas
+                    1: 800,    # T-spin Single
+                    2: 1200,   # T-spin Double
+                    3: 1600    # T-spin Triple
+                }
+            else:
+                # T-spin mini
+                points_table = {
+                    0: 200,    # T-spin mini sin líneas
+                    1: 200,    # T-spin mini Single
+                    2: 400,    # T-spin mini Double
+                    3: 400     # T-spin mini Triple (raro, pero posible)
+                }
+            
+            # Aplicar puntuación según el tipo de T-spin y líneas eliminadas
+            points = points_table.get(line_clear_result.get("count", 0), 0) * self.level
+            self.score += points
+            
+            # Registrar en el log el tipo específico de T-spin
+            lines_str = f"{line_clear_result.get('count', 0)} línea(s)" if line_clear_result.get("count", 0) > 0 else "sin líneas"
+            debugger.debug(f"¡{tspin_type} {lines_str} detectado! {points} puntos otorgados (nivel {self.level}).")
+        elif tspin_result:
+            # T-spin sin líneas
+            if tspin_result == "T-spin":
+                points = 400 * self.level
+            else:  # T-spin mini
+                points = 200 * self.level
+                
+            self.score += points
+            debugger.debug(f"¡{tspin_result} sin líneas detectado! {points} puntos × nivel {self.level}")
+
+        # Resetear flag de rotación después de fijar la pieza
+        self.last_move_was_rotation = False
+        
+        # Generar nueva pieza solo cuando no hay animación de eliminación de líneas
+        if not self.lines_to_clear:  # Si no hay líneas para eliminar, generamos una nueva pieza inmediatamente
+            self.new_piece()
+        
+        return line_clear_result
+
+    def clear_lines(self, rows=None):
+        """
+        Busca las líneas completas y prepara su eliminación.
+        
+        Args:
+            rows (iterable, optional): Filas a comprobar, de arriba abajo (por defecto todo el tablero)
+        """
+        if rows is None:
+            rows = range(self.height)
+        if self.use_bitboard:
+            full = self.full_row_mask
+            field_rows = self.field_rows
+            self.lines_to_clear = [y for y in rows if field_rows[y] == full]
+        else:
+            self.lines_to_clear = [y for y in rows if all(cell != 0 for cell in self.field[y])]
+        if self.lines_to_clear:
+            now = self.clock.get_ticks()
+            
+            # Verificar combo (líneas consecutivas en un periodo de tiempo)
+            if now - self.last_clear_time < self.combo_timeout:
+                self.combo_count += 1
+            else:
+                self.combo_count = 1
+                
+            self.last_clear_time = now
+            self.animating_clear = True
+            self.clear_animation_time = now
+            
+            # Verificar si es un Perfect Clear (todos los bloques eliminados)
+            if self.use_bitboard:
+                # Basta con comprobar que todas las celdas ocupadas están en las líneas completas
+                is_perfect = self.occupied_cells == self.width * len(self.lines_to_clear)
+            else:
+                temp_field = [self.field[y].copy() for y in range(self.height) if y not in self.lines_to_clear]
+                is_perfect = len(temp_field) == 0 or all(all(cell == 0 for cell in row) for row in temp_field)
+            
+            return {
+                "count": len(self.lines_to_clear),
+                "is_tetris": (len(self.lines_to_clear) == 4),
+                "is_perfect": is_perfect,  # Nuevo flag para Perfect Clear
+                "combo": self.combo_count,
+                "combo_active": True  # Indica que el combo sigue activo
+            }
+        else:
+            # Resetear combo si ha pasado demasiado tiempo desde la última limpieza
+            now = self.clock.get_ticks()
+            if now - self.last_clear_time > self.combo_timeout:
+                self.combo_count = 0
+                # Si necesitamos indicar que el combo terminó (sin líneas eliminadas)
+                # podemos devolver un resultado vacío pero con el combo_active=False
+                if self.combo_count > 0:  # Solo si había un combo activo
+                    return {
+                        "count": 0,
+                        "combo": self.combo_count,
+                        "combo_active": False  # Indica que el combo ha terminado
+                    }
+                
+        return None
+
+    def finish_clear_animation(self):
+        try:
+            # Safety check: ensure lines_to_clear isn't empty
+            if not self.lines_to_clear:
+                self.animating_clear = False
+                return
+            
+            # Compactar el tablero en el sitio: solo se mueven las filas por encima
+            # de la línea completa más baja y hasta la cima de la pila
+            stack_top = min(self.column_tops) + len(self.lines_to_clear)
+            self._compact_cleared_rows()
+            self._rebuild_column_tops(stack_top)
+            self.field_version += 1
+
+            # Update score and level
+            lines_count = len(self.lines_to_clear)
+            self.lines_cleared += lines_count
+            self.occupied_cells -= lines_count * self.width
+            
+            # Apply combo multiplier (max 5x)
+            combo_multiplier = min(5, self.combo_count)
+            base_points = LINE_CLEAR_POINTS.get(lines_count, 0) * self.level
+            combo_points = base_points * combo_multiplier
+            self.score += combo_points
+
+            # Check for level up
+            new_level = 1 + (self.lines_cleared // 10)
+            if new_level > self.level:
+                old_level = self.level
+                self.level = new_level
+                
+                # Calculate new game speed based on level
+                if self.level <= 9:
+                    # Levels 1-9: 500ms to 200ms
+                    self.game_speed = 500 - (self.level - 1) * 35
+                else:
+                    # Levels 10+: Slower decrease to minimum 150ms
+                    high_level_speed = 200 - ((self.level - 9) * 5)
+                    self.game_speed = max(150, high_level_speed)
+                
+                # Signal level up for effects
+                self.level_up_event = True
+                debugger.debug(f"Level up! from {old_level} to {self.level} with game speed {self.game_speed}ms")
+
+            # Reset animation state
+            self.lines_to_clear = []
+            self.animating_clear = False
+            
+            # Ya no es necesario generar una nueva pieza aquí, ya que se genera en el método fix_piece()
+            # cuando animating_clear se establece a False
+            
+        except Exception as e:
+            debugger.error(f"Error in finish_clear_animation: {str(e)}")
+            # Reset animation state even on error
+            self.lines_to_clear = []
+            self.animating_clear = False
+            raise
+
+    def _compact_cleared_rows(self):
+        """
+        Elimina las filas de lines_to_clear desplazando hacia abajo las filas superiores.
+        
+        Las filas eliminadas se intercambian hacia arriba y se vacían en el sitio,
+        así que no se crea ninguna lista nueva. lines_to_clear debe estar ordenada
+        de arriba abajo (como la genera clear_lines).
+        """
+        field = self.field
+        field_rows = self.field_rows
+        lines = self.lines_to_clear
+        stack_top = min(self.column_tops)
+        
+        # Hash de Zobrist: se quitan las filas eliminadas y cada fila que baja
+        # cambia su contribución de la fila de origen a la de destino
+        row_key = self.zobrist.row_key
+        field_hash = self.field_hash
+        if self.use_bitboard:
+            for y in lines:
+                field_hash ^= row_key(y, field_rows[y])
+        
+        line_index = len(lines) - 1
+        write_y = lines[line_index]
+        for read_y in range(write_y, stack_top - 1, -1):
+            if line_index >= 0 and lines[line_index] == read_y:
+                line_index -= 1
+                continue
+            field[write_y], field[read_y] = field[read_y], field[write_y]
+            bits = field_rows[write_y] = field_rows[read_y]
+            if bits:
+                field_hash ^= row_key(read_y, bits) ^ row_key(write_y, bits)
+            write_y -= 1
+        
+        # Las filas eliminadas han quedado justo encima de la pila compactada
+        empty_row = self._empty_row
+        for y in range(write_y, stack_top - 1, -1):
+            field[y][:] = empty_row
+            field_rows[y] = 0
+        
+        if self.use_bitboard:
+            self.field_hash = field_hash
+        else:
+            # El motor de referencia no mantiene las máscaras por fila
+            self.field_hash = self.zobrist.field_hash(field)
+
+    def line_clear_delay_ms(self):
+        """Duración de la animación de eliminación de líneas (más corta en niveles altos)"""
+        min_duration = 100 if self.level >= 10 else 150
+        return max(min_duration, 250 - self.level * 15)
+    
+    def tick(self, inputs=0):
+        """
+        Avanza exactamente un frame (1/60 s) de la partida.
+        
+        Gravedad, DAS/ARR, retardo de bloqueo y retardo de eliminación de líneas se
+        cuentan en frames, así que con un reloj simulado (FrameClock o ManualClock)
+        la misma secuencia de entradas produce siempre la misma partida.
+        
+        Args:
+            inputs (int): Bits INPUT_* de los botones mantenidos en este frame; las
+                pulsaciones nuevas se detectan comparando con el frame anterior
+        
+        Returns:
+            dict o None: Resultado de fix_piece() si se fijó una pieza en este frame
+        """
+        if self.game_over or self.paused:
+            return None
+        self.clock.tick(FPS)
+        self.frame += 1
+        pressed = inputs & ~self.held_inputs
+        self.held_inputs = inputs
+        self.update()
+        if self.game_over:
+            return None
+        
+        # Durante la animación de líneas la partida espera sin mover la pieza
+        if self.animating_clear:
+            self.clear_frames += 1
+            if self.clear_frames >= ms_to_frames(self.line_clear_delay_ms()):
+                self._settle_clear()
+                self._reset_piece_timers()
+            return None
+        
+        if pressed & INPUT_HOLD and not self.hold_used:
+            self.hold_piece()
+            self._reset_piece_timers()
+        if pressed & INPUT_ROTATE_CW:
+            self.rotate()
+        if pressed & INPUT_ROTATE_CCW:
+            self.rotate_inv()
+        if pressed & INPUT_ROTATE_180:
+            self.rotate_180()
+        
+        self._tick_shift(inputs, pressed)
+        
+        if pressed & INPUT_HARD_DROP:
+            self.drop()
+            return self._tick_lock()
+        
+        # Gravedad, o caída suave mientras se mantiene el botón
+        soft_drop = bool(inputs & INPUT_SOFT_DROP)
+        if pressed & INPUT_SOFT_DROP:
+            self.gravity_counter = 0
+            self.move_down(is_soft_drop=True)
+        else:
+            self.gravity_counter += 1
+            interval = ms_to_frames(self.game_speed)
+            if soft_drop:
+                interval = min(interval, self.soft_drop_frames)
+            if self.gravity_counter >= interval:
+                self.gravity_counter = 0
+                self.move_down(is_soft_drop=soft_drop)
+        
+        # Retardo de bloqueo: la pieza se fija tras lock_delay_frames apoyada
+        if self.is_valid_position(y=self.piece_y + 1):
+            self.on_ground = False
+            self.lock_frames = 0
+            return None
+        self.on_ground = True
+        self.lock_frames += 1
+        if self.lock_frames >= self.lock_delay_frames:
+            return self._tick_lock()
+        return None
+    
+    def _tick_shift(self, inputs, pressed):
+        """Desplazamiento lateral con DAS/ARR contado en frames"""
+        if pressed & INPUT_LEFT:
+            self.das_direction = -1
+            self.das_counter = 0
+            self.move_left()
+            return
+        if pressed & INPUT_RIGHT:
+            self.das_direction = 1
+            self.das_counter = 0
+            self.move_right()
+            return
+        
+        held = INPUT_LEFT if self.das_direction < 0 else INPUT_RIGHT if self.das_direction > 0 else 0
+        if not inputs & held:
+            # Se soltó la dirección activa: si se mantiene la contraria, empieza su DAS
+            if inputs & INPUT_LEFT:
+                self.das_direction = -1
+            elif inputs & INPUT_RIGHT:
+                self.das_direction = 1
+            else:
+                self.das_direction = 0
+            self.das_counter = 0
+            return
+        
+        self.das_counter += 1
+        if self.das_counter < self.das_frames:
+            return
+        move = self.move_left if self.das_direction < 0 else self.move_right
+        if self.arr_frames == 0:
+            while move():
+                pass
+        elif (self.das_counter - self.das_frames) % self.arr_frames == 0:
+            move()
+    
+    def _tick_lock(self):
+        """Fija la pieza desde tick() y reinicia los contadores de la pieza"""
+        result = self.fix_piece()
+        self._reset_piece_timers()
+        return result
+    
+    def _reset_piece_timers(self):
+        self.gravity_counter = 0
+        self.lock_frames = 0
+        self.on_ground = False
+    
+    def apply_many(self, actions):
+        """
+        Aplica una secuencia de acciones de alto nivel en una sola llamada.
+        
+        Pensado para bots y validadores: las líneas se eliminan al momento (sin
+        animación) y en lugar de flags y diccionarios se devuelve una lista compacta
+        de eventos. La ejecución se detiene si la partida termina.
+        
+        Args:
+            actions (iterable): Acciones ACTION_* (enteros) o tuplas
+                (ACTION_PLACE, x, rotación[, y]), ver core/actions.py
+        
+        Returns:
+            list: Eventos (índice_de_acción, EVENT_*, valor)
+        """
+        events = []
+        if self.game_over:
+            return events
+        if self.animating_clear:
+            self._settle_clear()
+        
+        simple_actions = (
+            self.move_left, self.move_right, None, self.rotate, self.rotate_inv,
+            self.rotate_180, self.hold_piece,
+        )
+        for index, action in enumerate(actions):
+            if action.__class__ is int:
+                if action == ACTION_HARD_DROP:
+                    self.drop()
+                    self._lock_for_events(index, events)
+                elif action == ACTION_SOFT_DROP:
+                    self.move_down(is_soft_drop=True)
+                elif action == ACTION_SONIC_DROP:
+                    while self.move_down(is_soft_drop=True):
+                        pass
+                elif action == ACTION_LOCK:
+                    # Sin caída: un T-spin sigue contando. Si la pieza no está apoyada
+                    # cae primero, como con hard drop
+                    if self.is_valid_position(y=self.piece_y + 1):
+                        self.drop()
+                    self._lock_for_events(index, events)
+                else:
+                    simple_actions[action]()
+            elif action[0] == ACTION_PLACE:
+                if not self._place(*action[1:]):
+                    events.append((index, EVENT_INVALID_PLACEMENT, action))
+                    continue
+                self._lock_for_events(index, events)
+            else:
+                raise ValueError(f"Acción desconocida: {action}")
+            
+            if self.game_over:
+                events.append((index, EVENT_GAME_OVER, 0))
+                break
+        return events
+    
+    def _place(self, x, rotation, y=None):
+        """Mueve la pieza a (x, rotación) y la deja caer desde y (por defecto, la fila actual)"""
+        if y is None:
+            y = self.piece_y
+        geometry = PIECE_GEOMETRY[self.piece_type][rotation]
+        if x + geometry.min_col < 0 or x + geometry.max_col >= self.width:
+            return False
+        
+        # Con el índice de alturas se valida la posición y se calcula la caída a la vez:
+        # si la pieza queda por encima de la superficie de todas sus columnas no choca
+        drop_y = self.height
+        if self.use_bitboard:
+            column_tops = self.column_tops
+            for col, bottom in geometry.column_bottoms:
+                landing_y = column_tops[x + col] - 1 - bottom
+                if landing_y < y:
+                    drop_y = None
+                    break
+                if landing_y < drop_y:
+                    drop_y = landing_y
+        else:
+            drop_y = None
+        if drop_y is None and not self.is_valid_position(x=x, y=y, rotation=rotation):
+            return False
+        
+        self.piece_x = x
+        self.piece_y = y
+        self.rotation = rotation
+        self.last_move_was_rotation = False
+        if drop_y is None:
+            self.drop()
+        else:
+            self.score += (drop_y - y) * 2
+            self.piece_y = drop_y
+        return True
+    
+    def _lock_for_events(self, index, events):
+        """Fija la pieza, completa la eliminación de líneas y anota los eventos"""
+        tspin = TSPIN_KINDS[self.is_tspin()] if self.last_move_was_rotation else 0
+        level = self.level
+        result = self.fix_piece()
+        if tspin:
+            events.append((index, EVENT_TSPIN, tspin))
+        if result and result["count"]:
+            events.append((index, EVENT_LINES_CLEARED, result["count"]))
+            if result["is_perfect"]:
+                events.append((index, EVENT_PERFECT_CLEAR, result["count"]))
+        if self.animating_clear:
+            self._settle_clear()
+        if self.level != level:
+            events.append((index, EVENT_LEVEL_UP, self.level))
+            self.level_up_event = False
+    
+    def _settle_clear(self):
+        """Elimina al momento las líneas pendientes y saca la siguiente pieza"""
+        self.finish_clear_animation()
+        self.clear_frames = 0
+        self.new_piece()
+    
+    def update(self):
+        """Actualiza el estado que depende del tiempo (los modos con tiempo lo sobrescriben)"""
+    
+    def start(self):
+        """Inicia los temporizadores del modo (los modos con tiempo lo sobrescriben)"""
+    
+    def pause(self):
+        """Pausa los temporizadores del modo"""
+    
+    def unpause(self):
+        """Reanuda los temporizadores del modo"""
+    
+    def pop_time_warnings(self):
+        """Advertencias de tiempo pendientes de mostrar (solo en modos con tiempo)"""
+        return ()
+    
+    def time_expired(self):
+        """True si se ha agotado el tiempo de la partida (solo en modos con tiempo)"""
+        return False
+    
+    def snapshot(self):
+        """
+        Captura el estado de la partida en un GameSnapshot inmutable.
+        
+        Mucho más barato que copy.deepcopy: el tablero se guarda como tuplas y el
+        generador de piezas como su estado compacto. Sirve para búsqueda, deshacer
+        jugadas y saltar a un punto de una repetición.
+        """
+        return GameSnapshot(
+            tuple(map(tuple, self.field)), tuple(self.field_rows), tuple(self.column_tops),
+            self.occupied_cells, self.field_hash,
+            self.piece_type, self.piece_x, self.piece_y, self.rotation,
+            tuple(self.next_pieces), self.randomizer.get_state(),
+            self.hold_piece_type, self.hold_used,
+            self.score, self.level, self.lines_cleared, self.game_speed, self.soft_drop_score,
+            self.combo_count, self.last_clear_time, self.back_to_back,
+            self.last_move_was_rotation, self.last_rotation_kick,
+            self.on_ground, self.lock_timer,
+            tuple(self.lines_to_clear), self.animating_clear, self.clear_animation_time,
+            self.level_up_event, self.game_over, self.game_won,
+            self.pieces_placed, self.last_lock,
+            (self.frame, self.held_inputs, self.das_direction, self.das_counter,
+             self.gravity_counter, self.lock_frames, self.clear_frames),
+            self.clock.get_state(), None,
+        )
+    
+    def restore(self, snapshot):
+        """
+        Restaura un estado capturado con snapshot().
+        
+        El tablero se sobrescribe en el sitio, así que las referencias a game.field
+        (por ejemplo las del renderizador) siguen siendo válidas.
+        """
+        (field, field_rows, column_tops, self.occupied_cells, self.field_hash,
+         self.piece_type, self.piece_x, self.piece_y, self.rotation,
+         next_pieces, randomizer_state,
+         self.hold_piece_type, self.hold_used,
+         self.score, self.level, self.lines_cleared, self.game_speed, self.soft_drop_score,
+         self.combo_count, self.last_clear_time, self.back_to_back,
+         self.last_move_was_rotation, self.last_rotation_kick,
+         self.on_ground, self.lock_timer,
+         lines_to_clear, self.animating_clear, self.clear_animation_time,
+         self.level_up_event, self.game_over, self.game_won,
+         self.pieces_placed, self.last_lock,
+         tick_state, clock_state, _) = snapshot
+        
+        (self.frame, self.held_inputs, self.das_direction, self.das_counter,
+         self.gravity_counter, self.lock_frames, self.clear_frames) = tick_state
+        self.clock.set_state(clock_state)
+        
+        for row, saved_row in zip(self.field, field):
+            row[:] = saved_row
+        self.field_rows[:] = field_rows
+        self.column_tops[:] = column_tops
+        self.field_version += 1
+        
+        self.next_pieces.clear()
+        self.next_pieces.extend(next_pieces)
+        self.next_piece_type = self.next_pieces[0]
+        self.next_piece_shape = SHAPES[self.next_piece_type][0]
+        self.randomizer.set_state(randomizer_state)
+        self.lines_to_clear = list(lines_to_clear)
+    
+    def clone(self):
+        """
+        Devuelve una copia independiente de la partida.
+        
+        Copia solo los contenedores mutables del estado y la configuración se comparte
+        con el original. Los relojes simulados se copian (cada copia avanza su propio
+        tiempo); el reloj de tiempo real se comparte.
+        """
+        cls = type(self)
+        new = cls.__new__(cls)
+        for name, value in zip(cls._slot_names, cls._slot_getter(self)):
+            setattr(new, name, value)
+        new.field = [row[:] for row in self.field]
+        new.field_rows = self.field_rows[:]
+        new.column_tops = self.column_tops[:]
+        new.next_pieces = deque(self.next_pieces)
+        new.lines_to_clear = self.lines_to_clear[:]
+        new.randomizer = self.randomizer.clone()
+        new.clock = self.clock.clone()
+        new.lock_history = None  # Las copias no se graban
+        return new
+
+    @property
+    def state_hash(self):
+        """
+        Hash de Zobrist de 64 bits de la posición: tablero, pieza actual (tipo, rotación
+        y posición), hold y cola de piezas visibles.
+        
+        La parte del tablero se mantiene de forma incremental; el resto se combina al
+        consultarlo. Las claves son fijas, así que el valor es el mismo entre ejecuciones.
+        """
+        zobrist = self.zobrist
+        key = (self.field_hash ^ zobrist.piece[self.piece_type] ^ zobrist.rotation[self.rotation]
+               ^ zobrist.x[self.piece_x + POSITION_MARGIN] ^ zobrist.y[self.piece_y + POSITION_MARGIN])
+        if self.hold_piece_type is not None:
+            key ^= zobrist.hold[self.hold_piece_type]
+        if self.hold_used:
+            key ^= zobrist.hold_used
+        for queue_keys, piece in zip(zobrist.queue, self.next_pieces):
+            key ^= queue_keys[piece]
+        return key
+    
+    def get_piece_shape(self):
+        return SHAPES[self.piece_type][self.rotation]
+
+    def get_piece_type(self):
+        return self.piece_type + 1
+
+    def get_ghost_position(self):
+        """
+        Devuelve la fila en la que aterrizaría la pieza actual.
+        
+        Con el motor bitboard se usa el índice de alturas por columna (coste proporcional
+        al ancho de la pieza) y el resultado se guarda hasta que cambie la pieza o el tablero.
+        Si la pieza está metida bajo un saliente se recurre a la búsqueda fila a fila.
+        """
+        if not self.use_bitboard:
+            return self._scan_ghost_position()
+        
+        piece_x = self.piece_x
+        cache = self._ghost_cache
+        if (cache is not None and cache[0] == self.piece_type and cache[1] == self.rotation
+                and cache[2] == piece_x and cache[3] == self.field_version and cache[4] >= self.piece_y):
+            return cache[4]
+        
+        column_tops = self.column_tops
+        piece_y = self.piece_y
+        ghost_y = self.height
+        for col, bottom in PIECE_GEOMETRY[self.piece_type][self.rotation].column_bottoms:
+            landing_y = column_tops[piece_x + col] - 1 - bottom
+            if landing_y < piece_y:
+                # La pieza está por debajo de la superficie de esta columna (bajo un saliente)
+                return self._scan_ghost_position()
+            if landing_y < ghost_y:
+                ghost_y = landing_y
+        
+        self._ghost_cache = (self.piece_type, self.rotation, piece_x, self.field_version, ghost_y)
+        return ghost_y
+    
+    def _scan_ghost_position(self):
+        """Busca la posición de aterrizaje bajando fila a fila (método de referencia)"""
+        ghost_y = self.piece_y
+        while self.is_valid_position(y=ghost_y + 1):
+            ghost_y += 1
+        return ghost_y
+    
+    def _rebuild_column_tops(self, start_row=0):
+        """
+        Recalcula el índice de alturas por columna a partir del tablero.
+        
+        Args:
+            start_row (int): Primera fila que puede estar ocupada (las de encima están vacías)
+        """
+        column_tops = self.column_tops
+        for x in range(self.width):
+            column_tops[x] = self.height
+        
+        if self.use_bitboard:
+            # Recorrer las filas de arriba abajo marcando las columnas aún no encontradas
+            pending = self.full_row_mask
+            field_rows = self.field_rows
+            for y in range(start_row, self.height):
+                bits = field_rows[y]
+                found = bits & pending
+                while found:
+                    lowest = found & -found
+                    column_tops[lowest.bit_length() - 1] = y
+                    found ^= lowest
+                pending &= ~bits
+                if not pending:
+                    break
+        else:
+            for x in range(self.width):
+                for y in range(start_row, self.height):
+                    if self.field[y][x] != 0:
+                        column_tops[x] = y
+                        break
+
+
+def _register_slots(cls):
+    """Precalcula la lista completa de __slots__ de la clase (incluidas las heredadas) para clone()"""
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(klass.__dict__.get("__slots__", ()))
+    cls._slot_names = tuple(names)
+    cls._slot_getter = operator.attrgetter(*names)
+
+
+_register_slots(TetrisGame)
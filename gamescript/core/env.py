@@ -0,0 +1,533 @@
+# env.py
+# Entornos de aprendizaje por refuerzo al estilo Gym: reset()/step() con observaciones NumPy
+#
+# Requiere numpy (dependencia opcional: el juego y el resto del núcleo no la usan).
+#
+# Acciones: colocaciones. Con ancho W, la acción a se descompone en
+#   hold = a // (4 * W), rotación = (a // W) % 4, columna = a % W
+# donde columna es la primera columna que ocupa la pieza (no piece_x), así que el
+# mismo índice significa lo mismo para todas las piezas. La pieza cae en vertical
+# desde donde está (como ACTION_PLACE en TetrisGame.apply_many); con hold primero se
+# cambia de pieza y la nueva cae desde su posición de aparición.
+
+import multiprocessing
+
+import numpy as np
+
+from .actions import ACTION_HOLD, ACTION_PLACE, EVENT_LINES_CLEARED
+from .batch import BatchGame, NO_LANDING
+from .clock import ManualClock
+from .modes import create_game_mode
+from .pieces import PIECE_GEOMETRY
+from .randomizer import PieceRNG, NUM_PIECES
+
+# Claves de las observaciones y su tipo; hold vale NUM_PIECES si está vacío
+OBSERVATION_DTYPES = {
+    "board": np.uint8,
+    "piece": np.int64,
+    "queue": np.int64,
+    "hold": np.int64,
+    "hold_used": np.uint8,
+}
+
+# Claves de info en los entornos vectorizados
+INFO_DTYPES = {
+    "lines": np.int64,
+    "score": np.int64,
+    "pieces": np.int64,
+    "invalid": bool,
+}
+
+
+def decode_action(action, width):
+    """
+    Separa un índice de acción en sus partes.
+
+    Returns:
+        tuple: (hold, rotación, columna) con columna = primera columna de la pieza
+    """
+    placements = 4 * width
+    return action >= placements, (action % placements) // width, action % width
+
+
+def _empty_observations(count, height, width, preview_count):
+    """Arrays de observación para count entornos"""
+    shapes = {
+        "board": (count, height, width),
+        "piece": (count,),
+        "queue": (count, preview_count),
+        "hold": (count,),
+        "hold_used": (count,),
+    }
+    return {key: np.zeros(shapes[key], dtype) for key, dtype in OBSERVATION_DTYPES.items()}
+
+
+def _fits(rows, width, height, piece_type, rotation, column, y):
+    """Si la pieza cabe con su primera columna en column y su fila 0 en y"""
+    geometry = PIECE_GEOMETRY[piece_type][rotation]
+    if column + geometry.width > width or y + geometry.max_row >= height:
+        return False
+    for row, mask in geometry.row_masks:
+        field_y = y + row
+        if field_y >= 0 and rows[field_y] & (mask << column):
+            return False
+    return True
+
+
+class TetrisEnv:
+    """
+    Una partida de TetrisGame como entorno con la interfaz de Gymnasium.
+
+    reset() devuelve (observación, info) y step(acción) devuelve (observación,
+    recompensa, terminated, truncated, info). La observación es un dict de arrays:
+    board (alto, ancho) con 1 en las celdas ocupadas, piece, queue (preview_count),
+    hold (NUM_PIECES si está vacío) y hold_used. La recompensa es lo que sube la
+    puntuación con la colocación.
+
+    Una acción no válida (la pieza no cabe, o hold ya usado) no cambia la partida:
+    recompensa 0 e info["invalid"] = True. action_mask() dice qué acciones son válidas.
+
+    El reloj es un ManualClock parado, así que no hay gravedad ni tiempo: las
+    partidas de los modos con tiempo no terminan por tiempo.
+
+    Args:
+        mode (str): Modo de juego para create_game_mode
+        seed (int): Semilla de la secuencia de partidas (None = aleatoria)
+        max_pieces (int): Piezas por partida antes de truncarla (None = sin límite)
+        width (int): Ancho del tablero
+        height (int): Alto del tablero
+        preview_count (int): Piezas visibles en la cola
+        rotation_system (str): Sistema de rotación (por defecto el del modo)
+    """
+
+    def __init__(self, mode="classic", seed=None, max_pieces=None, width=10, height=20,
+                 preview_count=3, rotation_system=None):
+        self.mode = mode
+        self.max_pieces = max_pieces
+        self.width = width
+        self.height = height
+        self.preview_count = max(1, preview_count)
+        self.rotation_system = rotation_system
+        self.num_actions = 8 * width
+        self.game = None
+        self.pieces = 0
+        self._seeds = PieceRNG(seed)
+        self._columns = np.arange(width, dtype=np.uint16)
+
+    def reset(self, seed=None, options=None):
+        """
+        Empieza una partida nueva.
+
+        Args:
+            seed (int): Reinicia la secuencia de semillas de las partidas
+            options (dict): No se usa (compatibilidad con Gymnasium)
+
+        Returns:
+            tuple: (observación, info)
+        """
+        if seed is not None:
+            self._seeds = PieceRNG(seed)
+        self.game = create_game_mode(
+            self.mode, clock=ManualClock(), seed=self._seeds.next_u64() & 0xFFFFFFFF,
+            width=self.width, height=self.height, preview_count=self.preview_count,
+            rotation_system=self.rotation_system)
+        self.game.start()
+        self.pieces = 0
+        return self.observation(), {"seed": self.game.seed}
+
+    def step(self, action):
+        """
+        Coloca la pieza según la acción.
+
+        Returns:
+            tuple: (observación, recompensa, terminated, truncated, info) con info
+                {"lines", "score", "pieces", "invalid"}
+        """
+        lines, reward, invalid = self._play(action)
+        return (self.observation(), float(reward)) + self._status(lines, invalid)
+
+    def _play(self, action):
+        """Aplica la acción; devuelve (líneas, recompensa, no_válida)"""
+        game = self.game
+        hold, rotation, column = decode_action(int(action), self.width)
+        if not self._is_valid(hold, rotation, column):
+            return 0, 0, True
+        piece_type = self._hold_result() if hold else game.piece_type
+        place = (ACTION_PLACE, column - PIECE_GEOMETRY[piece_type][rotation].min_col, rotation)
+        score = game.score
+        events = game.apply_many((ACTION_HOLD, place) if hold else (place,))
+        self.pieces += 1
+        lines = 0
+        for _, kind, value in events:
+            if kind == EVENT_LINES_CLEARED:
+                lines += value
+        return lines, game.score - score, False
+
+    def _status(self, lines, invalid):
+        game = self.game
+        terminated = game.game_over
+        truncated = (not terminated and self.max_pieces is not None
+                     and self.pieces >= self.max_pieces)
+        info = {"lines": lines, "score": game.score, "pieces": self.pieces, "invalid": invalid}
+        return terminated, truncated, info
+
+    def _rows(self):
+        game = self.game
+        if game.use_bitboard:
+            return game.field_rows
+        return [sum(1 << x for x, cell in enumerate(row) if cell != 0) for row in game.field]
+
+    def _hold_result(self):
+        """Pieza que saldría al usar hold"""
+        game = self.game
+        if game.hold_piece_type is None:
+            return game.next_pieces[0]
+        return game.hold_piece_type
+
+    def _is_valid(self, hold, rotation, column):
+        game = self.game
+        if game.game_over:
+            return False
+        if hold:
+            if game.hold_used:
+                return False
+            return _fits(self._rows(), self.width, self.height, self._hold_result(),
+                         rotation, column, 0)
+        return _fits(self._rows(), self.width, self.height, game.piece_type,
+                     rotation, column, game.piece_y)
+
+    def action_mask(self):
+        """
+        Acciones válidas en la posición actual.
+
+        Returns:
+            ndarray: Array de bool de tamaño num_actions
+        """
+        mask = np.zeros(self.num_actions, bool)
+        game = self.game
+        if game.game_over:
+            return mask
+        rows = self._rows()
+        width = self.width
+        choices = [(0, game.piece_type, game.piece_y)]
+        if not game.hold_used:
+            choices.append((1, self._hold_result(), 0))
+        for hold, piece_type, y in choices:
+            for rotation in range(4):
+                base = (hold * 4 + rotation) * width
+                for column in range(width):
+                    mask[base + column] = _fits(rows, width, self.height, piece_type,
+                                                rotation, column, y)
+        return mask
+
+    def observation(self):
+        """Observación de la posición actual (dict de arrays)"""
+        out = _empty_observations(1, self.height, self.width, self.preview_count)
+        self.write_observation(out, 0)
+        return {key: value[0] for key, value in out.items()}
+
+    def write_observation(self, out, index):
+        """Escribe la observación en la posición index de los arrays de out"""
+        game = self.game
+        rows = np.array(self._rows(), np.uint16)
+        out["board"][index] = (rows[:, None] >> self._columns) & 1
+        out["piece"][index] = game.piece_type
+        out["queue"][index] = tuple(game.next_pieces)
+        out["hold"][index] = NUM_PIECES if game.hold_piece_type is None else game.hold_piece_type
+        out["hold_used"][index] = game.hold_used
+
+
+class SyncVectorEnv:
+    """
+    Varios TetrisEnv avanzando a la vez en este proceso.
+
+    step(acciones) devuelve arrays con una fila por entorno. Los entornos que
+    terminan (o se truncan) empiezan otra partida en el mismo paso: la observación
+    es ya la de la partida nueva, e info["score"] y info["pieces"] son los de la
+    que acaba de terminar.
+
+    Args:
+        num_envs (int): Número de entornos
+        seed (int): Semilla; el entorno i usa seed + i (None = aleatoria)
+        **env_kwargs: Opciones de TetrisEnv
+    """
+
+    def __init__(self, num_envs, seed=None, **env_kwargs):
+        self.envs = [
+            TetrisEnv(seed=None if seed is None else seed + index, **env_kwargs)
+            for index in range(num_envs)
+        ]
+        first = self.envs[0]
+        self.num_envs = num_envs
+        self.num_actions = first.num_actions
+        self._observations = _empty_observations(
+            num_envs, first.height, first.width, first.preview_count)
+
+    def reset(self, seed=None, options=None):
+        """
+        Empieza una partida nueva en todos los entornos.
+
+        Returns:
+            tuple: (observaciones, infos)
+        """
+        for index, env in enumerate(self.envs):
+            env.reset(seed=None if seed is None else seed + index)
+            env.write_observation(self._observations, index)
+        return self._copy_observations(), {}
+
+    def step(self, actions):
+        """
+        Aplica una acción en cada entorno.
+
+        Returns:
+            tuple: (observaciones, recompensas, terminated, truncated, infos); infos
+                es un dict de arrays con lines, score, pieces e invalid
+        """
+        count = self.num_envs
+        rewards = np.zeros(count, np.float64)
+        terminated = np.zeros(count, bool)
+        truncated = np.zeros(count, bool)
+        infos = {key: np.zeros(count, dtype) for key, dtype in INFO_DTYPES.items()}
+        observations = self._observations
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            lines, reward, invalid = env._play(action)
+            done, cut, info = env._status(lines, invalid)
+            rewards[index] = reward
+            terminated[index] = done
+            truncated[index] = cut
+            for key, value in info.items():
+                infos[key][index] = value
+            if done or cut:
+                env.reset()
+            env.write_observation(observations, index)
+        return self._copy_observations(), rewards, terminated, truncated, infos
+
+    def action_masks(self):
+        """Acciones válidas de cada entorno: array de bool (num_envs, num_actions)"""
+        return np.stack([env.action_mask() for env in self.envs])
+
+    def close(self):
+        """No hay recursos que liberar (compatibilidad con SubprocVectorEnv)"""
+
+    def _copy_observations(self):
+        return {key: value.copy() for key, value in self._observations.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _subproc_worker(connection, num_envs, seed, env_kwargs):
+    """Bucle de un proceso de SubprocVectorEnv: ejecuta órdenes sobre su SyncVectorEnv"""
+    envs = SyncVectorEnv(num_envs, seed=seed, **env_kwargs)
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == "step":
+                connection.send(envs.step(data))
+            elif command == "reset":
+                connection.send(envs.reset(seed=data))
+            elif command == "mask":
+                connection.send(envs.action_masks())
+            elif command == "close":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        connection.close()
+
+
+class SubprocVectorEnv:
+    """
+    Entornos repartidos entre varios procesos, con la misma interfaz que SyncVectorEnv.
+
+    Cada proceso lleva un bloque de entornos consecutivos (un SyncVectorEnv), así
+    que cada paso cuesta un mensaje por proceso y no uno por entorno. Hay que
+    llamar a close() (o usarlo con with) para terminar los procesos.
+
+    Args:
+        num_envs (int): Número total de entornos
+        num_workers (int): Procesos (por defecto uno por núcleo, sin pasar de num_envs)
+        seed (int): Semilla; el entorno i usa seed + i (None = aleatoria)
+        **env_kwargs: Opciones de TetrisEnv
+    """
+
+    def __init__(self, num_envs, num_workers=None, seed=None, **env_kwargs):
+        num_workers = max(1, min(num_envs, num_workers or multiprocessing.cpu_count() or 1))
+        self.num_envs = num_envs
+        self.num_actions = 8 * env_kwargs.get("width", 10)
+        self._connections = []
+        self._processes = []
+        self._sizes = []
+        start = 0
+        for worker in range(num_workers):
+            size = num_envs // num_workers + (1 if worker < num_envs % num_workers else 0)
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_subproc_worker,
+                args=(child, size, None if seed is None else seed + start, env_kwargs),
+                daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+            self._sizes.append(size)
+            start += size
+        self.closed = False
+
+    def reset(self, seed=None, options=None):
+        """Empieza una partida nueva en todos los entornos; devuelve (observaciones, infos)"""
+        start = 0
+        for connection, size in zip(self._connections, self._sizes):
+            connection.send(("reset", None if seed is None else seed + start))
+            start += size
+        results = [connection.recv() for connection in self._connections]
+        return _concat([observations for observations, _ in results]), {}
+
+    def step(self, actions):
+        """Aplica una acción en cada entorno (ver SyncVectorEnv.step)"""
+        actions = np.asarray(actions)
+        start = 0
+        for connection, size in zip(self._connections, self._sizes):
+            connection.send(("step", actions[start:start + size]))
+            start += size
+        results = [connection.recv() for connection in self._connections]
+        observations, rewards, terminated, truncated, infos = zip(*results)
+        return (_concat(observations), np.concatenate(rewards), np.concatenate(terminated),
+                np.concatenate(truncated), _concat(infos))
+
+    def action_masks(self):
+        """Acciones válidas de cada entorno: array de bool (num_envs, num_actions)"""
+        for connection in self._connections:
+            connection.send(("mask", None))
+        return np.concatenate([connection.recv() for connection in self._connections])
+
+    def close(self):
+        """Termina los procesos"""
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self._connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
+
+
+def _concat(parts):
+    """Une dicts de arrays por su primer eje"""
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+class BatchVectorEnv:
+    """
+    Entornos vectorizados sobre BatchGame: todos los tableros avanzan con operaciones
+    NumPy en un solo paso, sin un bucle de Python por entorno.
+
+    Misma interfaz que SyncVectorEnv, pero con las reglas simplificadas de
+    BatchGame: no hay hold (num_actions = 4 * ancho, y hold siempre vale NUM_PIECES)
+    ni T-spins. Una acción no válida no cambia ese tablero, igual que en TetrisEnv.
+
+    Args:
+        num_envs (int): Número de entornos
+        seed (int): Semilla del lote (None = aleatoria)
+        max_pieces (int): Piezas por partida antes de truncarla (None = sin límite)
+        width (int): Ancho del tablero (como mucho 16)
+        height (int): Alto del tablero
+        preview_count (int): Piezas visibles en la cola
+        randomizer (str): '7bag' o 'random'
+    """
+
+    def __init__(self, num_envs, seed=None, max_pieces=None, width=10, height=20,
+                 preview_count=3, randomizer="7bag"):
+        self.batch = BatchGame(num_envs, width=width, height=height, seed=seed,
+                               randomizer=randomizer, preview_count=preview_count)
+        self.num_envs = num_envs
+        self.num_actions = 4 * width
+        self.max_pieces = max_pieces
+        self._everyone = np.arange(num_envs)
+
+    def reset(self, seed=None, options=None):
+        """Empieza una partida nueva en todos los entornos; devuelve (observaciones, infos)"""
+        if seed is not None:
+            self.batch.rng = np.random.default_rng(seed)
+        self.batch.reset_boards(self._everyone)
+        return self._observations(), {}
+
+    def step(self, actions):
+        """Aplica una acción en cada entorno (ver SyncVectorEnv.step)"""
+        batch = self.batch
+        actions = np.asarray(actions, np.int64)
+        piece_type = batch.piece_type
+        rotation = (actions // batch.width) % 4
+        x = actions % batch.width - batch.tables["min_col"][piece_type, rotation]
+        landing = batch.landing_rows(piece_type, x, rotation, batch.column_tops())
+        valid = landing != NO_LANDING
+
+        score = batch.score.copy()
+        lines = batch.place(x, rotation, active=valid)
+        rewards = (batch.score - score).astype(np.float64)
+        terminated = batch.game_over.copy()
+        truncated = np.zeros(self.num_envs, bool)
+        if self.max_pieces is not None:
+            truncated = ~terminated & (batch.pieces_placed >= self.max_pieces)
+        infos = {
+            "lines": lines,
+            "score": batch.score.copy(),
+            "pieces": batch.pieces_placed.copy(),
+            "invalid": ~valid,
+        }
+        finished = np.nonzero(terminated | truncated)[0]
+        if len(finished):
+            batch.reset_boards(finished)
+        return self._observations(), rewards, terminated, truncated, infos
+
+    def action_masks(self):
+        """Acciones válidas de cada entorno: array de bool (num_envs, num_actions)"""
+        batch = self.batch
+        width = batch.width
+        actions = np.arange(self.num_actions)
+        # Todas las parejas (entorno, acción) en un único cálculo de aterrizaje
+        piece_type = np.repeat(batch.piece_type, self.num_actions)
+        rotation = np.tile(actions // width, self.num_envs)
+        x = np.tile(actions % width, self.num_envs) - batch.tables["min_col"][piece_type, rotation]
+        tops = np.repeat(batch.column_tops(), self.num_actions, axis=0)
+        landing = batch.landing_rows(piece_type, x, rotation, tops)
+        return (landing != NO_LANDING).reshape(self.num_envs, self.num_actions)
+
+    def close(self):
+        """No hay recursos que liberar (compatibilidad con SubprocVectorEnv)"""
+
+    def _observations(self):
+        batch = self.batch
+        return {
+            "board": batch.boards(),
+            "piece": batch.piece_type.copy(),
+            "queue": batch.next_pieces.copy(),
+            "hold": np.full(self.num_envs, NUM_PIECES, np.int64),
+            "hold_used": np.zeros(self.num_envs, np.uint8),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
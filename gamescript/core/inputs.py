@@ -0,0 +1,42 @@
+# inputs.py
+# Entradas del jugador para la simulación por frames (TetrisGame.tick)
+
+# Cada acción es un bit; tick() recibe el conjunto de botones mantenidos en el frame
+# y detecta las pulsaciones nuevas comparándolo con el frame anterior.
+INPUT_LEFT = 1 << 0
+INPUT_RIGHT = 1 << 1
+INPUT_SOFT_DROP = 1 << 2
+INPUT_HARD_DROP = 1 << 3
+INPUT_ROTATE_CW = 1 << 4
+INPUT_ROTATE_CCW = 1 << 5
+INPUT_ROTATE_180 = 1 << 6
+INPUT_HOLD = 1 << 7
+
+# Nombres de las acciones (los mismos que en keybindings.json) y su bit
+INPUT_ACTIONS = {
+    "move_left": INPUT_LEFT,
+    "move_right": INPUT_RIGHT,
+    "soft_drop": INPUT_SOFT_DROP,
+    "hard_drop": INPUT_HARD_DROP,
+    "rotate": INPUT_ROTATE_CW,
+    "rotate_inv": INPUT_ROTATE_CCW,
+    "rotate_180": INPUT_ROTATE_180,
+    "hold": INPUT_HOLD,
+}
+
+# Frames por segundo de la simulación
+FPS = 60
+
+
+def ms_to_frames(ms, fps=FPS):
+    """
+    Convierte una duración en milisegundos a frames (redondeando, mínimo 1).
+
+    Args:
+        ms (float): Duración en milisegundos
+        fps (int): Frames por segundo
+
+    Returns:
+        int: Número de frames
+    """
+    return max(1, int(ms * fps / 1000 + 0.5))
@@ -0,0 +1,46 @@
+# log.py
+# Registro de eventos del núcleo del juego sin efectos secundarios al importar
+
+
+class EngineDebugger:
+    """
+    Proxy con la misma interfaz que debug_utils.Debugger.
+    
+    No registra nada hasta que se le conecta un debugger real con attach(),
+    de modo que el núcleo puede importarse en procesos de simulación sin
+    imprimir en consola ni abrir ficheros de log.
+    """
+    def __init__(self):
+        self.target = None
+    
+    def attach(self, target):
+        """Conecta un debugger real (por ejemplo debug_utils.debugger)"""
+        self.target = target
+    
+    def detach(self):
+        """Desconecta el debugger y vuelve a modo silencioso"""
+        self.target = None
+    
+    def debug(self, message):
+        if self.target is not None:
+            self.target.debug(message)
+    
+    def info(self, message):
+        if self.target is not None:
+            self.target.info(message)
+    
+    def warning(self, message):
+        if self.target is not None:
+            self.target.warning(message)
+    
+    def error(self, message):
+        if self.target is not None:
+            self.target.error(message)
+    
+    def critical(self, message):
+        if self.target is not None:
+            self.target.critical(message)
+
+
+# Instancia global usada por todos los módulos del núcleo
+debugger = EngineDebugger()
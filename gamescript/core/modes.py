@@ -0,0 +1,307 @@
+# modes.py
+# Modos de juego del núcleo (sin dependencias de pygame)
+
+from .engine import TetrisGame
+from .log import debugger
+from .search import BeamSearchPlayer
+
+class ClassicMode(TetrisGame):
+    """Modo clásico de Tetris: el juego continúa hasta que se pierde."""
+    __slots__ = ()
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.mode_name = "Clásico"
+        self.mode_description = "¡Aguanta lo máximo posible!"
+        debugger.debug("Modo clásico iniciado")
+
+class TimeAttackMode(TetrisGame):
+    """Modo contrarreloj: 3 minutos para conseguir la mayor puntuación."""
+    __slots__ = (
+        "time_limit", "start_time", "remaining_time", "is_paused", "paused_at",
+        "pause_total", "time_warnings_played", "pending_time_warnings",
+    )
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.mode_name = "Contrarreloj"
+        self.mode_description = "¡3 minutos para la máxima puntuación!"
+        self.time_limit = 180  # 3 minutos en segundos
+        self.start_time = None
+        self.remaining_time = self.time_limit
+        self.is_paused = False
+        self.paused_at = 0
+        self.pause_total = 0
+        self.time_warnings_played = set()
+        self.pending_time_warnings = []  # Advertencias pendientes de mostrar por la interfaz
+        self.game_over_reason = "¡TIEMPO AGOTADO!"
+        debugger.debug("Modo contrarreloj iniciado")
+    
+    def start(self):
+        """Inicia el temporizador del modo."""
+        self.start_time = self.clock.get_ticks()
+    
+    def pause(self):
+        """Pausa el temporizador."""
+        if not self.is_paused and self.start_time is not None:
+            self.paused_at = self.clock.get_ticks()
+            self.is_paused = True
+            debugger.debug("Modo contrarreloj pausado")
+    
+    def unpause(self):
+        """Reanuda el temporizador."""
+        if self.is_paused and self.start_time is not None:
+            # Añadir el tiempo pausado al total de pausa
+            pause_duration = (self.clock.get_ticks() - self.paused_at) / 1000.0
+            self.pause_total += pause_duration
+            self.is_paused = False
+            debugger.debug(f"Modo contrarreloj reanudado, tiempo pausado: {pause_duration:.2f}s")
+    
+    def update(self):
+        """Actualiza el temporizador y comprueba si se ha acabado el tiempo."""
+        if self.start_time is None or self.is_paused:
+            return
+            
+        # Calcular tiempo transcurrido considerando pausas
+        elapsed = (self.clock.get_ticks() - self.start_time) / 1000.0 - self.pause_total
+        previous_time = self.remaining_time
+        self.remaining_time = max(0, self.time_limit - elapsed)
+        
+        # Comprobar hitos de tiempo para advertencias
+        for time_threshold in [30, 10, 5]:
+            # Comprobar si acabamos de pasar el umbral de tiempo (antes era > threshold, ahora es <= threshold)
+            if previous_time > time_threshold and self.remaining_time <= time_threshold and time_threshold not in self.time_warnings_played:
+                # El sonido y la animación los gestiona la interfaz al leer pop_time_warnings()
+                self.pending_time_warnings.append(time_threshold)
+                
+                # Registrar que hemos emitido esta advertencia
+                self.time_warnings_played.add(time_threshold)
+                debugger.debug(f"Advertencia de tiempo: {time_threshold}s restantes")
+        
+        # Game over cuando se acaba el tiempo
+        if self.remaining_time <= 0 and not self.game_over:
+            self.game_over = True
+            debugger.debug("Tiempo agotado en modo contrarreloj")
+    
+    def clone(self):
+        """Copia la partida incluyendo el estado de las advertencias de tiempo."""
+        new = super().clone()
+        new.time_warnings_played = set(self.time_warnings_played)
+        new.pending_time_warnings = list(self.pending_time_warnings)
+        return new
+    
+    def snapshot(self):
+        """Captura la partida incluyendo el temporizador y sus advertencias."""
+        return super().snapshot()._replace(mode_state=(
+            self.start_time, self.remaining_time, self.is_paused, self.paused_at,
+            self.pause_total, frozenset(self.time_warnings_played),
+            tuple(self.pending_time_warnings),
+        ))
+    
+    def restore(self, snapshot):
+        """Restaura un estado de snapshot() incluyendo el temporizador."""
+        super().restore(snapshot)
+        (self.start_time, self.remaining_time, self.is_paused, self.paused_at,
+         self.pause_total, time_warnings_played, pending_time_warnings) = snapshot.mode_state
+        self.time_warnings_played = set(time_warnings_played)
+        self.pending_time_warnings = list(pending_time_warnings)
+    
+    def pop_time_warnings(self):
+        """Devuelve y vacía la lista de advertencias de tiempo pendientes (en segundos)."""
+        warnings = self.pending_time_warnings
+        self.pending_time_warnings = []
+        return warnings
+    
+    def time_expired(self):
+        """True si se ha agotado el tiempo."""
+        return self.remaining_time <= 0
+    
+    def get_time_str(self):
+        """Devuelve el tiempo restante en formato MM:SS."""
+        minutes = int(self.remaining_time) // 60
+        seconds = int(self.remaining_time) % 60
+        return f"{minutes:02d}:{seconds:02d}"
+    
+    def move_down(self, is_soft_drop=False):
+        """Sobrescribe el método move_down para actualizar el tiempo."""
+        self.update()
+        return super().move_down(is_soft_drop)
+
+class MarathonMode(TetrisGame):
+    """Modo maratón: completa 150 líneas para ganar."""
+    __slots__ = ("target_lines",)
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.mode_name = "Maratón"
+        self.mode_description = "¡Completa 150 líneas!"
+        self.target_lines = 150
+        self.game_won = False
+        self.game_over_reason = "¡COMPLETADO!"
+        debugger.debug("Modo maratón iniciado")
+    
+    def fix_piece(self):
+        """Sobrescribe fix_piece para comprobar si se han completado las líneas objetivo."""
+        result = super().fix_piece()
+        
+        if self.lines_cleared >= self.target_lines and not self.game_won:
+            self.game_won = True
+            self.game_over = True
+            debugger.debug(f"Maratón completada: {self.lines_cleared}/{self.target_lines} líneas")
+        
+        return result
+    
+    def get_progress_str(self):
+        """Devuelve el progreso actual de la maratón."""
+        return f"Líneas: {self.lines_cleared}/{self.target_lines}"
+
+class UltraMode(TetrisGame):
+    """Modo Ultra: consigue la mayor puntuación en 2 minutos."""
+    __slots__ = (
+        "time_limit", "start_time", "remaining_time", "is_paused", "paused_at",
+        "pause_total", "time_warnings_played", "pending_time_warnings", "base_speed",
+    )
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.mode_name = "Ultra"
+        self.mode_description = "¡2 minutos para puntuación máxima!"
+        self.time_limit = 120  # 2 minutos en segundos
+        self.start_time = None
+        self.remaining_time = self.time_limit
+        self.is_paused = False
+        self.paused_at = 0
+        self.pause_total = 0
+        self.time_warnings_played = set()
+        self.pending_time_warnings = []  # Advertencias pendientes de mostrar por la interfaz
+        self.game_over_reason = "¡TIEMPO AGOTADO!"
+        # Aumentar la velocidad base para hacer el modo más desafiante
+        self.base_speed = 800  # Más rápido que el modo clásico
+        debugger.debug("Modo Ultra iniciado")
+    
+    def start(self):
+        """Inicia el temporizador del modo."""
+        self.start_time = self.clock.get_ticks()
+    
+    def pause(self):
+        """Pausa el temporizador."""
+        if not self.is_paused and self.start_time is not None:
+            self.paused_at = self.clock.get_ticks()
+            self.is_paused = True
+            debugger.debug("Modo Ultra pausado")
+    
+    def unpause(self):
+        """Reanuda el temporizador."""
+        if self.is_paused and self.start_time is not None:
+            # Añadir el tiempo pausado al total de pausa
+            pause_duration = (self.clock.get_ticks() - self.paused_at) / 1000.0
+            self.pause_total += pause_duration
+            self.is_paused = False
+            debugger.debug(f"Modo Ultra reanudado, tiempo pausado: {pause_duration:.2f}s")
+    
+    def update(self):
+        """Actualiza el temporizador y comprueba si se ha acabado el tiempo."""
+        if self.start_time is None or self.is_paused:
+            return
+            
+        # Calcular tiempo transcurrido considerando pausas
+        elapsed = (self.clock.get_ticks() - self.start_time) / 1000.0 - self.pause_total
+        previous_time = self.remaining_time
+        self.remaining_time = max(0, self.time_limit - elapsed)
+        
+        # Comprobar hitos de tiempo para advertencias
+        for time_threshold in [30, 10, 5]:
+            # Comprobar si acabamos de pasar el umbral de tiempo (antes era > threshold, ahora es <= threshold)
+            if previous_time > time_threshold and self.remaining_time <= time_threshold and time_threshold not in self.time_warnings_played:
+                # El sonido y la animación los gestiona la interfaz al leer pop_time_warnings()
+                self.pending_time_warnings.append(time_threshold)
+                
+                # Registrar que hemos emitido esta advertencia
+                self.time_warnings_played.add(time_threshold)
+                debugger.debug(f"Advertencia de tiempo: {time_threshold}s restantes")
+        
+        # Game over cuando se acaba el tiempo
+        if self.remaining_time <= 0 and not self.game_over:
+            self.game_over = True
+            debugger.debug("Tiempo agotado en modo Ultra")
+    
+    def clone(self):
+        """Copia la partida incluyendo el estado de las advertencias de tiempo."""
+        new = super().clone()
+        new.time_warnings_played = set(self.time_warnings_played)
+        new.pending_time_warnings = list(self.pending_time_warnings)
+        return new
+    
+    def snapshot(self):
+        """Captura la partida incluyendo el temporizador y sus advertencias."""
+        return super().snapshot()._replace(mode_state=(
+            self.start_time, self.remaining_time, self.is_paused, self.paused_at,
+            self.pause_total, frozenset(self.time_warnings_played),
+            tuple(self.pending_time_warnings),
+        ))
+    
+    def restore(self, snapshot):
+        """Restaura un estado de snapshot() incluyendo el temporizador."""
+        super().restore(snapshot)
+        (self.start_time, self.remaining_time, self.is_paused, self.paused_at,
+         self.pause_total, time_warnings_played, pending_time_warnings) = snapshot.mode_state
+        self.time_warnings_played = set(time_warnings_played)
+        self.pending_time_warnings = list(pending_time_warnings)
+    
+    def pop_time_warnings(self):
+        """Devuelve y vacía la lista de advertencias de tiempo pendientes (en segundos)."""
+        warnings = self.pending_time_warnings
+        self.pending_time_warnings = []
+        return warnings
+    
+    def time_expired(self):
+        """True si se ha agotado el tiempo."""
+        return self.remaining_time <= 0
+    
+    def get_time_str(self):
+        """Devuelve el tiempo restante en formato MM:SS."""
+        minutes = int(self.remaining_time) // 60
+        seconds = int(self.remaining_time) % 60
+        return f"{minutes:02d}:{seconds:02d}"
+    
+    def move_down(self, is_soft_drop=False):
+        """Sobrescribe el método move_down para actualizar el tiempo."""
+        self.update()
+        return super().move_down(is_soft_drop)
+
+class AIMode(TetrisGame):
+    """Modo IA: la partida la juega un bot (demostraciones y pruebas de carga)."""
+    __slots__ = ()
+    
+    def __init__(self, player=None, **kwargs):
+        super().__init__(**kwargs)
+        self.mode_name = "IA"
+        self.mode_description = "¡Mira cómo juega la máquina!"
+        # Por defecto, búsqueda en haz con el presupuesto por jugada de la partida
+        self.ai_player = player if player is not None else BeamSearchPlayer()
+        debugger.debug("Modo IA iniciado")
+
+def create_game_mode(mode_name, **kwargs):
+    """
+    Crea una instancia del modo de juego especificado.
+    
+    Args:
+        mode_name (str): Nombre del modo ('classic', 'time_attack', 'marathon', 'ultra', 'ai')
+        **kwargs: Opciones adicionales para TetrisGame (por ejemplo field_engine)
+        
+    Returns:
+        TetrisGame: Instancia del modo de juego correspondiente
+    """
+    mode_map = {
+        'classic': ClassicMode,
+        'time_attack': TimeAttackMode,
+        'marathon': MarathonMode,
+        'ultra': UltraMode,
+        'ai': AIMode
+    }
+    
+    if mode_name in mode_map:
+        return mode_map[mode_name](**kwargs)
+    else:
+        debugger.warning(f"Modo de juego desconocido: {mode_name}. Usando modo clásico.")
+        return ClassicMode(**kwargs)
\ No newline at end of file
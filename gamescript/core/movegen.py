@@ -0,0 +1,288 @@
+# movegen.py
+# Generador de jugadas: todas las posiciones finales alcanzables por la pieza actual
+
+from collections import OrderedDict, deque, namedtuple
+
+from .actions import (
+    ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_ROTATE_CCW, ACTION_ROTATE_180,
+    ACTION_HARD_DROP, ACTION_SONIC_DROP, ACTION_LOCK, TSPIN_KINDS, TSPIN_NONE,
+)
+from .pieces import PIECE_GEOMETRY
+from .rotation import TURN_CW, TURN_CCW, TURN_180
+
+# Posición final de la pieza y el camino mínimo de acciones (ACTION_*) para llegar a ella
+# desde la posición actual. El camino termina en ACTION_HARD_DROP, o en ACTION_LOCK si la
+# colocación es un spin (el hard drop anula el T-spin, como en la partida normal).
+# spin es TSPIN_NONE, TSPIN_MINI o TSPIN_FULL (solo la pieza T puede hacer spin).
+Placement = namedtuple("Placement", ["x", "y", "rotation", "spin", "path"])
+
+# Resultados recientes indexados por (tablero, pieza, posición inicial, sistema de rotación)
+PLACEMENT_CACHE_SIZE = 4096
+_placement_cache = OrderedDict()
+
+PIECE_T = 5
+
+
+def _compile_shape_keys():
+    """
+    Identificador de la forma ocupada por cada rotación, independiente de la posición.
+
+    Rotaciones distintas que ocupan las mismas celdas (O, y las parejas de I, S y Z)
+    comparten identificador, así no se devuelven colocaciones repetidas.
+    """
+    keys = []
+    for rotations in PIECE_GEOMETRY:
+        keys.append(tuple(
+            tuple((row - geometry.min_row, mask) for row, mask in geometry.row_masks)
+            for geometry in rotations
+        ))
+    return tuple(keys)
+
+
+SHAPE_KEYS = _compile_shape_keys()
+
+
+def generate_placements(game):
+    """
+    Enumera todas las posiciones en las que la pieza actual puede quedar fijada.
+
+    Hace una búsqueda en anchura sobre los estados (x, y, rotación) usando
+    desplazamientos, giros con los kicks del sistema de rotación de la partida y
+    caídas hasta el suelo (ACTION_SONIC_DROP), así que incluye tucks y spins.
+    Cada posición se devuelve una sola vez con el camino más corto; en la pieza T
+    se distinguen además las variantes con y sin T-spin.
+
+    Args:
+        game (TetrisGame): Partida de la que se toma el tablero y la pieza actual
+
+    Returns:
+        tuple: Placement ordenados por longitud del camino
+    """
+    if game.use_bitboard:
+        rows = tuple(game.field_rows)
+    else:
+        rows = tuple(
+            sum(1 << x for x, cell in enumerate(row) if cell != 0) for row in game.field
+        )
+    key = (rows, game.piece_type, game.piece_x, game.piece_y, game.rotation, game.rotation_system)
+    cached = _placement_cache.get(key)
+    if cached is not None:
+        _placement_cache.move_to_end(key)
+        return cached
+
+    placements = _search(
+        rows, game.piece_type, game.piece_x, game.piece_y, game.rotation,
+        game.rotation_system, game.width, game.height, game.classify_tspin)
+    _placement_cache[key] = placements
+    if len(_placement_cache) > PLACEMENT_CACHE_SIZE:
+        _placement_cache.popitem(last=False)
+    return placements
+
+
+def generate_positions(rows, piece_type, x, y, rotation, rotation_system, width, height):
+    """
+    Como generate_placements(), pero sobre un tablero de máscaras de bits y sin partida.
+
+    No distingue T-spins (spin vale siempre TSPIN_NONE) ni usa la caché; sirve para
+    búsquedas que exploran tableros hipotéticos, como el buscador de perfect clears.
+
+    Args:
+        rows (tuple): Máscara de bits de cada fila (bit x = columna x)
+        piece_type (int): Pieza a colocar
+        x, y, rotation (int): Posición de partida de la pieza
+        rotation_system (RotationSystem): Sistema de rotación con sus kicks
+        width (int): Ancho del tablero
+        height (int): Alto del tablero
+
+    Returns:
+        tuple: Placement ordenados por longitud del camino
+    """
+    return _search(rows, piece_type, x, y, rotation, rotation_system, width, height, None)
+
+
+def clear_placement_cache():
+    """Vacía la caché de resultados de generate_placements()"""
+    _placement_cache.clear()
+
+
+# Desplazamientos para indexar máscaras con x e y negativas (la pieza puede asomar
+# por encima del tablero, las matrices de las piezas tienen columnas vacías y los
+# kicks desplazan hasta dos celdas)
+_ROW_OFFSET = 6
+_COLUMN_OFFSET = 6
+
+# Los estados (x, y, rotación) se codifican en un entero para la búsqueda
+_X_BITS = 6
+_Y_BITS = 6
+_X_MASK = (1 << _X_BITS) - 1
+_Y_MASK = (1 << _Y_BITS) - 1
+
+
+def _collision_masks(geometries, rows, width, height):
+    """
+    Precalcula, para cada rotación y columna, las filas en las que la pieza choca.
+
+    masks[rotación][x + _COLUMN_OFFSET] tiene el bit (y + _ROW_OFFSET) activo si la
+    pieza no cabe en (x, y): por un bloque del tablero o por salirse por abajo.
+    Con ello comprobar una posición o buscar dónde aterriza son operaciones de bits.
+    """
+    # Ocupación por columnas: bit (y + _ROW_OFFSET) si la celda (x, y) está ocupada
+    columns = [0] * width
+    for y, bits in enumerate(rows):
+        while bits:
+            lowest = bits & -bits
+            columns[lowest.bit_length() - 1] |= 1 << (y + _ROW_OFFSET)
+            bits ^= lowest
+
+    masks = []
+    for geometry in geometries:
+        # Posiciones con la pieza por debajo del suelo
+        floor = -1 << (height - geometry.max_row + _ROW_OFFSET)
+        by_column = []
+        for x in range(-_COLUMN_OFFSET, width + _COLUMN_OFFSET):
+            if x + geometry.min_col < 0 or x + geometry.max_col >= width:
+                by_column.append(-1)  # Fuera del tablero en todas las filas
+                continue
+            mask = floor
+            for col, row, _ in geometry.cells:
+                mask |= columns[x + col] >> row
+            by_column.append(mask)
+        masks.append(by_column)
+    return masks
+
+
+def _search(rows, piece_type, piece_x, piece_y, piece_rotation, rotation_system, width, height,
+            classify_tspin):
+    # Sin clasificador de T-spins la T se trata como cualquier otra pieza
+    is_t_piece = piece_type == PIECE_T and classify_tspin is not None
+    geometries = PIECE_GEOMETRY[piece_type]
+    shape_keys = SHAPE_KEYS[piece_type]
+    masks = _collision_masks(geometries, rows, width, height)
+
+    # Giros posibles desde cada rotación: (acción, rotación destino, kicks)
+    turns = [(ACTION_ROTATE_CW, TURN_CW), (ACTION_ROTATE_CCW, TURN_CCW)]
+    if rotation_system.allows_180:
+        turns.append((ACTION_ROTATE_180, TURN_180))
+    kicks = rotation_system.kicks[piece_type]
+    rotations = tuple(
+        tuple((action, (rotation + turn) % 4, kicks[rotation][turn]) for action, turn in turns)
+        for rotation in range(4)
+    )
+
+    start_x = piece_x + _COLUMN_OFFSET
+    start_y = piece_y + _ROW_OFFSET
+    if (start_x < 0 or start_y < 0 or start_x >= len(masks[0])
+            or (masks[piece_rotation][start_x] >> start_y) & 1):
+        return ()
+    # Estado codificado: rotación | y | x, con los desplazamientos ya aplicados
+    start = (((piece_rotation << _Y_BITS) | start_y) << _X_BITS) | start_x
+
+    parents = {start: None}  # estado -> (estado anterior, acción)
+    found = {}  # identificador de la posición final -> (estado, acción final, estado anterior)
+    queue = deque([start])
+    push = queue.append
+    while queue:
+        state = queue.popleft()
+        x = state & _X_MASK
+        y = (state >> _X_BITS) & _Y_MASK
+        rotation = state >> (_X_BITS + _Y_BITS)
+        rotation_masks = masks[rotation]
+        # Filas bloqueadas por debajo de la pieza; el bit 0 es la fila siguiente
+        below = rotation_masks[x] >> (y + 1)
+
+        if below & 1:
+            # Posición de reposo. La T solo se anota aquí si no se ha movido: si no,
+            # la variante sin spin sale de los desplazamientos que llegan a ella (el
+            # primer camino que la alcanzó puede acabar en un giro)
+            if not is_t_piece or parents[state] is None:
+                geometry = geometries[rotation]
+                final_key = (shape_keys[rotation], x + geometry.min_col, y + geometry.min_row, TSPIN_NONE)
+                if final_key not in found:
+                    found[final_key] = (state, None, None)
+        else:
+            # Caída hasta el primer bloqueo
+            drop = (below & -below).bit_length() - 1
+            new_state = state + (drop << _X_BITS)
+            if new_state not in parents:
+                parents[new_state] = (state, ACTION_SONIC_DROP)
+                push(new_state)
+            if is_t_piece:
+                _add_resting(found, new_state, ACTION_SONIC_DROP, state, geometries, shape_keys)
+
+        if not (rotation_masks[x - 1] >> y) & 1:
+            new_state = state - 1
+            if new_state not in parents:
+                parents[new_state] = (state, ACTION_LEFT)
+                push(new_state)
+            if is_t_piece and (rotation_masks[x - 1] >> (y + 1)) & 1:
+                _add_resting(found, new_state, ACTION_LEFT, state, geometries, shape_keys)
+        if not (rotation_masks[x + 1] >> y) & 1:
+            new_state = state + 1
+            if new_state not in parents:
+                parents[new_state] = (state, ACTION_RIGHT)
+                push(new_state)
+            if is_t_piece and (rotation_masks[x + 1] >> (y + 1)) & 1:
+                _add_resting(found, new_state, ACTION_RIGHT, state, geometries, shape_keys)
+
+        for action, new_rotation, rotation_kicks in rotations[rotation]:
+            new_masks = masks[new_rotation]
+            for dx, dy in rotation_kicks:
+                new_x = x + dx
+                new_y = y + dy
+                if new_y < 0 or (new_masks[new_x] >> new_y) & 1:
+                    continue
+                new_state = (((new_rotation << _Y_BITS) | new_y) << _X_BITS) | new_x
+                if new_state not in parents:
+                    parents[new_state] = (state, action)
+                    push(new_state)
+                if is_t_piece and (new_masks[new_x] >> (new_y + 1)) & 1:
+                    # Giro que deja la T apoyada: al fijarla cuenta como spin
+                    board_x = new_x - _COLUMN_OFFSET
+                    board_y = new_y - _ROW_OFFSET
+                    spin = TSPIN_KINDS[classify_tspin(board_x, board_y, new_rotation, (dx, dy))]
+                    geometry = geometries[new_rotation]
+                    final_key = (shape_keys[new_rotation], new_x + geometry.min_col,
+                                 new_y + geometry.min_row, spin)
+                    if final_key not in found:
+                        found[final_key] = (new_state, action, state)
+                break
+
+    placements = []
+    for final_key, (state, last_action, previous) in found.items():
+        if last_action is None:
+            path = _build_path(parents, state)
+        else:
+            path = _build_path(parents, previous) + [last_action]
+        path.append(ACTION_LOCK if final_key[3] != TSPIN_NONE else ACTION_HARD_DROP)
+        placements.append(Placement(
+            (state & _X_MASK) - _COLUMN_OFFSET,
+            ((state >> _X_BITS) & _Y_MASK) - _ROW_OFFSET,
+            state >> (_X_BITS + _Y_BITS),
+            final_key[3],
+            tuple(path),
+        ))
+    placements.sort(key=lambda placement: len(placement.path))
+    return tuple(placements)
+
+
+def _add_resting(found, state, action, previous, geometries, shape_keys):
+    """Anota la T en reposo en state, alcanzada con un desplazamiento: sin spin"""
+    x = state & _X_MASK
+    y = (state >> _X_BITS) & _Y_MASK
+    rotation = state >> (_X_BITS + _Y_BITS)
+    geometry = geometries[rotation]
+    final_key = (shape_keys[rotation], x + geometry.min_col, y + geometry.min_row, TSPIN_NONE)
+    if final_key not in found:
+        found[final_key] = (state, action, previous)
+
+
+def _build_path(parents, state):
+    """Reconstruye la lista de acciones desde el estado inicial hasta state"""
+    path = []
+    link = parents[state]
+    while link is not None:
+        state, action = link
+        path.append(action)
+        link = parents[state]
+    path.reverse()
+    return path
@@ -0,0 +1,561 @@
+# openings.py
+# Libro de aperturas: jugadas precalculadas para la primera bolsa de piezas
+#
+# Construcción: python -m gamescript.core.openings --output assets/openings.bin
+#
+# Cada apertura es una plantilla (las celdas que ocupa cada pieza al terminar) y su
+# versión reflejada. Para cada una de las 5040 órdenes posibles de la primera bolsa se
+# decide, con el generador de jugadas, en qué orden colocar las piezas y cuándo usar
+# hold. Las decisiones solo usan lo que el jugador ve en ese momento (pieza actual,
+# hold y cola), así que son las mismas para todos los órdenes que aún no se distinguen.
+#
+# El libro es una tabla hash de direccionamiento abierto guardada tal cual en el
+# fichero: cada posición del tablero con sus piezas visibles se resume con las claves
+# de Zobrist y se busca en O(1) sin convertir el fichero al cargarlo.
+
+import argparse
+import itertools
+import os
+import struct
+import sys
+import time
+from multiprocessing import Pool
+
+from .actions import ACTION_HOLD, TSPIN_NONE, TSPIN_FULL
+from .clock import ManualClock
+from .engine import TetrisGame
+from .log import debugger
+from .movegen import generate_placements
+from .pieces import PIECE_GEOMETRY
+from .randomizer import NUM_PIECES, PIECE_T, SevenBagRandomizer
+from .rotation import get_rotation_system
+
+# Fichero del libro que usa el juego (relativo a la carpeta del juego, como los assets)
+OPENING_BOOK_PATH = "assets/openings.bin"
+
+OPENING_BOOK_MAGIC = b"PTOB"
+OPENING_BOOK_VERSION = 1
+
+# Letras de las plantillas -> índice de pieza (orden de SHAPES)
+PIECE_LETTERS = "ZSJOITL"
+
+# Pieza reflejada (Z <-> S, J <-> L)
+MIRRORED_PIECE = {"Z": "S", "S": "Z", "J": "L", "L": "J", "O": "O", "I": "I", "T": "T"}
+
+# Plantillas de apertura: (nombre, filas de arriba abajo, la T debe hacer T-spin).
+# Cada letra es una pieza de la primera bolsa; las piezas que no aparecen se quedan
+# en hold o en la cola. Se prueban en este orden y cada una también reflejada.
+OPENING_TEMPLATES = (
+    # T-spin doble al final de la primera bolsa con la O colgada sobre el hueco (estilo TKI)
+    ("tki", (
+        "...OO..Z..",
+        "L..OO.ZZ..",
+        "LTTTSSZJJJ",
+        "LLTSSIIIIJ",
+    ), True),
+    ("tsd", (
+        "..S..OO...",
+        "..SS.OO..J",
+        "LLLSZZTTTJ",
+        "LIIIIZZTJJ",
+    ), True),
+    ("tsd-b", (
+        ".......J..",
+        "L..ZZ.SJJJ",
+        "LTTTZZSSOO",
+        "LLTIIIISOO",
+    ), True),
+    ("tsd-c", (
+        "..OO...S..",
+        "J.OO...SS.",
+        "JJJZZTTTSL",
+        "IIIIZZTLLL",
+    ), True),
+    # Montajes de perfect clear de 4 filas con la T en hold (estilo PCO): la segunda
+    # bolsa completa las 16 celdas que quedan
+    ("pco", (
+        "OOS.......",
+        "OOSS.....J",
+        "LLLSZZ...J",
+        "LIIIIZZ.JJ",
+    ), False),
+    ("pco-b", (
+        "JJ.......Z",
+        "JOO.....ZZ",
+        "JOO...SSZL",
+        "IIII.SSLLL",
+    ), False),
+)
+
+# Entrada de la tabla: clave, x, y, flags (hold | rotación << 1 | spin << 3), plantilla
+_SLOT = struct.Struct("<QbbBB")
+_HEADER = struct.Struct("<4sBBBBBI")
+
+
+class OpeningTemplate:
+    """
+    Montaje de apertura: celdas finales de cada pieza.
+
+    Args:
+        name (str): Nombre de la apertura
+        rows (tuple): Filas de la plantilla de arriba abajo, con la letra de la pieza que
+            ocupa cada celda ('.' vacía); la última fila es la del fondo del tablero
+        tspin (bool): Si la T debe colocarse con un T-spin completo
+    """
+
+    def __init__(self, name, rows, tspin=False):
+        self.name = name
+        self.rows = tuple(rows)
+        self.tspin = tspin
+
+    def mirrored(self):
+        """La misma apertura al otro lado del tablero"""
+        rows = tuple("".join(MIRRORED_PIECE.get(cell, cell) for cell in reversed(row))
+                     for row in self.rows)
+        return OpeningTemplate(self.name + "-mirror", rows, self.tspin)
+
+    def targets(self, width, height):
+        """
+        Celdas de cada pieza en coordenadas del tablero.
+
+        Returns:
+            dict: pieza -> frozenset de (x, y)
+        """
+        cells = {}
+        top = height - len(self.rows)
+        for row_index, row in enumerate(self.rows):
+            if len(row) != width:
+                raise ValueError(f"La plantilla {self.name} no tiene {width} columnas")
+            for x, letter in enumerate(row):
+                if letter != ".":
+                    cells.setdefault(PIECE_LETTERS.index(letter), set()).add((x, top + row_index))
+        for piece_type, piece_cells in cells.items():
+            if len(piece_cells) != 4:
+                raise ValueError(f"La plantilla {self.name} tiene {len(piece_cells)} celdas "
+                                 f"de la pieza {PIECE_LETTERS[piece_type]}")
+        return {piece_type: frozenset(piece_cells) for piece_type, piece_cells in cells.items()}
+
+
+def opening_templates():
+    """Plantillas en orden de preferencia, cada una seguida de su reflejo"""
+    templates = []
+    for name, rows, tspin in OPENING_TEMPLATES:
+        template = OpeningTemplate(name, rows, tspin)
+        templates.extend((template, template.mirrored()))
+    return templates
+
+
+def opening_key(game):
+    """
+    Clave del libro para la posición de la partida, o None si ya no es de apertura.
+
+    Combina el hash del tablero con la pieza actual, la de hold y las piezas de la cola
+    que pertenecen a la primera bolsa (las de la segunda aún no se conocen al construir
+    el libro). Las piezas sacadas hasta la actual se deducen de pieces_placed y de si
+    hay pieza en hold.
+    """
+    if game.hold_used or game.pieces_placed >= NUM_PIECES:
+        return None
+    zobrist = game.zobrist
+    hold = game.hold_piece_type
+    current = game.pieces_placed + (hold is not None)  # Posición de la pieza actual en la bolsa
+    key = game.field_hash
+    if current < NUM_PIECES:
+        key ^= zobrist.piece[game.piece_type]
+    if hold is not None:
+        key ^= zobrist.hold[hold]
+    for index, piece_type in enumerate(game.next_pieces):
+        if current + 1 + index >= NUM_PIECES:
+            break
+        key ^= zobrist.queue[index][piece_type]
+    return key
+
+
+class OpeningBook:
+    """
+    Libro de aperturas cargado de un fichero creado con build_opening_book().
+
+    Solo se usa en partidas con las mismas reglas con las que se construyó: tamaño
+    del tablero, piezas en la cola, sistema de rotación y generador 7-bag.
+
+    Args:
+        data (bytes): Contenido del fichero
+    """
+
+    def __init__(self, data):
+        magic, version, self.width, self.height, self.preview_count, name_length, \
+            self.table_size = _HEADER.unpack_from(data, 0)
+        if magic != OPENING_BOOK_MAGIC or version != OPENING_BOOK_VERSION:
+            raise ValueError("No es un libro de aperturas de esta versión")
+        offset = _HEADER.size
+        self.rotation_system = data[offset:offset + name_length].decode("ascii")
+        offset += name_length
+        names = []
+        for _ in range(data[offset]):
+            length = data[offset + 1]
+            names.append(data[offset + 2:offset + 2 + length].decode("ascii"))
+            offset += 1 + length
+        self.names = tuple(names)
+        self._table_offset = offset + 1
+        self._data = data
+        self._mask = self.table_size - 1
+
+    @classmethod
+    def load(cls, path=OPENING_BOOK_PATH):
+        """Carga el libro de path, o devuelve None (con un aviso) si no se puede"""
+        try:
+            with open(path, "rb") as file:
+                return cls(file.read())
+        except (OSError, ValueError, struct.error) as e:
+            debugger.warning(f"No se puede cargar el libro de aperturas {path}: {e}")
+            return None
+
+    def matches(self, game):
+        """Si la partida usa las reglas con las que se construyó el libro"""
+        return (game.width == self.width and game.height == self.height
+                and game.preview_count == self.preview_count
+                and game.rotation_system.name == self.rotation_system
+                and game.randomizer_type == SevenBagRandomizer.name)
+
+    def entry(self, game):
+        """
+        Jugada del libro para la posición actual.
+
+        Returns:
+            tuple: (usa_hold, x, y, rotación, spin, nombre de la apertura) o None
+        """
+        key = opening_key(game)
+        if key is None or not key or not self.matches(game):
+            return None
+        data = self._data
+        slot = key & self._mask
+        while True:
+            stored, x, y, flags, template = _SLOT.unpack_from(
+                data, self._table_offset + slot * _SLOT.size)
+            if stored == key:
+                return bool(flags & 1), x, y, (flags >> 1) & 3, flags >> 3, self.names[template]
+            if not stored:
+                return None
+            slot = (slot + 1) & self._mask
+
+    def lookup(self, game, use_hold=True):
+        """
+        Colocación del libro para la pieza actual, con el camino desde donde está.
+
+        Args:
+            game (TetrisGame): Partida (no se modifica)
+            use_hold (bool): Si se aceptan jugadas que empiezan con hold
+
+        Returns:
+            Placement: Como los de generate_placements (con ACTION_HOLD al principio
+                del camino si hay que cambiar de pieza) o None si no hay jugada
+        """
+        entry = self.entry(game)
+        if entry is None:
+            return None
+        uses_hold, x, y, rotation, spin, _ = entry
+        if uses_hold:
+            if not use_hold:
+                return None
+            piece_type = game.hold_piece_type
+            if piece_type is None:
+                piece_type = game.next_pieces[0]
+            placements = _placements_from_spawn(game, piece_type)
+        else:
+            placements = generate_placements(game)
+        for placement in placements:
+            if (placement.x, placement.y, placement.rotation, placement.spin) == (x, y, rotation, spin):
+                if uses_hold:
+                    placement = placement._replace(path=(ACTION_HOLD,) + placement.path)
+                return placement
+        return None
+
+
+def _placements_from_spawn(game, piece_type):
+    """Colocaciones de piece_type saliendo desde su posición de aparición"""
+    saved = (game.piece_type, game.piece_x, game.piece_y, game.rotation)
+    game.piece_type = piece_type
+    game.piece_x = game.spawn_columns[piece_type]
+    game.piece_y = 0
+    game.rotation = 0
+    try:
+        return generate_placements(game)
+    finally:
+        game.piece_type, game.piece_x, game.piece_y, game.rotation = saved
+
+
+class _BookBuilder:
+    """
+    Búsqueda de las decisiones de un grupo de órdenes de la bolsa con el mismo comienzo
+    visible (pieza actual y cola).
+
+    Es una búsqueda Y/O: en cada pieza se elige colocarla o usar hold y en qué celdas
+    (O), y la jugada tiene que servir para todas las piezas que pueden salir después
+    (Y). Cada nodo lleva las plantillas que siguen siendo compatibles con el tablero,
+    así que una apertura puede decidirse tarde. Se queda la opción con la que más
+    órdenes terminan alguna plantilla (con empate, la que termina la preferida).
+    """
+
+    def __init__(self, width, height, preview_count, rotation_system):
+        self.preview_count = preview_count
+        self.full_row_mask = (1 << width) - 1
+        self.game = TetrisGame(width, height, clock=ManualClock(), seed=0,
+                               preview_count=preview_count, rotation_system=rotation_system)
+        self.templates = opening_templates()
+        self.targets = [template.targets(width, height) for template in self.templates]
+
+    def solve_group(self, prefix):
+        """
+        Decisiones para los órdenes que empiezan por prefix.
+
+        Returns:
+            tuple: (dict plantilla -> órdenes que la completan, órdenes del grupo,
+                dict clave -> (hold, x, y, rotación, spin, plantilla))
+        """
+        remaining = [piece for piece in range(NUM_PIECES) if piece not in prefix]
+        perms = [prefix + rest for rest in itertools.permutations(remaining)]
+        game = self.game.clone()
+        self._prepare(game, perms[0], 0, None, len(prefix))
+        candidates = tuple(enumerate(self.targets))
+        _, finished, entries = self._solve(game, candidates, 0, None, len(prefix), perms)
+        return finished, len(perms), entries
+
+    def _prepare(self, game, bag, current, hold, drawn):
+        """Pone en la partida la pieza actual, el hold y la cola según las posiciones en la bolsa"""
+        game.piece_type = bag[current] if current < NUM_PIECES else 0
+        game.piece_x = game.spawn_columns[game.piece_type]
+        game.piece_y = 0
+        game.rotation = 0
+        game.hold_piece_type = None
+        if hold is not None:
+            game.hold_piece_type = bag[hold] if hold < NUM_PIECES else 0
+        game.hold_used = False
+        game.next_pieces.clear()
+        game.next_pieces.extend(bag[index] if index < NUM_PIECES else 0
+                                for index in range(drawn - self.preview_count, drawn))
+
+    def _solve(self, game, candidates, current, hold, drawn, perms):
+        """
+        Args:
+            game (TetrisGame): Partida con la posición del nodo
+            candidates (tuple): (plantilla, celdas de las piezas que le faltan) compatibles
+            current (int): Posición en la bolsa de la pieza actual
+            hold (int): Posición en la bolsa de la pieza en hold (None si está vacío)
+            drawn (int): Piezas sacadas hasta ahora (la actual, hold y cola incluidas)
+            perms (list): Órdenes de la bolsa compatibles con lo visible
+
+        Returns:
+            tuple: (puntuación, dict plantilla -> órdenes que la completan, entradas del libro)
+        """
+        for template, targets in candidates:
+            if not targets:
+                return self._score(template, len(perms)), {template: len(perms)}, {}
+        bag = perms[0]
+        choices = [(False, current, hold, drawn)]
+        if hold is None:
+            choices.append((True, drawn - self.preview_count, current, drawn + 1))
+        else:
+            choices.append((True, hold, current, drawn))
+
+        best = None
+        for uses_hold, piece_index, next_hold, next_drawn in choices:
+            if piece_index >= NUM_PIECES:
+                continue
+            piece_type = bag[piece_index]
+            # Plantillas agrupadas por las celdas donde quieren esta pieza
+            options = {}
+            for template, targets in candidates:
+                cells = targets.get(piece_type)
+                if cells is not None:
+                    tspin = piece_type == PIECE_T and self.templates[template].tspin
+                    options.setdefault((cells, tspin), []).append((template, targets))
+
+            for (cells, tspin), matching in options.items():
+                placement = self._find(game, piece_type, cells, tspin)
+                if placement is None:
+                    continue
+                result = self._expand(game, placement, piece_type, cells, matching,
+                                      next_hold, next_drawn, drawn, perms)
+                if result is None:
+                    continue
+                if best is None or result[0] > best[0]:
+                    best = result + ((uses_hold, placement.x, placement.y, placement.rotation,
+                                      placement.spin, matching[0][0]),)
+
+        if best is None:
+            return 0, {}, {}
+        score, finished, entries, entry = best
+        key = opening_key(game)
+        if key:  # 0 marca las posiciones vacías de la tabla
+            entries[key] = entry
+        return score, finished, entries
+
+    def _expand(self, game, placement, piece_type, cells, matching, next_hold, next_drawn,
+                drawn, perms):
+        """Aplica la colocación y resuelve cada grupo de órdenes según las piezas que salen"""
+        child = game.clone()
+        child.hold_piece_type = None
+        if next_hold is not None:
+            # Al cambiar la última pieza puede quedar en hold una de la segunda bolsa
+            child.hold_piece_type = perms[0][next_hold] if next_hold < NUM_PIECES else 0
+        child.piece_type = piece_type
+        child.piece_x = child.spawn_columns[piece_type]
+        child.piece_y = 0
+        child.rotation = 0
+        child.apply_many(placement.path)
+        if child.game_over:
+            return None
+        candidates = tuple((template, self._remaining(game, targets, piece_type, cells))
+                           for template, targets in matching)
+
+        child_current = next_drawn - self.preview_count
+        child_drawn = next_drawn + 1
+        groups = {}
+        for perm in perms:
+            revealed = tuple(perm[index] for index in range(drawn, min(child_drawn, NUM_PIECES)))
+            groups.setdefault(revealed, []).append(perm)
+        score = 0
+        finished = {}
+        entries = {}
+        for group in groups.values():
+            node = child.clone() if len(groups) > 1 else child
+            self._prepare(node, group[0], child_current, next_hold, child_drawn)
+            group_score, group_finished, group_entries = self._solve(
+                node, candidates, child_current, next_hold, child_drawn, group)
+            score += group_score
+            for template, count in group_finished.items():
+                finished[template] = finished.get(template, 0) + count
+            entries.update(group_entries)
+        return score, finished, entries
+
+    def _score(self, template, count):
+        """Cada orden que completa una plantilla vale 1 (un poco más si es de las preferidas)"""
+        return count * (1 + (len(self.templates) - template) / (1000 * len(self.templates)))
+
+    def _find(self, game, piece_type, cells, tspin):
+        """Colocación alcanzable de piece_type que ocupa exactamente cells (None si no hay)"""
+        found = None
+        for placement in _placements_from_spawn(game, piece_type):
+            geometry = PIECE_GEOMETRY[piece_type][placement.rotation]
+            if {(placement.x + col, placement.y + row) for col, row, _ in geometry.cells} != cells:
+                continue
+            if tspin:
+                if placement.spin == TSPIN_FULL:
+                    return placement
+            elif found is None or (found.spin != TSPIN_NONE and placement.spin == TSPIN_NONE):
+                found = placement
+        return found
+
+    def _remaining(self, game, targets, piece_type, cells):
+        """Celdas de las piezas que faltan, bajadas por las líneas que elimina esta colocación"""
+        rows = list(game.field_rows)
+        for x, y in cells:
+            rows[y] |= 1 << x
+        cleared = [y for y, bits in enumerate(rows) if bits == self.full_row_mask]
+        remaining = {}
+        for other, other_cells in targets.items():
+            if other != piece_type:
+                remaining[other] = frozenset(
+                    (x, y + sum(1 for row in cleared if row > y)) for x, y in other_cells)
+        return remaining
+
+
+_builder = None
+
+
+def _solve_group_task(task):
+    """Tarea del pool: resuelve un grupo (el constructor se crea una vez por proceso)"""
+    global _builder
+    prefix, width, height, preview_count, rotation_system = task
+    if _builder is None:
+        _builder = _BookBuilder(width, height, preview_count, rotation_system)
+    return _builder.solve_group(prefix)
+
+
+def build_opening_book(width=10, height=20, preview_count=3, rotation_system="srs",
+                       workers=None, on_progress=None):
+    """
+    Calcula el libro para todos los órdenes de la primera bolsa, repartido entre procesos.
+
+    Args:
+        width (int): Ancho del tablero
+        height (int): Alto del tablero
+        preview_count (int): Piezas visibles en la cola
+        rotation_system (str): Sistema de rotación
+        workers (int): Procesos del pool (por defecto, uno por núcleo)
+        on_progress (callable): Se llama con (grupos hechos, grupos totales)
+
+    Returns:
+        tuple: (dict clave -> entrada, órdenes por plantilla (índice o None -> número))
+    """
+    prefixes = list(itertools.permutations(range(NUM_PIECES), min(NUM_PIECES, 1 + preview_count)))
+    tasks = [(prefix, width, height, preview_count, rotation_system) for prefix in prefixes]
+    entries = {}
+    coverage = {}
+    with Pool(workers or os.cpu_count() or 1) as pool:
+        for done, (finished, total, group_entries) in enumerate(
+                pool.imap_unordered(_solve_group_task, tasks, chunksize=4), 1):
+            entries.update(group_entries)
+            for template, count in finished.items():
+                coverage[template] = coverage.get(template, 0) + count
+            coverage[None] = coverage.get(None, 0) + total - sum(finished.values())
+            if on_progress is not None:
+                on_progress(done, len(tasks))
+    return entries, coverage
+
+
+def write_opening_book(path, entries, width=10, height=20, preview_count=3, rotation_system="srs"):
+    """Guarda las entradas como tabla hash de sondeo lineal (ocupación de como mucho 3/4)"""
+    table_size = 1
+    while 3 * table_size < 4 * len(entries):
+        table_size *= 2
+    table = bytearray(table_size * _SLOT.size)
+    mask = table_size - 1
+    for key, (uses_hold, x, y, rotation, spin, template) in entries.items():
+        slot = key & mask
+        while _SLOT.unpack_from(table, slot * _SLOT.size)[0]:
+            slot = (slot + 1) & mask
+        _SLOT.pack_into(table, slot * _SLOT.size, key, x, y,
+                        int(uses_hold) | rotation << 1 | spin << 3, template)
+
+    name = get_rotation_system(rotation_system).name.encode("ascii")
+    names = [template.name.encode("ascii") for template in opening_templates()]
+    header = _HEADER.pack(OPENING_BOOK_MAGIC, OPENING_BOOK_VERSION, width, height,
+                          preview_count, len(name), table_size)
+    with open(path, "wb") as file:
+        file.write(header + name + bytes([len(names)]))
+        for template_name in names:
+            file.write(bytes([len(template_name)]) + template_name)
+        file.write(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m gamescript.core.openings",
+        description="Construye el libro de aperturas para todos los órdenes de la primera bolsa.")
+    parser.add_argument("--output", default=OPENING_BOOK_PATH, help="Fichero del libro")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--rotation-system", default="srs", help="srs, srs+, ars o nes")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def on_progress(done, total):
+        if done % 20 == 0 or done == total:
+            print(f"\r{done}/{total} grupos", end="", file=sys.stderr, flush=True)
+
+    entries, coverage = build_opening_book(rotation_system=args.rotation_system,
+                                           workers=args.workers, on_progress=on_progress)
+    print(file=sys.stderr)
+    write_opening_book(args.output, entries, rotation_system=args.rotation_system)
+    templates = opening_templates()
+    for template, count in sorted(coverage.items(), key=lambda item: -item[1]):
+        name = templates[template].name if template is not None else "(sin apertura)"
+        print(f"{name:<20}{count:>6} órdenes")
+    print(f"{len(entries)} posiciones en {os.path.getsize(args.output)} bytes "
+          f"({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
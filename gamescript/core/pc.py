@@ -0,0 +1,269 @@
+# pc.py
+# Buscador de perfect clears: secuencias de colocaciones que dejan el tablero vacío
+
+import time
+from collections import OrderedDict
+
+from .actions import ACTION_HOLD
+from .movegen import SHAPE_KEYS, generate_positions
+from .pieces import PIECE_GEOMETRY, spawn_column
+
+# Altura máxima (en filas) del perfect clear que se busca por defecto
+PC_MAX_HEIGHT = 4
+
+# Presupuesto por búsqueda en las sesiones de práctica (segundos); None = sin límite
+PC_TIME_BUDGET = 0.1
+
+# Sub-tableros cuyo resultado se guarda entre búsquedas
+PC_TABLE_SIZE = 65536
+
+
+class _Timeout(Exception):
+    """Se agotó el presupuesto de tiempo de la búsqueda"""
+
+
+class PerfectClearSolver:
+    """
+    Busca una secuencia de colocaciones con las piezas conocidas (la actual, la de
+    hold y las de next_pieces) que termine en un perfect clear.
+
+    Solo se consideran perfect clears de como mucho max_height filas: las piezas
+    deben quedar enteras dentro de esa zona inferior del tablero, así que la pieza
+    parte justo encima de ella y el generador de jugadas explora muy pocas filas
+    (con las filas de arriba vacías las posiciones alcanzables son las mismas que
+    desde la posición de aparición).
+
+    Poda:
+    - Paridad: las celdas vacías de la zona deben ser múltiplo de 4 y caber en las
+      piezas que quedan.
+    - Regiones: cada zona de celdas vacías conectadas debe tener un múltiplo de 4
+      celdas, si no ninguna combinación de piezas puede llenarla.
+    - Memoria: el resultado de cada sub-tablero (filas, pieza, hold y piezas que
+      quedan) se guarda y se reutiliza dentro de la búsqueda y en las siguientes.
+
+    Args:
+        max_height (int): Filas del perfect clear más alto que se busca
+        use_hold (bool): Si se puede usar hold en la secuencia
+        time_budget (float): Segundos por búsqueda (None = sin límite)
+        table_size (int): Sub-tableros guardados
+    """
+
+    def __init__(self, max_height=PC_MAX_HEIGHT, use_hold=True, time_budget=PC_TIME_BUDGET,
+                 table_size=PC_TABLE_SIZE):
+        self.max_height = max_height
+        self.use_hold = use_hold
+        self.time_budget = time_budget
+        self.table_size = table_size
+        self.table = OrderedDict()
+        self._deadline = None
+
+    def solve(self, game):
+        """
+        Busca un perfect clear desde la posición actual.
+
+        Args:
+            game (TetrisGame): Partida en juego (no se modifica)
+
+        Returns:
+            list: Placement de cada pieza (con ACTION_HOLD al principio del camino si
+                hay que cambiar de pieza) o None si no hay solución o se agotó el tiempo
+        """
+        if game.game_over:
+            return None
+        if game.use_bitboard:
+            rows = tuple(game.field_rows)
+        else:
+            rows = tuple(sum(1 << x for x, cell in enumerate(row) if cell != 0) for row in game.field)
+        width = game.width
+        height = game.height
+
+        stack = 0
+        while stack < height and rows[height - 1 - stack]:
+            stack += 1
+        if any(rows[:height - stack]):
+            return None  # Hay bloques sueltos por encima de la pila
+        filled = sum(bin(bits).count("1") for bits in rows)
+
+        queue = tuple(game.next_pieces)
+        hold = game.hold_piece_type if self.use_hold else None
+        available = 1 + len(queue) + (hold is not None)
+        self._deadline = None
+        if self.time_budget is not None:
+            self._deadline = time.perf_counter() + self.time_budget
+
+        self._width = width
+        self._height = height
+        self._rotation_system = game.rotation_system
+        self._full_row_mask = (1 << width) - 1
+        self._rules = (width, game.rotation_system.name)
+        for zone in range(max(stack, 1), min(self.max_height, height - 4) + 1):
+            empty = width * zone - filled
+            if empty % 4 or empty // 4 > available or not self._feasible(rows, zone, available):
+                continue
+            try:
+                steps = self._search(rows, zone, game.piece_type, hold, queue,
+                                     not game.hold_used and self.use_hold)
+            except _Timeout:
+                return None
+            if steps is not None:
+                return self._placements(game, rows, steps)
+        return None
+
+    def _search(self, rows, zone, piece_type, hold, queue, hold_allowed):
+        """
+        Búsqueda en profundidad con memoria.
+
+        Returns:
+            tuple: Pasos (usa_hold, x, y, rotación) hasta el perfect clear, o None
+        """
+        key = (rows, zone, piece_type, hold, queue, hold_allowed, self._rules)
+        table = self.table
+        if key in table:
+            table.move_to_end(key)
+            return table[key]
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        result = None
+        choices = [(False, piece_type, hold, queue)]
+        if hold_allowed:
+            if hold is None:
+                if queue:
+                    choices.append((True, queue[0], piece_type, queue[1:]))
+            elif hold != piece_type:
+                choices.append((True, hold, piece_type, queue))
+
+        for uses_hold, current, next_hold, next_queue in choices:
+            for x, y, rotation, child, cleared in self._children(rows, zone, current):
+                child_zone = zone - cleared
+                if not child_zone:
+                    result = ((uses_hold, x, y, rotation),)
+                    break
+                if not next_queue:
+                    continue  # La siguiente pieza aún no es visible
+                if not self._feasible(child, child_zone, 1 + len(next_queue) + (next_hold is not None)):
+                    continue
+                steps = self._search(child, child_zone, next_queue[0], next_hold, next_queue[1:],
+                                     self.use_hold)
+                if steps is not None:
+                    result = ((uses_hold, x, y, rotation),) + steps
+                    break
+            if result is not None:
+                break
+
+        table[key] = result
+        if len(table) > self.table_size:
+            table.popitem(last=False)
+        return result
+
+    def _children(self, rows, zone, piece_type):
+        """Colocaciones dentro de la zona, de la más baja a la más alta, con el tablero resultante"""
+        width = self._width
+        height = self._height
+        full_row_mask = self._full_row_mask
+        zone_top = height - zone
+        geometries = PIECE_GEOMETRY[piece_type]
+        # Punto de partida justo encima de la zona: por encima todo está vacío
+        start_y = zone_top - 4
+        positions = generate_positions(
+            rows, piece_type, spawn_column(piece_type, width), start_y, 0,
+            self._rotation_system, width, height)
+        children = []
+        for placement in positions:
+            geometry = geometries[placement.rotation]
+            if placement.y + geometry.min_row < zone_top:
+                continue  # Sobresale por encima de la zona
+            board = list(rows)
+            shift = placement.x + geometry.min_col
+            cleared = 0
+            for row, mask in geometry.row_masks:
+                y = placement.y + row
+                bits = board[y] | (mask << shift)
+                board[y] = bits
+                if bits == full_row_mask:
+                    cleared += 1
+            if cleared:
+                remaining = [bits for bits in board if bits != full_row_mask]
+                board = [0] * cleared + remaining
+            children.append((placement.y + geometry.max_row, placement, tuple(board), cleared))
+        children.sort(key=_lowest_first, reverse=True)
+        return [(placement.x, placement.y, placement.rotation, board, cleared)
+                for _, placement, board, cleared in children]
+
+    def _feasible(self, rows, zone, pieces):
+        """Poda por paridad y por regiones de celdas vacías"""
+        width = self._width
+        height = self._height
+        # La zona como un único entero con una columna de separación entre filas
+        stride = width + 1
+        empty = 0
+        count = 0
+        for y in range(height - zone, height):
+            free = ~rows[y] & self._full_row_mask
+            empty = (empty << stride) | free
+            count += bin(free).count("1")
+        if count % 4 or count > 4 * pieces:
+            return False
+        while empty:
+            region = empty & -empty
+            while True:
+                grown = (region | (region << 1) | (region >> 1)
+                         | (region << stride) | (region >> stride)) & empty
+                if grown == region:
+                    break
+                region = grown
+            if bin(region).count("1") % 4:
+                return False
+            empty &= ~region
+        return True
+
+    def _placements(self, game, rows, steps):
+        """Convierte los pasos en Placement con el camino real desde la posición de la pieza"""
+        width = self._width
+        height = self._height
+        piece_type = game.piece_type
+        hold = game.hold_piece_type
+        queue = list(game.next_pieces)
+        start = (game.piece_x, game.piece_y, game.rotation)
+        placements = []
+        for uses_hold, x, y, rotation in steps:
+            if uses_hold:
+                if hold is None:
+                    hold, piece_type = piece_type, queue.pop(0)
+                else:
+                    hold, piece_type = piece_type, hold
+                start = (spawn_column(piece_type, width), 0, 0)
+            geometry = PIECE_GEOMETRY[piece_type][rotation]
+            target = (SHAPE_KEYS[piece_type][rotation], x + geometry.min_col, y + geometry.min_row)
+            found = None
+            for placement in generate_positions(rows, piece_type, start[0], start[1], start[2],
+                                                self._rotation_system, width, height):
+                shape = PIECE_GEOMETRY[piece_type][placement.rotation]
+                if (SHAPE_KEYS[piece_type][placement.rotation], placement.x + shape.min_col,
+                        placement.y + shape.min_row) == target:
+                    found = placement
+                    break
+            if found is None:
+                return None  # Solo puede pasar si la pieza ya bajó dentro de la zona
+            if uses_hold:
+                found = found._replace(path=(ACTION_HOLD,) + found.path)
+            placements.append(found)
+
+            board = list(rows)
+            shift = x + geometry.min_col
+            for row, mask in geometry.row_masks:
+                board[y + row] |= mask << shift
+            remaining = [bits for bits in board if bits != self._full_row_mask]
+            rows = tuple([0] * (height - len(remaining)) + remaining)
+            if queue:
+                piece_type = queue.pop(0)
+            start = (spawn_column(piece_type, width), 0, 0)
+        return placements
+
+    def clear_table(self):
+        """Vacía la memoria de sub-tableros"""
+        self.table.clear()
+
+
+def _lowest_first(child):
+    return child[0]
@@ -0,0 +1,158 @@
+# pieces.py
+# Definición de los tetrominos y sus tablas de geometría precompiladas
+
+from collections import namedtuple
+
+# Tetromino colors
+COLORS = [
+    (0, 0, 0),        # Black (empty)
+    (255, 0, 0),      # Red - Z
+    (0, 255, 0),      # Green - S
+    (0, 0, 255),      # Blue - J
+    (255, 255, 0),    # Yellow - O
+    (0, 255, 255),    # Cyan - I
+    (255, 0, 255),    # Magenta - T
+    (255, 128, 0),    # Orange - L
+]
+
+# Tetrominos with their 4 rotations
+SHAPES = [
+    # Z-shape
+    [
+        [[1, 1, 0], [0, 1, 1], [0, 0, 0]],
+        [[0, 0, 1], [0, 1, 1], [0, 1, 0]],
+        [[0, 0, 0], [1, 1, 0], [0, 1, 1]],
+        [[0, 1, 0], [1, 1, 0], [1, 0, 0]]
+    ],
+    # S-shape
+    [
+        [[0, 2, 2], [2, 2, 0], [0, 0, 0]],
+        [[0, 2, 0], [0, 2, 2], [0, 0, 2]],
+        [[0, 0, 0], [0, 2, 2], [2, 2, 0]],
+        [[2, 0, 0], [2, 2, 0], [0, 2, 0]]
+    ],
+    # J-shape
+    [
+        [[3, 0, 0], [3, 3, 3], [0, 0, 0]],
+        [[0, 3, 3], [0, 3, 0], [0, 3, 0]],
+        [[0, 0, 0], [3, 3, 3], [0, 0, 3]],
+        [[0, 3, 0], [0, 3, 0], [3, 3, 0]]
+    ],
+    # O-shape
+    [
+        [[0, 4, 4, 0], [0, 4, 4, 0], [0, 0, 0, 0]],
+        [[0, 4, 4, 0], [0, 4, 4, 0], [0, 0, 0, 0]],
+        [[0, 4, 4, 0], [0, 4, 4, 0], [0, 0, 0, 0]],
+        [[0, 4, 4, 0], [0, 4, 4, 0], [0, 0, 0, 0]]
+    ],
+    # I-shape
+    [
+        [[0, 0, 0, 0], [5, 5, 5, 5], [0, 0, 0, 0], [0, 0, 0, 0]],
+        [[0, 0, 5, 0], [0, 0, 5, 0], [0, 0, 5, 0], [0, 0, 5, 0]],
+        [[0, 0, 0, 0], [0, 0, 0, 0], [5, 5, 5, 5], [0, 0, 0, 0]],
+        [[0, 5, 0, 0], [0, 5, 0, 0], [0, 5, 0, 0], [0, 5, 0, 0]]
+    ],
+    # T-shape
+    [
+        [[0, 6, 0], [6, 6, 6], [0, 0, 0]],
+        [[0, 6, 0], [0, 6, 6], [0, 6, 0]],
+        [[0, 0, 0], [6, 6, 6], [0, 6, 0]],
+        [[0, 6, 0], [6, 6, 0], [0, 6, 0]]
+    ],
+    # L-shape
+    [
+        [[0, 0, 7], [7, 7, 7], [0, 0, 0]],
+        [[0, 7, 0], [0, 7, 0], [0, 7, 7]],
+        [[0, 0, 0], [7, 7, 7], [7, 0, 0]],
+        [[7, 7, 0], [0, 7, 0], [0, 7, 0]]
+    ]
+]
+
+
+# Geometría precompilada de una pieza en una rotación concreta:
+# - cells: tuplas (col, fila, color) de las celdas ocupadas dentro de la matriz de SHAPES
+# - min_col/max_col/min_row/max_row: caja envolvente de las celdas ocupadas
+# - row_masks: pares (fila, máscara) con la máscara desplazada para que min_col sea el bit 0
+# - column_bottoms: pares (columna, fila más baja ocupada) para calcular dónde aterriza la pieza
+# - matrix_width: ancho de la matriz original, usado para calcular la columna de aparición
+PieceGeometry = namedtuple(
+    "PieceGeometry",
+    ["cells", "min_col", "max_col", "min_row", "max_row", "width", "height", "row_masks",
+     "column_bottoms", "matrix_width"]
+)
+
+
+def _compile_geometry(shape):
+    """Compila una matriz de SHAPES en una PieceGeometry."""
+    cells = tuple(
+        (col, row, cell)
+        for row, cells_row in enumerate(shape)
+        for col, cell in enumerate(cells_row)
+        if cell != 0
+    )
+    min_col = min(col for col, _, _ in cells)
+    max_col = max(col for col, _, _ in cells)
+    min_row = min(row for _, row, _ in cells)
+    max_row = max(row for _, row, _ in cells)
+
+    row_masks = []
+    for row in range(min_row, max_row + 1):
+        mask = 0
+        for col, cell_row, _ in cells:
+            if cell_row == row:
+                mask |= 1 << (col - min_col)
+        if mask:
+            row_masks.append((row, mask))
+
+    column_bottoms = tuple(
+        (col, max(row for cell_col, row, _ in cells if cell_col == col))
+        for col in range(min_col, max_col + 1)
+    )
+
+    return PieceGeometry(
+        cells=cells,
+        min_col=min_col,
+        max_col=max_col,
+        min_row=min_row,
+        max_row=max_row,
+        width=max_col - min_col + 1,
+        height=max_row - min_row + 1,
+        row_masks=tuple(row_masks),
+        column_bottoms=column_bottoms,
+        matrix_width=len(shape[0]),
+    )
+
+
+def _compile_tspin_corners(t_rotations):
+    """
+    Precalcula las 4 esquinas de la caja 3x3 de la pieza T para cada rotación,
+    marcando como frontales las que tocan el bloque hacia el que apunta la T.
+    
+    Returns:
+        tuple: Por rotación, tupla de (dx, dy, es_frontal)
+    """
+    corners = ((0, 0), (2, 0), (0, 2), (2, 2))
+    table = []
+    for geometry in t_rotations:
+        occupied = {(col, row) for col, row, _ in geometry.cells}
+        # El lado vacío alrededor del centro (1, 1) es el opuesto al que apunta la T
+        empty_x, empty_y = next(
+            (1 + dx, 1 + dy) for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0))
+            if (1 + dx, 1 + dy) not in occupied
+        )
+        nose_x, nose_y = 2 - empty_x, 2 - empty_y
+        table.append(tuple(
+            (cx, cy, abs(cx - nose_x) + abs(cy - nose_y) == 1)
+            for cx, cy in corners
+        ))
+    return tuple(table)
+
+
+def spawn_column(piece_type, board_width):
+    """Columna en la que aparece una pieza nueva en un tablero del ancho indicado."""
+    return (board_width // 2) - (PIECE_GEOMETRY[piece_type][0].matrix_width // 2)
+
+
+# Tablas compiladas una sola vez al importar: PIECE_GEOMETRY[pieza][rotación]
+PIECE_GEOMETRY = tuple(tuple(_compile_geometry(shape) for shape in rotations) for rotations in SHAPES)
+TSPIN_CORNERS = _compile_tspin_corners(PIECE_GEOMETRY[5])
@@ -0,0 +1,211 @@
+# randomizer.py
+# Generadores de secuencias de piezas con semilla propia por partida
+
+import abc
+import copy
+import random
+from collections import deque
+
+from .log import debugger
+
+# Índices de las piezas en SHAPES
+PIECE_Z, PIECE_S, PIECE_J, PIECE_O, PIECE_I, PIECE_T, PIECE_L = range(7)
+NUM_PIECES = 7
+
+_MASK64 = (1 << 64) - 1
+
+
+class PieceRNG:
+    """
+    Generador pseudoaleatorio SplitMix64 con todo su estado en un único entero.
+
+    Se usa en lugar de random.Random porque guardar y restaurar su estado es
+    inmediato (random.Random.getstate() copia 625 enteros en cada llamada),
+    lo que abarata las instantáneas de partida.
+    """
+    __slots__ = ("state",)
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.state = seed & _MASK64
+
+    def next_u64(self):
+        """Devuelve el siguiente entero de 64 bits de la secuencia"""
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return z ^ (z >> 31)
+
+    def randrange(self, n):
+        """Entero aleatorio en [0, n) (el sesgo del módulo es despreciable para n pequeño)"""
+        return self.next_u64() % n
+
+    def choice(self, seq):
+        return seq[self.randrange(len(seq))]
+
+    def shuffle(self, items):
+        """Baraja la lista en el sitio (Fisher-Yates)"""
+        for i in range(len(items) - 1, 0, -1):
+            j = self.randrange(i + 1)
+            items[i], items[j] = items[j], items[i]
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
+
+
+class Randomizer(abc.ABC):
+    """
+    Clase base abstracta de los generadores de piezas.
+
+    Cada generador tiene su propio PieceRNG con la semilla de la partida,
+    así la secuencia de piezas es reproducible y no depende del módulo random global.
+    Las subclases implementan next_piece() y, si guardan más estado que el
+    generador (una bolsa, un historial), _get_extra_state()/_set_extra_state().
+    """
+    name = None
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = PieceRNG(seed)
+
+    @abc.abstractmethod
+    def next_piece(self):
+        """Devuelve el índice de la siguiente pieza"""
+
+    def get_state(self):
+        """Estado completo del generador (para guardar y restaurar partidas)"""
+        return (self.rng.getstate(), self._get_extra_state())
+
+    def set_state(self, state):
+        """Restaura un estado obtenido con get_state()"""
+        rng_state, extra_state = state
+        self.rng.setstate(rng_state)
+        self._set_extra_state(extra_state)
+
+    def clone(self):
+        """Copia independiente del generador en su estado actual"""
+        new = copy.copy(self)
+        new.rng = PieceRNG(0)
+        new.set_state(self.get_state())
+        return new
+
+    def _get_extra_state(self):
+        return None
+
+    def _set_extra_state(self, extra_state):
+        pass
+
+
+class BagRandomizer(Randomizer):
+    """
+    Sistema de bolsa: todas las piezas aparecen el mismo número de veces
+    (bag_copies) antes de volver a llenar la bolsa, asegurando una distribución justa.
+    """
+    bag_copies = 1
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.bag = deque()
+
+    def refill_bag(self):
+        pieces = list(range(NUM_PIECES)) * self.bag_copies
+        self.rng.shuffle(pieces)
+        self.bag.extend(pieces)
+
+    def next_piece(self):
+        if not self.bag:
+            self.refill_bag()
+        return self.bag.popleft()
+
+    def _get_extra_state(self):
+        return tuple(self.bag)
+
+    def _set_extra_state(self, extra_state):
+        self.bag = deque(extra_state)
+
+
+class SevenBagRandomizer(BagRandomizer):
+    """7-bag: estándar de los Tetris modernos"""
+    name = "7bag"
+    bag_copies = 1
+
+
+class FourteenBagRandomizer(BagRandomizer):
+    """14-bag: dos copias de cada pieza por bolsa, permite algunas repeticiones"""
+    name = "14bag"
+    bag_copies = 2
+
+
+class HistoryRandomizer(Randomizer):
+    """
+    Generador con historial al estilo TGM: recuerda las últimas 4 piezas y
+    vuelve a tirar hasta `rolls` veces si la pieza elegida está en el historial.
+    La primera pieza nunca es S, Z ni O.
+    """
+    name = "tgm"
+    history_size = 4
+    rolls = 4
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.history = deque([PIECE_Z, PIECE_Z, PIECE_S, PIECE_S], maxlen=self.history_size)
+        self.first_piece = True
+
+    def next_piece(self):
+        if self.first_piece:
+            self.first_piece = False
+            piece = self.rng.choice((PIECE_I, PIECE_J, PIECE_L, PIECE_T))
+        else:
+            for _ in range(self.rolls):
+                piece = self.rng.randrange(NUM_PIECES)
+                if piece not in self.history:
+                    break
+        self.history.append(piece)
+        return piece
+
+    def _get_extra_state(self):
+        return (tuple(self.history), self.first_piece)
+
+    def _set_extra_state(self, extra_state):
+        history, self.first_piece = extra_state
+        self.history = deque(history, maxlen=self.history_size)
+
+
+class PureRandomizer(Randomizer):
+    """Aleatorio puro: cada pieza es independiente de las anteriores"""
+    name = "random"
+
+    def next_piece(self):
+        return self.rng.randrange(NUM_PIECES)
+
+
+RANDOMIZERS = {
+    SevenBagRandomizer.name: SevenBagRandomizer,
+    FourteenBagRandomizer.name: FourteenBagRandomizer,
+    HistoryRandomizer.name: HistoryRandomizer,
+    PureRandomizer.name: PureRandomizer,
+}
+
+
+def create_randomizer(randomizer="7bag", seed=None):
+    """
+    Crea un generador de piezas.
+
+    Args:
+        randomizer (str o Randomizer): Nombre del generador ('7bag', '14bag', 'tgm', 'random')
+            o una instancia ya creada, que se devuelve tal cual
+        seed (int, optional): Semilla del generador
+
+    Returns:
+        Randomizer: Generador de piezas
+    """
+    if isinstance(randomizer, Randomizer):
+        return randomizer
+    if randomizer not in RANDOMIZERS:
+        debugger.warning(f"Generador de piezas desconocido: {randomizer}. Usando 7bag.")
+        randomizer = SevenBagRandomizer.name
+    return RANDOMIZERS[randomizer](seed)
@@ -0,0 +1,372 @@
+# replay.py
+# Repeticiones: semilla, reglas y entradas de una partida en un fichero binario pequeño
+#
+# Uso: python -m gamescript.core.replay replays/partida.replay
+#
+# Formato (enteros en little-endian):
+#   cabecera: _HEADER y, tras ella, modo, sistema de rotación y generador de piezas
+#       (cada uno con un byte de longitud y el texto en ASCII)
+#   cuerpo: flujo zlib con los eventos uno tras otro. Cada evento empieza con un
+#       varint (frames desde el evento anterior << 2 | tipo) y sigue con sus datos:
+#       REPLAY_INPUT: 1 byte con los bits INPUT_* mantenidos desde ese frame
+#       REPLAY_LOCK: pieza fijada: x e y (bytes con signo) y un byte con
+#           rotación | hold << 2 | spin << 3 | pieza << 5
+#       REPLAY_END: varints con la puntuación, las líneas y el nivel finales
+#
+# Solo se guardan los cambios de los botones, así que una partida de 10 minutos ocupa
+# unos pocos KB. Las piezas fijadas permiten reconstruir el tablero exactamente aunque
+# la interfaz mueva las piezas con tiempos reales (gravedad, DAS) y no por frames.
+
+import argparse
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from .actions import ACTION_PLACE
+from .clock import ManualClock
+from .inputs import FPS, INPUT_ACTIONS
+from .log import debugger
+from .modes import create_game_mode
+from .movegen import generate_placements
+
+REPLAY_MAGIC = b"PTRP"
+REPLAY_VERSION = 1
+
+# Directorio por defecto de las repeticiones de start_game
+REPLAY_DIR = "replays"
+REPLAY_EXTENSION = ".replay"
+
+# Tipos de evento
+REPLAY_INPUT = 0
+REPLAY_LOCK = 1
+REPLAY_END = 2
+
+# Frames entre envíos de eventos al hilo que escribe el fichero
+REPLAY_FLUSH_FRAMES = 120
+
+# magic, versión, semilla, inicio (tiempo Unix), FPS, ancho, alto, piezas en la cola,
+# DAS y ARR de la interfaz en milisegundos
+_HEADER = struct.Struct("<4sBQIBBBBHH")
+_LOCK = struct.Struct("<bbB")
+
+
+def _write_varint(value, out):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class ReplayWriter:
+    """
+    Graba una partida mientras se juega.
+
+    record() se llama una vez por frame con los botones mantenidos: solo añade unos
+    bytes a un búfer cuando cambian los botones o se fija una pieza. Cada
+    REPLAY_FLUSH_FRAMES frames el búfer pasa a un hilo que lo comprime y lo escribe,
+    así que el bucle del juego nunca espera al disco. Si el programa se cierra sin
+    llamar a close(), el fichero se puede leer hasta el último bloque escrito.
+
+    Args:
+        path (str): Fichero de la repetición (se sobrescribe)
+        game (TetrisGame): Partida recién creada (se guardan su semilla y sus reglas)
+        mode (str): Nombre del modo para create_game_mode ('classic', 'marathon', ...)
+        das_ms (int): DAS de la interfaz en milisegundos
+        arr_ms (int): ARR de la interfaz en milisegundos
+        fps (int): Frames por segundo del bucle que llama a record()
+    """
+
+    def __init__(self, path, game, mode, das_ms=0, arr_ms=0, fps=FPS):
+        if not 0 <= game.seed < 1 << 64:
+            raise ValueError(f"Semilla fuera de rango para una repetición: {game.seed}")
+        header = bytearray(_HEADER.pack(
+            REPLAY_MAGIC, REPLAY_VERSION, game.seed, int(time.time()), fps,
+            game.width, game.height, game.preview_count, das_ms, arr_ms))
+        for text in (mode, game.rotation_system.name, game.randomizer_type):
+            encoded = str(text).encode("ascii")
+            header.append(len(encoded))
+            header += encoded
+        self.path = path
+        self.frame = 0
+        self._file = open(path, "wb")
+        self._file.write(header)
+        self._buffer = bytearray()
+        self._last_event = 0
+        self._inputs = 0
+        self._pieces = game.pieces_placed
+        # El motor deja aquí cada pieza fijada: entre dos frames pueden fijarse varias
+        # (la gravedad al final de uno y un hard drop al principio del siguiente)
+        self._locks = game.lock_history = []
+        self._finished = False
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="ReplayWriter", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def create(cls, directory, game, mode, das_ms=0, arr_ms=0, fps=FPS):
+        """Crea la repetición en directory con un nombre a partir de la fecha y el modo"""
+        os.makedirs(directory, exist_ok=True)
+        name = time.strftime("%Y%m%d-%H%M%S") + f"-{mode}{REPLAY_EXTENSION}"
+        return cls(os.path.join(directory, name), game, mode, das_ms, arr_ms, fps)
+
+    def record(self, game, inputs):
+        """
+        Registra un frame.
+
+        Args:
+            game (TetrisGame): Partida grabada
+            inputs (int): Bits INPUT_* mantenidos (o pulsados) en este frame
+        """
+        if self._finished:
+            return
+        if self._locks:
+            self._drain_locks(game)
+        if inputs != self._inputs:
+            self._inputs = inputs
+            self._event(REPLAY_INPUT)
+            self._buffer.append(inputs)
+        self.frame += 1
+        if self.frame % REPLAY_FLUSH_FRAMES == 0 and self._buffer:
+            self._send()
+
+    def finish(self, game):
+        """Registra la última pieza y el resultado final (la partida ha terminado)"""
+        if self._finished:
+            return
+        self._drain_locks(game)
+        self._event(REPLAY_END)
+        for value in (game.score, game.lines_cleared, game.level):
+            _write_varint(max(0, value), self._buffer)
+        self._finished = True
+        self._send()
+
+    def close(self):
+        """Escribe lo pendiente y espera a que el hilo cierre el fichero"""
+        if self._thread is None:
+            return
+        self._send()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _drain_locks(self, game):
+        for piece_type, x, y, rotation, uses_hold, spin in self._locks:
+            self._event(REPLAY_LOCK)
+            self._buffer += _LOCK.pack(x, y, rotation | uses_hold << 2 | spin << 3 | piece_type << 5)
+        self._pieces += len(self._locks)
+        self._locks.clear()
+        assert self._pieces == game.pieces_placed, "La repetición ha perdido piezas fijadas"
+
+    def _event(self, kind):
+        _write_varint((self.frame - self._last_event) << 2 | kind, self._buffer)
+        self._last_event = self.frame
+
+    def _send(self):
+        if self._buffer:
+            self._queue.put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _run(self):
+        compressor = zlib.compressobj(9)
+        file = self._file
+        while True:
+            chunk = self._queue.get()
+            if not file.closed:
+                try:
+                    if chunk is None:
+                        file.write(compressor.flush())
+                    else:
+                        # Z_SYNC_FLUSH: lo escrito se puede leer aunque la partida se corte
+                        file.write(compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH))
+                        file.flush()
+                except (OSError, ValueError) as e:
+                    debugger.warning(f"No se puede escribir la repetición {self.path}: {e}")
+                    file.close()
+            if chunk is None:
+                file.close()
+                return
+
+
+class Replay:
+    """
+    Repetición leída de un fichero de ReplayWriter.
+
+    Attributes:
+        seed, started, fps, width, height, preview_count, das_ms, arr_ms, mode,
+        rotation_system, randomizer: Cabecera
+        events (list): (frame, tipo, datos) en orden; los datos son los bits INPUT_*,
+            (pieza, x, y, rotación, hold_usado, spin) o (puntuación, líneas, nivel)
+        result (tuple): (puntuación, líneas, nivel) o None si la partida no terminó
+    """
+
+    def __init__(self, data):
+        (magic, version, self.seed, self.started, self.fps, self.width, self.height,
+         self.preview_count, self.das_ms, self.arr_ms) = _HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("No es una repetición de esta versión")
+        offset = _HEADER.size
+        texts = []
+        for _ in range(3):
+            length = data[offset]
+            texts.append(data[offset + 1:offset + 1 + length].decode("ascii"))
+            offset += 1 + length
+        self.mode, self.rotation_system, self.randomizer = texts
+        # decompressobj acepta flujos sin terminar: se lee todo lo que llegó a escribirse
+        body = zlib.decompressobj().decompress(data[offset:])
+        self.events = []
+        self.result = None
+        self._parse(body)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls(file.read())
+
+    def _parse(self, body):
+        frame = 0
+        offset = 0
+        try:
+            while offset < len(body):
+                value, offset = _read_varint(body, offset)
+                frame += value >> 2
+                kind = value & 3
+                if kind == REPLAY_INPUT:
+                    data = body[offset]
+                    offset += 1
+                elif kind == REPLAY_LOCK:
+                    x, y, flags = _LOCK.unpack_from(body, offset)
+                    offset += _LOCK.size
+                    data = (flags >> 5, x, y, flags & 3, bool(flags & 4), (flags >> 3) & 3)
+                elif kind == REPLAY_END:
+                    values = []
+                    for _ in range(3):
+                        item, offset = _read_varint(body, offset)
+                        values.append(item)
+                    data = self.result = tuple(values)
+                else:
+                    raise ValueError(f"Evento desconocido: {kind}")
+                self.events.append((frame, kind, data))
+        except (IndexError, struct.error):
+            # Último evento a medias: la grabación se cortó
+            pass
+
+    @property
+    def frames(self):
+        """Frames grabados (hasta el último evento)"""
+        return self.events[-1][0] if self.events else 0
+
+    def inputs(self):
+        """Cambios de los botones: lista de (frame, bits INPUT_*)"""
+        return [(frame, data) for frame, kind, data in self.events if kind == REPLAY_INPUT]
+
+    def locks(self):
+        """Piezas fijadas: lista de (frame, (pieza, x, y, rotación, hold_usado, spin))"""
+        return [(frame, data) for frame, kind, data in self.events if kind == REPLAY_LOCK]
+
+    def new_game(self):
+        """Partida nueva con la semilla y las reglas de la repetición (reloj manual)"""
+        game = create_game_mode(self.mode, clock=ManualClock(), seed=self.seed,
+                                width=self.width, height=self.height,
+                                randomizer=self.randomizer, preview_count=self.preview_count,
+                                rotation_system=self.rotation_system)
+        game.start()
+        return game
+
+    def positions(self):
+        """
+        Reconstruye la partida pieza a pieza.
+
+        El tablero, el hold y la cola son exactamente los de la partida grabada; la
+        puntuación puede diferir en los puntos de caída, porque las piezas llegan a su
+        sitio por el camino del generador de jugadas y no con las pulsaciones originales.
+
+        Yields:
+            tuple: (frame, partida) tras fijar cada pieza; la partida es la misma
+                instancia en cada paso, se clona si hay que conservarla
+        """
+        game = self.new_game()
+        for frame, lock in self.locks():
+            apply_lock(game, *lock)
+            yield frame, game
+            if game.game_over:
+                return
+
+
+def apply_lock(game, piece_type, x, y, rotation, uses_hold, spin):
+    """
+    Fija la pieza actual donde lo indica un evento REPLAY_LOCK.
+
+    Se busca con el generador de jugadas un camino que llegue a esa posición con el
+    mismo tipo de spin, así que la puntuación de los T-spins se repite; si no hay
+    ninguno se coloca la pieza directamente.
+
+    Raises:
+        ValueError: Si la pieza del evento no es la que toca en la partida
+    """
+    if uses_hold and not game.hold_used:
+        game.hold_piece()
+    if game.piece_type != piece_type:
+        raise ValueError(f"La repetición no corresponde a la partida: se esperaba la pieza "
+                         f"{piece_type} y sale la {game.piece_type}")
+    for placement in generate_placements(game):
+        if (placement.x, placement.y, placement.rotation, placement.spin) == (x, y, rotation, spin):
+            return game.apply_many(placement.path)
+    return game.apply_many([(ACTION_PLACE, x, rotation, y)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m gamescript.core.replay",
+        description="Muestra el contenido de una repetición y reconstruye la partida.")
+    parser.add_argument("path", help="Fichero .replay")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    names = {bit: name for name, bit in INPUT_ACTIONS.items()}
+    inputs = replay.inputs()
+    presses = sum(bin(data & ~previous).count("1")
+                  for (_, previous), (_, data) in zip([(0, 0)] + inputs, inputs))
+    locks = replay.locks()
+    seconds = replay.frames / replay.fps
+    print(f"Modo {replay.mode}, semilla {replay.seed}, {replay.width}x{replay.height}, "
+          f"rotación {replay.rotation_system}, generador {replay.randomizer}")
+    print(f"Grabada {time.strftime('%Y-%m-%d %H:%M', time.localtime(replay.started))}, "
+          f"{seconds:.1f} s, {os.path.getsize(args.path)} bytes")
+    print(f"{len(inputs)} cambios de botones ({presses} pulsaciones), {len(locks)} piezas")
+    if locks:
+        used = sorted({names[bit] for _, data in inputs for bit in names if data & bit})
+        print(f"Pulsaciones por pieza: {presses / len(locks):.2f} ({', '.join(used)})")
+
+    game = None
+    try:
+        for _, game in replay.positions():
+            pass
+    except ValueError as e:
+        print(f"No se puede reconstruir la partida: {e}")
+    if game is not None:
+        print(f"Reconstruida: {game.pieces_placed} piezas, {game.lines_cleared} líneas, "
+              f"{game.score} puntos")
+    if replay.result is None:
+        print("La grabación no llegó al final de la partida")
+    else:
+        score, lines, level = replay.result
+        print(f"Resultado grabado: {lines} líneas, {score} puntos, nivel {level}")
+
+
+if __name__ == "__main__":
+    main()
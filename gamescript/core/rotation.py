@@ -0,0 +1,189 @@
+# rotation.py
+# Sistemas de rotación (SRS, SRS+, ARS, NES) con tablas de kicks precompiladas
+
+from .log import debugger
+from .pieces import SHAPES
+
+# Índices de las piezas con tabla de kicks propia
+PIECE_O = 3
+PIECE_I = 4
+
+# Giros posibles: cuántos cuartos de vuelta en sentido horario se avanza
+TURN_CW = 1
+TURN_180 = 2
+TURN_CCW = 3
+
+# Las tablas se escriben en la notación de la wiki de Hard Drop (y positiva hacia arriba)
+# y se compilan invirtiendo y, porque en el tablero la fila 0 es la superior.
+# Clave: (rotación_inicial, rotación_destino) con 0, R=1, 2, L=3.
+# Referencia: https://harddrop.com/wiki/SRS
+SRS_JLSTZ_KICKS = {
+    (0, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (1, 0): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (1, 2): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (2, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (2, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+    (3, 2): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (3, 0): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (0, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+}
+
+SRS_I_KICKS = {
+    (0, 1): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (1, 0): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (1, 2): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+    (2, 1): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (2, 3): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (3, 2): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (3, 0): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (0, 3): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+}
+
+# SRS+ (TETR.IO): kicks simétricos para la pieza I y rotación de 180°
+SRS_PLUS_I_KICKS = {
+    (0, 1): ((0, 0), (1, 0), (-2, 0), (-2, -1), (1, 2)),
+    (1, 0): ((0, 0), (-1, 0), (2, 0), (-1, -2), (2, 1)),
+    (1, 2): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+    (2, 1): ((0, 0), (-2, 0), (1, 0), (-2, 1), (1, -2)),
+    (2, 3): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (3, 2): ((0, 0), (1, 0), (-2, 0), (1, 2), (-2, -1)),
+    (3, 0): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (0, 3): ((0, 0), (-1, 0), (2, 0), (2, -1), (-1, 2)),
+}
+
+SRS_PLUS_180_KICKS = {
+    (0, 2): ((0, 0), (0, 1), (1, 1), (-1, 1), (1, 0), (-1, 0)),
+    (1, 3): ((0, 0), (1, 0), (1, 2), (1, 1), (0, 2), (0, 1)),
+    (2, 0): ((0, 0), (0, -1), (-1, -1), (1, -1), (-1, 0), (1, 0)),
+    (3, 1): ((0, 0), (-1, 0), (-1, 2), (-1, 1), (0, 2), (0, 1)),
+}
+
+# ARS (Arika, serie TGM) simplificado: se prueba sin desplazamiento y después
+# una columna a la derecha y otra a la izquierda; la pieza I no tiene kicks
+ARS_KICKS = ((0, 0), (1, 0), (-1, 0))
+
+NO_KICKS = ((0, 0),)
+
+
+def _compile_kicks(table):
+    """
+    Convierte una tabla {(desde, hasta): kicks} en un array indexado por [desde][giro].
+
+    Los giros que la tabla no define quedan como una tupla vacía (rotación no permitida).
+    """
+    compiled = []
+    for rotation_from in range(4):
+        by_turn = [()] * 4
+        for turn in (TURN_CW, TURN_180, TURN_CCW):
+            kicks = table.get((rotation_from, (rotation_from + turn) % 4))
+            if kicks is not None:
+                by_turn[turn] = tuple((dx, -dy) for dx, dy in kicks)
+        compiled.append(tuple(by_turn))
+    return tuple(compiled)
+
+
+def _uniform_table(kicks, turns=(TURN_CW, TURN_CCW)):
+    """Tabla con los mismos kicks para todas las rotaciones de los giros indicados"""
+    return {
+        (rotation_from, (rotation_from + turn) % 4): kicks
+        for rotation_from in range(4)
+        for turn in turns
+    }
+
+
+class RotationSystem:
+    """
+    Reglas de rotación: qué giros se permiten y qué desplazamientos (kicks) se prueban.
+
+    Las tablas se compilan una sola vez al crear el sistema; kicks[pieza][rotación][giro]
+    devuelve la tupla de desplazamientos (dx, dy) en coordenadas del tablero.
+
+    Args:
+        name (str): Identificador del sistema
+        description (str): Descripción para mostrar al jugador
+        piece_tables (list): Tabla de kicks de cada pieza, en el orden de SHAPES
+    """
+
+    def __init__(self, name, description, piece_tables):
+        self.name = name
+        self.description = description
+        self.kicks = tuple(_compile_kicks(table) for table in piece_tables)
+        self.allows_180 = any(
+            by_turn[TURN_180] for piece_kicks in self.kicks for by_turn in piece_kicks
+        )
+
+    def get_kicks(self, piece_type, rotation_from, turn):
+        """Desplazamientos a probar al girar `turn` cuartos de vuelta desde rotation_from"""
+        return self.kicks[piece_type][rotation_from][turn]
+
+
+def _build_srs():
+    o_table = _uniform_table(NO_KICKS)
+    tables = [SRS_JLSTZ_KICKS] * len(SHAPES)
+    tables[PIECE_O] = o_table
+    tables[PIECE_I] = SRS_I_KICKS
+    return RotationSystem("srs", "Super Rotation System (guía oficial)", tables)
+
+
+def _build_srs_plus():
+    jlstz_table = dict(SRS_JLSTZ_KICKS)
+    jlstz_table.update(SRS_PLUS_180_KICKS)
+    i_table = dict(SRS_PLUS_I_KICKS)
+    i_table.update(SRS_PLUS_180_KICKS)
+    o_table = _uniform_table(NO_KICKS, (TURN_CW, TURN_180, TURN_CCW))
+    tables = [jlstz_table] * len(SHAPES)
+    tables[PIECE_O] = o_table
+    tables[PIECE_I] = i_table
+    return RotationSystem("srs+", "SRS con kicks simétricos para la I y giro de 180°", tables)
+
+
+def _build_ars():
+    tables = [_uniform_table(ARS_KICKS)] * len(SHAPES)
+    tables[PIECE_O] = _uniform_table(NO_KICKS)
+    tables[PIECE_I] = _uniform_table(NO_KICKS)
+    return RotationSystem("ars", "Arika Rotation System (kicks de una columna)", tables)
+
+
+def _build_nes():
+    tables = [_uniform_table(NO_KICKS)] * len(SHAPES)
+    return RotationSystem("nes", "Clásico de NES, sin kicks", tables)
+
+
+ROTATION_SYSTEMS = {}
+
+
+def register_rotation_system(system):
+    """
+    Añade un sistema de rotación al registro (o sustituye uno con el mismo nombre).
+
+    Args:
+        system (RotationSystem): Sistema con sus tablas ya compiladas
+
+    Returns:
+        RotationSystem: El mismo sistema, para poder encadenar la llamada
+    """
+    ROTATION_SYSTEMS[system.name] = system
+    return system
+
+
+for _system in (_build_srs(), _build_srs_plus(), _build_ars(), _build_nes()):
+    register_rotation_system(_system)
+
+
+def get_rotation_system(rotation_system="srs"):
+    """
+    Devuelve un sistema de rotación registrado.
+
+    Args:
+        rotation_system (str o RotationSystem): Nombre del sistema ('srs', 'srs+', 'ars', 'nes')
+            o una instancia ya creada, que se devuelve tal cual
+
+    Returns:
+        RotationSystem: Sistema de rotación con sus tablas compiladas
+    """
+    if isinstance(rotation_system, RotationSystem):
+        return rotation_system
+    if rotation_system not in ROTATION_SYSTEMS:
+        debugger.warning(f"Sistema de rotación desconocido: {rotation_system}. Usando SRS.")
+        rotation_system = "srs"
+    return ROTATION_SYSTEMS[rotation_system]
@@ -0,0 +1,437 @@
+# search.py
+# Bot con búsqueda en haz sobre la cola visible y el hold, y un hilo para usarlo en la interfaz
+
+import multiprocessing
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+from .ai import HeuristicPlayer, with_hold
+from .log import debugger
+
+# Presupuesto por jugada durante la partida (segundos); None = sin límite
+IN_GAME_TIME_BUDGET = 0.005
+
+# Posiciones cuyas colocaciones puntuadas se guardan (tabla de transposición)
+TRANSPOSITION_TABLE_SIZE = 2048
+
+# Presupuesto por jugada de la pista de la interfaz (segundos)
+HINT_TIME_BUDGET = 0.05
+
+# Segundos que el hilo de SearchWorker espera nuevas peticiones antes de terminar
+WORKER_IDLE_TIMEOUT = 2.0
+
+# Lo mismo para el proceso de ProcessSearchWorker (crearlo cuesta más que un hilo)
+PROCESS_IDLE_TIMEOUT = 30.0
+
+# Veces seguidas que ProcessSearchWorker vuelve a crear un proceso que ha terminado
+# con una petición pendiente; si vuelve a fallar, el worker se desactiva
+PROCESS_MAX_RESTARTS = 3
+
+# El proceso de ProcessSearchWorker se crea siempre con spawn: con fork heredaría el
+# estado de pygame/SDL de la interfaz
+_PROCESS_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class BeamSearchPlayer:
+    """
+    Jugador con búsqueda en haz sobre las piezas que se conocen: la actual, las de
+    next_pieces y la de hold.
+
+    En cada nivel se puntúan todas las colocaciones de los nodos del haz con el
+    evaluador de HeuristicPlayer y solo las beam_width mejores se juegan de verdad
+    (clone() + apply_many()) para expandirlas en el nivel siguiente. Nunca se mira
+    más allá de la cola visible.
+
+    Las colocaciones puntuadas de cada posición se guardan por su state_hash, así que
+    las posiciones repetidas en el haz y las que ya se exploraron en la jugada anterior
+    no se vuelven a evaluar.
+
+    Args:
+        weights (HeuristicWeights): Pesos del evaluador (por defecto DEFAULT_WEIGHTS)
+        beam_width (int): Nodos que se expanden en cada nivel
+        depth (int): Piezas a colocar en la búsqueda (None = todas las visibles)
+        time_budget (float): Segundos por jugada (None = sin límite). Al agotarse se
+            devuelve la mejor jugada del nivel más profundo alcanzado
+        table_size (int): Posiciones guardadas en la tabla de transposición
+        opening_book (OpeningBook): Libro de aperturas; mientras tenga jugada para la
+            posición no se busca (None = sin libro)
+    """
+
+    def __init__(self, weights=None, beam_width=6, depth=None, time_budget=IN_GAME_TIME_BUDGET,
+                 table_size=TRANSPOSITION_TABLE_SIZE, opening_book=None):
+        self.evaluator = HeuristicPlayer(weights)
+        self.opening_book = opening_book
+        self.beam_width = max(1, beam_width)
+        self.depth = depth
+        self.time_budget = time_budget
+        self.table_size = table_size
+        self.table = OrderedDict()
+        self._table_lock = threading.Lock()
+
+    def choose(self, game, cancel=None):
+        """
+        Elige la colocación para la pieza actual.
+
+        Args:
+            game (TetrisGame): Partida en juego (no se modifica)
+            cancel (threading.Event): Si se activa, la búsqueda termina como si se
+                hubiese agotado el tiempo
+
+        Returns:
+            Placement: La primera colocación de la mejor secuencia encontrada, con
+                ACTION_HOLD al principio del camino si hay que cambiar de pieza, o
+                None si la pieza no puede colocarse
+        """
+        if self.opening_book is not None:
+            placement = self.opening_book.lookup(game)
+            if placement is not None:
+                return placement
+
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.perf_counter() + self.time_budget
+
+        # Piezas de la cola que se pueden sacar sin llegar a las que aún no se ven
+        visible = len(game.next_pieces)
+        max_depth = visible + 1
+        if self.depth is not None:
+            max_depth = min(max_depth, self.depth)
+
+        # Nodo: (bonificación acumulada, partida, primera jugada, piezas sacadas de la cola)
+        beam = [(0.0, game, None, 0)]
+        best = None
+        for level in range(max_depth):
+            candidates = []
+            for bonus, node, first, drawn in beam:
+                if level and _stopped(deadline, cancel):
+                    break
+                draws_on_hold = node.hold_piece_type is None
+                for score, step_bonus, placement, uses_hold in self._children(node):
+                    hold_draw = 1 if uses_hold and draws_on_hold else 0
+                    if drawn + hold_draw > visible:
+                        continue  # La pieza a colocar aún no es visible
+                    if uses_hold:
+                        placement = with_hold(placement)
+                    candidates.append((
+                        bonus + score, bonus + step_bonus, node,
+                        first if first is not None else placement, placement,
+                        drawn + 1 + hold_draw,
+                    ))
+            if not candidates:
+                break
+            candidates.sort(key=_candidate_score, reverse=True)
+            best = candidates[0]
+            if level + 1 == max_depth or _stopped(deadline, cancel):
+                break
+
+            # Jugar las mejores colocaciones para expandirlas en el siguiente nivel
+            beam = []
+            seen = set()
+            for _, bonus, node, first, placement, drawn in candidates:
+                if drawn > visible:
+                    continue  # La siguiente pieza estaría fuera de la cola visible
+                child = node.clone()
+                child.apply_many(placement.path)
+                if child.game_over:
+                    continue
+                key = child.state_hash
+                if key in seen:
+                    continue
+                seen.add(key)
+                beam.append((bonus, child, first, drawn))
+                if len(beam) == self.beam_width:
+                    break
+            if not beam:
+                break
+
+        return best[3] if best is not None else None
+
+    def _children(self, node):
+        """Colocaciones puntuadas de un nodo, desde la tabla de transposición si ya se evaluó"""
+        key = (node.state_hash, node.rotation_system.name)
+        with self._table_lock:
+            children = self.table.get(key)
+            if children is not None:
+                self.table.move_to_end(key)
+                return children
+        children = self.evaluator.score_placements(node)
+        with self._table_lock:
+            self.table[key] = children
+            if len(self.table) > self.table_size:
+                self.table.popitem(last=False)
+        return children
+
+    def clear_table(self):
+        """Vacía la tabla de transposición"""
+        with self._table_lock:
+            self.table.clear()
+
+    def __getstate__(self):
+        # Para enviarlo a otro proceso: sin el cerrojo y con la tabla vacía
+        state = self.__dict__.copy()
+        state["table"] = OrderedDict()
+        del state["_table_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._table_lock = threading.Lock()
+
+
+def _candidate_score(candidate):
+    return candidate[0]
+
+
+def _stopped(deadline, cancel):
+    """Si se agotó el tiempo o se canceló la búsqueda"""
+    if cancel is not None and cancel.is_set():
+        return True
+    return deadline is not None and time.perf_counter() > deadline
+
+
+class SearchWorker:
+    """
+    Ejecuta player.choose() en un hilo aparte para no bloquear el bucle de dibujo.
+
+    submit() envía una copia de la partida y poll() devuelve la decisión cuando está
+    lista, junto con el state_hash de la posición para la que se calculó: si la
+    partida ha cambiado entretanto (por ejemplo por la gravedad), la decisión ya no
+    sirve y hay que pedir otra. Una petición nueva o cancel() cortan la búsqueda en
+    curso si el jugador acepta el argumento cancel de choose() (BeamSearchPlayer).
+    El hilo se crea con la primera petición y termina solo tras WORKER_IDLE_TIMEOUT
+    segundos sin trabajo, así que no hace falta cerrarlo.
+
+    Args:
+        player: Cualquier jugador con el método choose(game)
+    """
+
+    def __init__(self, player):
+        self.player = player
+        self._condition = threading.Condition()
+        self._thread = None
+        self._request = None
+        self._result = None
+        self._busy = False
+        self._cancel = threading.Event()
+        self._accepts_cancel = isinstance(player, BeamSearchPlayer)
+
+    @property
+    def busy(self):
+        """True mientras hay una petición pendiente o su resultado no se ha recogido"""
+        return self._busy
+
+    def submit(self, game):
+        """
+        Pide una decisión para la posición actual (sustituye a la petición pendiente).
+
+        Args:
+            game (TetrisGame): Partida en juego; se copia, así que puede seguir avanzando
+        """
+        request = (game.state_hash, game.clone())
+        with self._condition:
+            self._cancel.set()  # La búsqueda en curso ya no sirve
+            self._request = request
+            self._result = None
+            self._busy = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SearchWorker", daemon=True)
+                self._thread.start()
+            else:
+                self._condition.notify()
+
+    def cancel(self):
+        """Descarta la petición pendiente y corta la búsqueda en curso"""
+        with self._condition:
+            self._cancel.set()
+            self._request = None
+            self._result = None
+            self._busy = False
+
+    def poll(self):
+        """
+        Recoge la decisión si ya está lista.
+
+        Returns:
+            tuple: (state_hash, Placement o None) o None si aún no hay resultado
+        """
+        with self._condition:
+            result = self._result
+            if result is not None:
+                self._result = None
+                self._busy = self._request is not None
+            return result
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._request is None:
+                    self._condition.wait(WORKER_IDLE_TIMEOUT)
+                if self._request is None:
+                    self._thread = None
+                    return
+                key, game = self._request
+                self._request = None
+                cancel = self._cancel = threading.Event()
+            if self._accepts_cancel:
+                placement = self.player.choose(game, cancel)
+            else:
+                placement = self.player.choose(game)
+            with self._condition:
+                # Si llegó otra petición o se canceló mientras se pensaba, este
+                # resultado ya no sirve
+                if self._request is None and not cancel.is_set():
+                    self._result = (key, placement)
+
+
+class _PipeCancel:
+    """Cancelación para choose() en el proceso de ProcessSearchWorker: hay una petición nueva"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def is_set(self):
+        return self.connection.poll()
+
+
+def _process_worker(connection, player):
+    """
+    Bucle del proceso de ProcessSearchWorker: (id, hash, partida) -> (id, hash, Placement).
+
+    Si choose() lanza una excepción se envía (None, None, traza) y el proceso termina.
+    """
+    cancel = _PipeCancel(connection) if isinstance(player, BeamSearchPlayer) else None
+    try:
+        while connection.poll(PROCESS_IDLE_TIMEOUT):
+            request = connection.recv()
+            if request is None:
+                break
+            request_id, key, game = request
+            try:
+                if cancel is not None:
+                    placement = player.choose(game, cancel)
+                else:
+                    placement = player.choose(game)
+            except Exception:
+                connection.send((None, None, traceback.format_exc()))
+                break
+            connection.send((request_id, key, placement))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        connection.close()
+
+
+class ProcessSearchWorker:
+    """
+    Como SearchWorker, pero la búsqueda se hace en otro proceso.
+
+    En un hilo la búsqueda compite por el GIL con el bucle de dibujo y alarga algunos
+    frames; en otro proceso el bucle solo paga el envío de la partida. Cada petición
+    nueva corta la búsqueda en curso (el proceso comprueba si hay mensajes entre
+    nodos) y las respuestas de peticiones anteriores se descartan. El proceso se
+    crea con la primera petición y termina solo tras PROCESS_IDLE_TIMEOUT segundos
+    sin trabajo (se vuelve a crear si hace falta); close() lo termina al momento.
+
+    Si el proceso muere con una petición pendiente se vuelve a crear, como mucho
+    PROCESS_MAX_RESTARTS veces seguidas; después el error queda en el registro,
+    failed pasa a True y el worker deja de atender peticiones.
+
+    Args:
+        player: Jugador con el método choose(game); debe poder enviarse a otro
+            proceso (BeamSearchPlayer y HeuristicPlayer pueden)
+    """
+
+    def __init__(self, player):
+        self.player = player
+        self._connection = None
+        self._process = None
+        self._request_id = 0
+        self._pending = False
+        self._last_request = None
+        self._restarts = 0
+        self.failed = False
+
+    @property
+    def busy(self):
+        """True mientras hay una petición sin respuesta"""
+        return self._pending
+
+    def submit(self, game):
+        """Pide una decisión para la posición actual (sustituye a la petición pendiente)"""
+        if self.failed:
+            return
+        self._request_id += 1
+        self._last_request = (self._request_id, game.state_hash, game.clone())
+        self._send(self._last_request)
+        self._pending = True
+
+    def _send(self, request):
+        if self._process is not None and not self._process.is_alive():
+            self._connection.close()  # Terminó por inactividad
+            self._process = None
+        if self._process is None:
+            self._connection, child = _PROCESS_CONTEXT.Pipe()
+            self._process = _PROCESS_CONTEXT.Process(
+                target=_process_worker, args=(child, self.player),
+                name="ProcessSearchWorker", daemon=True)
+            self._process.start()
+            child.close()
+        self._connection.send(request)
+
+    def cancel(self):
+        """Descarta la petición pendiente (su respuesta se ignorará)"""
+        self._request_id += 1
+        self._pending = False
+
+    def poll(self):
+        """
+        Recoge la decisión si ya está lista.
+
+        Returns:
+            tuple: (state_hash, Placement o None) o None si aún no hay resultado
+        """
+        if self._connection is None:
+            return None
+        result = None
+        try:
+            while self._connection.poll():
+                request_id, key, placement = self._connection.recv()
+                if request_id is None:
+                    debugger.error(f"Error en el proceso de búsqueda:\n{placement}")
+                elif request_id == self._request_id:
+                    result = (key, placement)
+                    self._pending = False
+                    self._restarts = 0
+        except EOFError:
+            pass
+        if self._pending and not self._process.is_alive():
+            # Terminó por inactividad justo al enviarle la petición, o falló
+            exit_code = self._process.exitcode
+            if self._restarts >= PROCESS_MAX_RESTARTS:
+                debugger.error(f"El proceso de búsqueda ha terminado {self._restarts + 1} veces "
+                               f"seguidas (código {exit_code}): se desactiva")
+                self.close()
+                self.failed = True
+                return result
+            self._restarts += 1
+            debugger.warning(f"El proceso de búsqueda terminó (código {exit_code}); se vuelve a crear")
+            self._send(self._last_request)
+        return result
+
+    def close(self):
+        """Termina el proceso"""
+        if self._process is None:
+            return
+        try:
+            self._connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._connection.close()
+        self._process = None
+        self._connection = None
+        self._pending = False
@@ -0,0 +1,29 @@
+# state.py
+# Instantáneas inmutables del estado de una partida
+
+from collections import namedtuple
+
+# Registro compacto con todo lo necesario para continuar una partida desde un punto:
+# tablero (colores, máscaras y alturas), pieza activa, cola, generador, hold,
+# combo, back-to-back, piezas fijadas y la última fijación, estado de bloqueo y de
+# la animación de líneas, el estado de la simulación por frames (contadores de DAS,
+# gravedad y bloqueo) y el reloj.
+# mode_state guarda lo propio de cada modo (por ejemplo el temporizador de los modos
+# con tiempo); None si el modo no tiene estado adicional.
+GameSnapshot = namedtuple(
+    "GameSnapshot",
+    [
+        "field", "field_rows", "column_tops", "occupied_cells", "field_hash",
+        "piece_type", "piece_x", "piece_y", "rotation",
+        "next_pieces", "randomizer_state",
+        "hold_piece_type", "hold_used",
+        "score", "level", "lines_cleared", "game_speed", "soft_drop_score",
+        "combo_count", "last_clear_time", "back_to_back",
+        "last_move_was_rotation", "last_rotation_kick",
+        "on_ground", "lock_timer",
+        "lines_to_clear", "animating_clear", "clear_animation_time",
+        "level_up_event", "game_over", "game_won",
+        "pieces_placed", "last_lock",
+        "tick_state", "clock_state", "mode_state",
+    ]
+)
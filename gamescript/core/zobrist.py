@@ -0,0 +1,91 @@
+# zobrist.py
+# Claves de Zobrist para resumir el estado de una partida en un entero de 64 bits
+
+from .randomizer import PieceRNG, NUM_PIECES
+
+# Semilla fija: los hashes deben coincidir entre ejecuciones y procesos para poder
+# usarlos en conjuntos de datos y al verificar repeticiones
+ZOBRIST_SEED = 0x5A0B12157E7215
+
+# Margen para indexar posiciones de la pieza fuera del tablero (matrices con
+# columnas vacías y piezas asomando por encima)
+POSITION_MARGIN = 8
+
+_keys_by_size = {}
+
+
+class ZobristKeys:
+    """
+    Tablas de claves aleatorias para un tamaño de tablero.
+
+    El hash del tablero es el XOR de las claves de las celdas ocupadas; por filas,
+    row_key(y, bits) da la contribución de una fila completa y se memoriza, así que
+    mover filas al eliminar líneas cuesta una consulta por fila.
+
+    Args:
+        width (int): Ancho del tablero
+        height (int): Alto del tablero
+        queue_length (int): Número de piezas de la cola que entran en el hash
+    """
+
+    def __init__(self, width, height, queue_length):
+        rng = PieceRNG(ZOBRIST_SEED)
+        self.width = width
+        self.height = height
+        self.cells = tuple(tuple(rng.next_u64() for _ in range(width)) for _ in range(height))
+        self.piece = tuple(rng.next_u64() for _ in range(NUM_PIECES))
+        self.rotation = tuple(rng.next_u64() for _ in range(4))
+        self.x = tuple(rng.next_u64() for _ in range(width + 2 * POSITION_MARGIN))
+        self.y = tuple(rng.next_u64() for _ in range(height + 2 * POSITION_MARGIN))
+        self.hold = tuple(rng.next_u64() for _ in range(NUM_PIECES))
+        self.hold_used = rng.next_u64()
+        self.queue = tuple(
+            tuple(rng.next_u64() for _ in range(NUM_PIECES)) for _ in range(queue_length)
+        )
+        self._rows = tuple({0: 0} for _ in range(height))
+
+    def row_key(self, y, bits):
+        """Contribución al hash de la fila y con las columnas ocupadas en bits"""
+        row_keys = self._rows[y]
+        key = row_keys.get(bits)
+        if key is None:
+            key = 0
+            cells = self.cells[y]
+            remaining = bits
+            while remaining:
+                lowest = remaining & -remaining
+                key ^= cells[lowest.bit_length() - 1]
+                remaining ^= lowest
+            row_keys[bits] = key
+        return key
+
+    def field_hash(self, field):
+        """Hash completo de un tablero de colores (lista de filas)"""
+        key = 0
+        for cells, row in zip(self.cells, field):
+            for cell_key, cell in zip(cells, row):
+                if cell != 0:
+                    key ^= cell_key
+        return key
+
+    def rows_hash(self, field_rows):
+        """Hash completo de un tablero en forma de máscaras de bits por fila"""
+        key = 0
+        for y, bits in enumerate(field_rows):
+            if bits:
+                key ^= self.row_key(y, bits)
+        return key
+
+
+def get_zobrist_keys(width, height, queue_length):
+    """
+    Devuelve las tablas de claves para un tamaño de tablero (se crean una sola vez).
+
+    Returns:
+        ZobristKeys: Tablas compartidas por todas las partidas de ese tamaño
+    """
+    size = (width, height, queue_length)
+    keys = _keys_by_size.get(size)
+    if keys is None:
+        keys = _keys_by_size[size] = ZobristKeys(width, height, queue_length)
+    return keys
@@ -7,6 +7,10 @@ from .options import options_menu
 from .tetris_logic import TetrisGame, SHAPES, COLORS
 from .visual_effects import ParticleSystem, ScreenShake, ComboAnimator, DynamicBackground
 from .graphics import TetrisRenderer, draw_text, draw_pause_menu, BLACK, WHITE, GRAY
+from .core.actions import ACTION_HOLD, ACTION_LOCK
+from .core.search import SearchWorker, ProcessSearchWorker, BeamSearchPlayer, HINT_TIME_BUDGET
+from .core.openings import OpeningBook
+from .core.replay import ReplayWriter, REPLAY_DIR
 from .debug_utils import debugger
 
 def pause_menu(screen, settings, current_song="tetris.mp3"):
@@ -112,11 +116,10 @@ def start_game(screen, settings, game_mode='classic'):
     
     # Initialize game with selected mode
     debugger.debug(f"Iniciando juego en modo: {game_mode}")
-    game = create_game_mode(game_mode)
+    game = create_game_mode(game_mode, rotation_system=settings.get('rotation_system'))
     
-    # Iniciar temporizador en modos de tiempo
-    if game_mode in ['time_attack', 'ultra'] and hasattr(game, 'start'):
-        game.start()
+    # Iniciar temporizador en modos de tiempo (en el resto de modos no hace nada)
+    game.start()
         
     renderer = TetrisRenderer(screen)
     
@@ -131,6 +134,7 @@ def start_game(screen, settings, game_mode='classic'):
     last_move_down_time = time.time()
     running = True
     paused = False
+    gameover_sound_played = False
 
     # DAS/ARR control variables
     das_left_pressed = das_right_pressed = das_down_pressed = False
@@ -138,8 +142,73 @@ def start_game(screen, settings, game_mode='classic'):
     DAS_DELAY = 170
     ARR_INTERVAL = 40
     
+    # Libro de aperturas: en la primera bolsa el bot y la pista juegan la apertura
+    # precalculada para el orden de piezas visible, sin buscar
+    opening_book = OpeningBook.load() if settings.get('opening_book', True) else None
+    if opening_book is not None and game.ai_player is not None and game.ai_player.opening_book is None:
+        game.ai_player.opening_book = opening_book
+    
+    # Modo IA: el bot decide en un hilo aparte para que el dibujo no espere a la búsqueda;
+    # entre colocaciones se dejan AI_MOVE_DELAY segundos para poder seguir las jugadas
+    ai_worker = SearchWorker(game.ai_player) if game.ai_player is not None else None
+    AI_MOVE_DELAY = 0.2
+    last_ai_move_time = time.time()
+    
+    # Pista (opcional): la mejor colocación para la pieza actual se busca en otro proceso
+    # y se dibuja como la pieza fantasma. Si la pieza cambia antes de que termine, la
+    # búsqueda se cancela y se pide otra, así que el bucle nunca espera por ella
+    hint_worker = None
+    if settings.get('show_hint') and game.ai_player is None:
+        hint_worker = ProcessSearchWorker(BeamSearchPlayer(time_budget=HINT_TIME_BUDGET,
+                                                           opening_book=opening_book))
+    hint_key = None
+    hint_placement = None
+    
+    # Exportación de posiciones para entrenar modelos (opcional): cada pieza fijada se
+    # añade a ficheros .npy en disco, sin acumular la partida en memoria
+    recorder = None
+    if settings.get('record_training_data'):
+        try:
+            from .core.dataset import DatasetWriter, PlacementRecorder
+            recorder = PlacementRecorder(DatasetWriter(
+                settings.get('training_data_dir', 'training_data'),
+                game.width, game.height, game.preview_count))
+        except (ImportError, OSError, ValueError) as e:
+            debugger.warning(f"No se pueden guardar las posiciones para entrenamiento: {e}")
+    
+    # Teclas configuradas: se leen una vez y de nuevo al salir del menú de opciones
+    from .controls import is_key_action, load_keybindings
+    keybindings = load_keybindings()
+    
+    # Repetición (opcional): semilla, reglas y botones mantenidos en cada frame. Un hilo
+    # aparte comprime y escribe el fichero, así que grabar no frena el bucle
+    replay = None
+    replay_taps = 0  # Pulsaciones del frame actual (por si se sueltan antes de leer el teclado)
+    if settings.get('record_replays'):
+        from .controls import get_held_inputs, get_event_inputs
+        try:
+            replay = ReplayWriter.create(settings.get('replay_dir', REPLAY_DIR), game,
+                                         game_mode or 'classic', DAS_DELAY, ARR_INTERVAL)
+        except (OSError, ValueError) as e:
+            debugger.warning(f"No se puede grabar la repetición: {e}")
+    
+    def close_session():
+        """Cierra lo que tenga abierto la partida; se llama en todas las salidas de start_game"""
+        nonlocal recorder, replay, hint_worker
+        if recorder is not None:
+            recorder.close()
+            recorder = None
+        if replay is not None:
+            replay.close()
+            replay = None
+        if hint_worker is not None:
+            hint_worker.close()
+            hint_worker = None
+    
     while running:
         current_time = time.time()
+        if recorder is not None:
+            recorder.observe(game)
         screen.fill((0, 0, 0))  # Limpiar pantalla
         
         # Importar el módulo de controles unificado
@@ -149,10 +218,17 @@ def start_game(screen, settings, game_mode='classic'):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if replay is not None:
+                replay_taps |= get_event_inputs(event, keybindings)
             
             # Si el juego ha terminado, usar controles de game over
             if game.game_over:
                 continue  # Los controles de game over se manejan en la sección de game over
+            
+            # En el modo IA la pieza la mueve el jugador automático: solo se atiende la pausa
+            if game.ai_player is not None:
+                if not (event.type == pygame.KEYDOWN and is_key_action(event, "pause", keybindings)):
+                    continue
                 
             # Manejar los controles del juego usando el módulo de controles unificado
             if not paused:
@@ -169,15 +245,13 @@ def start_game(screen, settings, game_mode='classic'):
                     paused = True
                     
                     # Pausar temporizador en modos de tiempo
-                    if hasattr(game, 'pause'):
-                        game.pause()
+                    game.pause()
                         
                     choice = pause_menu(screen, settings, settings.get('current_song', 'tetris.mp3'))
                     paused = False
                     
                     # Reanudar temporizador al salir de la pausa
-                    if hasattr(game, 'unpause'):
-                        game.unpause()
+                    game.unpause()
                     
                     # Procesar la elección del menú de pausa
                     if choice == "reanudar_juego":
@@ -185,7 +259,7 @@ def start_game(screen, settings, game_mode='classic'):
                     elif choice == "reintentar":
                         # Restart game with the same game mode
                         game_mode = None
-                        if hasattr(game, 'mode_name'):
+                        if game.mode_name:
                             mode_name = game.mode_name.lower()
                             if mode_name == "clásico":
                                 game_mode = "classic"
@@ -195,6 +269,9 @@ def start_game(screen, settings, game_mode='classic'):
                                 game_mode = "marathon"
                             elif mode_name == "ultra":
                                 game_mode = "ultra"
+                            elif mode_name == "ia":
+                                game_mode = "ai"
+                        close_session()
                         start_game(screen, settings, game_mode=game_mode)
                         return
                     elif choice == "cambiar_música":
@@ -222,6 +299,7 @@ def start_game(screen, settings, game_mode='classic'):
                         
                         options_menu(screen, settings)
                         screen = pygame.display.set_mode(settings['resolution'])
+                        keybindings = load_keybindings()
                         
                         # Actualizar volumen a través del audio_manager
                         audio_manager.set_master_volume(settings['volume_general'])
@@ -234,13 +312,13 @@ def start_game(screen, settings, game_mode='classic'):
                         # Detener la música actual y reproducir la del menú
                         audio_manager.stop_music()
                         audio_manager.play_music("menu", -1)
+                        close_session()
                         return
                     elif choice == "quit":
                         running = False
                 
                 # Handle key controls
-                from .controls import check_gamepad_action, is_key_action, load_keybindings
-                keybindings = load_keybindings()
+                from .controls import check_gamepad_action
                 
                 # Check for counter-clockwise rotation
                 if ((event.type == pygame.KEYDOWN and is_key_action(event, "rotate_inv", keybindings)) or 
@@ -248,6 +326,12 @@ def start_game(screen, settings, game_mode='classic'):
                     if game.rotate_inv():
                         sfx_rotate.play()
                 
+                # Rotación de 180° (solo tiene efecto en sistemas que la permiten, como SRS+)
+                if (event.type == pygame.KEYDOWN and is_key_action(event, "rotate_180", keybindings)
+                        and not paused and not game.game_over):
+                    if game.rotate_180():
+                        sfx_rotate.play()
+                
                 # Handle hard drop (keyboard or gamepad)
                 hard_drop_key = event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE
                 hard_drop_gamepad = check_gamepad_action("hard_drop")
@@ -329,7 +413,63 @@ def start_game(screen, settings, game_mode='classic'):
                     # Reset move down timer after hard drop
                     last_move_down_time = current_time
         
-        if not paused and not game.game_over:
+        # Repetición: botones de este frame (en el modo IA solo se graban las piezas)
+        if replay is not None and not game.game_over:
+            inputs = 0
+            if game.ai_player is None and not paused:
+                inputs = get_held_inputs(keybindings) | replay_taps
+            replay.record(game, inputs)
+            replay_taps = 0
+        
+        # Modo IA: cada AI_MOVE_DELAY segundos se pide una jugada al bot y, cuando llega,
+        # la pieza se mueve a su sitio y cae al momento. Mientras el bot piensa se
+        # detiene la gravedad para que la jugada siga siendo válida
+        ai_thinking = False
+        if ai_worker is not None and not paused and not game.game_over and not game.animating_clear:
+            if not ai_worker.busy and current_time - last_ai_move_time >= AI_MOVE_DELAY:
+                ai_worker.submit(game)
+            decision = ai_worker.poll()
+            if decision is not None:
+                decision_hash, placement = decision
+                if decision_hash != game.state_hash:
+                    # La partida cambió mientras se pensaba: pedir otra jugada
+                    ai_worker.submit(game)
+                elif placement is None:
+                    game.game_over = True
+                else:
+                    # Movimientos hasta la posición final; el hard drop se hace aquí como en
+                    # el control manual para conservar animaciones y sonidos. Los spins
+                    # acaban en ACTION_LOCK: se fijan sin caer para que cuenten
+                    game.apply_many(placement.path[:-1])
+                    if placement.path[0] == ACTION_HOLD:
+                        sfx_hold.play()
+                    if not game.game_over:
+                        if placement.path[-1] != ACTION_LOCK:
+                            game.drop()
+                            sfx_hard_drop.play()
+                        line_clear_result = game.fix_piece()
+                        
+                        if line_clear_result:
+                            if line_clear_result.get("is_tspin", False):
+                                sfx_tspin.play()
+                                screen_shake.start_shake(6, 25)
+                            if line_clear_result.get("is_perfect", False):
+                                audio_manager.play_sound("perfect")
+                                combo_animator.add_perfect_animation()
+                            if line_clear_result["is_tetris"]:
+                                sfx_tetris.play()
+                                combo_animator.add_tetris_animation()
+                            elif line_clear_result["count"] == 3:
+                                sfx_triple.play()
+                            elif line_clear_result["count"] == 2:
+                                sfx_double.play()
+                            elif line_clear_result["count"] == 1:
+                                sfx_single.play()
+                    last_ai_move_time = current_time
+                    last_move_down_time = current_time
+            ai_thinking = ai_worker.busy
+        
+        if not paused and not game.game_over and not ai_thinking:
             # Auto-drop based on game speed
             move_delay = game.game_speed
             if current_time - last_move_down_time > move_delay / 1000.0:
@@ -400,13 +540,11 @@ def start_game(screen, settings, game_mode='classic'):
         now = pygame.time.get_ticks()
         # Line clearing animation
         if game.animating_clear:
-            # Optimized animation duration calculation
-            base_duration = 250
-            min_duration = 100 if game.level >= 10 else 150
-            anim_duration = max(min_duration, base_duration - (game.level * 15))
+            # Duración de la animación (la misma que usa la simulación por frames)
+            anim_duration = game.line_clear_delay_ms()
             
-            # Track elapsed time with safety check
-            current_time = now
+            # Track elapsed time with safety check (same time base as the game clock)
+            current_time = game.clock.get_ticks()
             elapsed = current_time - game.clear_animation_time
             
             # Fix invalid animation time
@@ -501,8 +639,13 @@ def start_game(screen, settings, game_mode='classic'):
         # Actualizar el fondo dinámico según el nivel
         dynamic_background.update(game.level)
         
+        # Advertencias de tiempo de los modos con temporizador (sonido y animación)
+        for time_threshold in game.pop_time_warnings():
+            audio_manager.play_sound("time")
+            combo_animator.add_time_warning(time_threshold)
+        
         # Check if there was a level up and clear particles if needed
-        if hasattr(game, 'level_up_event') and game.level_up_event:
+        if game.level_up_event:
             debugger.debug(f"Level up detected! Clearing particles...")
             particle_system.particles = []  # Clear all particles on level up
             
@@ -525,8 +668,30 @@ def start_game(screen, settings, game_mode='classic'):
         # Actualizar sistema de partículas
         particle_system.update()
         
+        # Pista: se pide otra en cuanto cambia la pieza, el tablero, el hold o la cola
+        if hint_worker is not None and not paused and not game.game_over and not game.animating_clear:
+            key = (game.field_hash, game.piece_type, game.hold_piece_type, game.hold_used,
+                   tuple(game.next_pieces))
+            if key != hint_key:
+                hint_key = key
+                # Si la posición está en el libro la pista sale ya en este fotograma
+                hint_placement = opening_book.lookup(game) if opening_book is not None else None
+                if hint_placement is None:
+                    hint_worker.submit(game)  # Cancela la búsqueda anterior
+                else:
+                    hint_worker.cancel()
+            decision = hint_worker.poll()
+            if decision is not None:
+                hint_placement = decision[1]
+            if hint_worker.failed:
+                # El proceso de la pista falla una y otra vez (el error ya está en el registro)
+                hint_worker = None
+                hint_placement = None
+        
         # Dibujar el juego con efecto de temblor si está activo
         renderer.draw_field(game, offset_x=shake_offset_x, offset_y=shake_offset_y)
+        if hint_placement is not None and hint_key is not None and not game.animating_clear:
+            renderer.draw_hint(game, hint_placement, offset_x=shake_offset_x, offset_y=shake_offset_y)
         renderer.draw_current_piece(game, offset_x=shake_offset_x, offset_y=shake_offset_y)
         
         # Dibujar partículas
@@ -551,20 +716,24 @@ def start_game(screen, settings, game_mode='classic'):
             # Play Game Over sound once using audio_manager
             from .audio_manager import audio_manager
             
-            if not hasattr(game, "gameover_sound_played"):
+            if not gameover_sound_played:
                 # Check if it's a marathon completion (victory) to play clear.wav instead of gameover.wav
-                if hasattr(game, 'game_won') and game.game_won:
+                if game.game_won:
                     audio_manager.play_sound("clear")
                 else:
                     audio_manager.play_sound("gameover")
-                game.gameover_sound_played = True
+                gameover_sound_played = True
+                if recorder is not None:
+                    recorder.finish(game)
+                if replay is not None:
+                    replay.finish(game)
                 
                 # Handle high score
                 from .highscore import is_high_score, add_high_score, get_player_name, show_high_scores
                 
                 # Get game mode for high scores
                 game_mode = None
-                if hasattr(game, 'mode_name'):
+                if game.mode_name:
                     game_mode = game.mode_name.lower()
                     if game_mode == "clásico":
                         game_mode = "classic"
@@ -575,7 +744,8 @@ def start_game(screen, settings, game_mode='classic'):
                     elif game_mode == "ultra":
                         game_mode = "ultra"
                 
-                if is_high_score(game.score, game_mode):
+                # Las partidas del modo IA no entran en las puntuaciones
+                if game.ai_player is None and is_high_score(game.score, game_mode):
                     player_name = get_player_name(screen, game.score)
                     if player_name:
                         add_high_score(player_name, game.score, game.level, game.lines_cleared, game_mode)
@@ -589,6 +759,7 @@ def start_game(screen, settings, game_mode='classic'):
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    close_session()
                     return "quit"
                     
                 action = handle_game_over_controls(event)
@@ -599,12 +770,13 @@ def start_game(screen, settings, game_mode='classic'):
                     
                     audio_manager.stop_music()
                     audio_manager.play_music("menu", -1)
+                    close_session()
                     return
                     
                 elif action == "reiniciar":
                     # Restart game with the same game mode
                     game_mode = None
-                    if hasattr(game, 'mode_name'):
+                    if game.mode_name:
                         mode_name = game.mode_name.lower()
                         if mode_name == "clásico":
                             game_mode = "classic"
@@ -614,6 +786,9 @@ def start_game(screen, settings, game_mode='classic'):
                             game_mode = "marathon"
                         elif mode_name == "ultra":
                             game_mode = "ultra"
+                        elif mode_name == "ia":
+                            game_mode = "ai"
+                    close_session()
                     start_game(screen, settings, game_mode=game_mode)
                     return
                     
@@ -623,7 +798,7 @@ def start_game(screen, settings, game_mode='classic'):
                     
                     # Get game mode
                     game_mode = None
-                    if hasattr(game, 'mode_name'):
+                    if game.mode_name:
                         game_mode = game.mode_name
                         
                     show_high_scores(screen, settings, None, game_mode)
@@ -634,6 +809,8 @@ def start_game(screen, settings, game_mode='classic'):
         pygame.display.flip()
         clock.tick(60)
 
+    close_session()
+    
     # Detener la música al salir
     from .audio_manager import audio_manager
     audio_manager.stop_music()
\ No newline at end of file
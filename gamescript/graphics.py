@@ -3,7 +3,8 @@
 
 import pygame
 import time
-from .tetris_logic import SHAPES, COLORS
+from .core.actions import ACTION_HOLD
+from .tetris_logic import COLORS, PIECE_GEOMETRY
 from .sprite_manager import sprite_manager
 from .debug_utils import debugger
 
@@ -170,23 +171,48 @@ class TetrisRenderer:
         if game.game_over:
             return
             
-        # Obtener la forma de la pieza activa
-        shape = game.get_piece_shape()
+        # Obtener las celdas precalculadas de la pieza activa
+        cells = PIECE_GEOMETRY[game.piece_type][game.rotation].cells
         piece_type = game.get_piece_type()
         
         # Dibujar la posición fantasma (donde caería la pieza)
         ghost_y = game.get_ghost_position()
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] != 0:
-                    self.draw_block(game.piece_x + col, ghost_y + row, piece_type, alpha=80, offset_x=offset_x, offset_y=offset_y)  # Semi-transparente
+        for col, row, _ in cells:
+            self.draw_block(game.piece_x + col, ghost_y + row, piece_type, alpha=80, offset_x=offset_x, offset_y=offset_y)  # Semi-transparente
         
         # Dibujar la pieza activa
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] != 0:
-                    self.draw_block(game.piece_x + col, game.piece_y + row, piece_type, offset_x=offset_x, offset_y=offset_y)
+        for col, row, _ in cells:
+            self.draw_block(game.piece_x + col, game.piece_y + row, piece_type, offset_x=offset_x, offset_y=offset_y)
     
+    def draw_hint(self, game, placement, offset_x=0, offset_y=0):
+        """
+        Dibuja la colocación recomendada como la pieza fantasma, con un borde para
+        distinguirla.
+
+        Args:
+            game: Partida en juego
+            placement (Placement): Colocación sugerida; si su camino empieza por
+                ACTION_HOLD se dibuja la pieza que saldría del hold
+        """
+        if game.game_over or placement is None:
+            return
+
+        piece_type = game.piece_type
+        if placement.path and placement.path[0] == ACTION_HOLD:
+            piece_type = game.hold_piece_type if game.hold_piece_type is not None else game.next_pieces[0]
+        cells = PIECE_GEOMETRY[piece_type][placement.rotation].cells
+
+        for col, row, _ in cells:
+            x = placement.x + col
+            y = placement.y + row
+            if y < 0:
+                continue  # Fuera del campo visible
+            self.draw_block(x, y, piece_type + 1, alpha=50, offset_x=offset_x, offset_y=offset_y)
+            rect = pygame.Rect(self.offset_x + x * self.block_size + offset_x,
+                               self.offset_y + y * self.block_size + offset_y,
+                               self.block_size, self.block_size)
+            pygame.draw.rect(self.screen, WHITE, rect, 2)
+
     def draw_next_piece(self, game, x, y, box_width, box_height, piece_index=0):
         """Dibuja la próxima pieza centrada en una caja específica"""
         # Si es la primera pieza (piece_index=0), usar next_piece_type
@@ -194,88 +220,38 @@ class TetrisRenderer:
         if piece_index == 0:
             if game.next_piece_type is None:
                 return
-            shape = game.next_piece_shape
-            piece_type = game.next_piece_type + 1
+            next_type = game.next_piece_type
         else:
             # Para piezas adicionales, buscarlas en next_pieces si está disponible
-            if not hasattr(game, 'next_pieces') or len(game.next_pieces) <= piece_index:
+            if len(game.next_pieces) <= piece_index:
                 return
-            piece_type = game.next_pieces[piece_index] + 1
-            shape = SHAPES[game.next_pieces[piece_index]][0]  # Primera rotación
+            next_type = game.next_pieces[piece_index]
 
-        # Calcular las dimensiones reales ocupadas por la pieza
-        occupied_rows = []
-        occupied_cols = []
-        
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] != 0:
-                    occupied_rows.append(row)
-                    occupied_cols.append(col)
-        
-        if not occupied_rows:
-            return
-            
-        min_row = min(occupied_rows)
-        max_row = max(occupied_rows)
-        min_col = min(occupied_cols)
-        max_col = max(occupied_cols)
-        
-        piece_width = (max_col - min_col + 1) * self.block_size
-        piece_height = (max_row - min_row + 1) * self.block_size
-        
-        # Calcular offset para centrar la pieza en la caja
-        center_offset_x = (box_width - piece_width) // 2
-        center_offset_y = (box_height - piece_height) // 2
-        
-        # Dibujar la pieza centrada
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] != 0:
-                    screen_x = x + center_offset_x + (col - min_col) * self.block_size
-                    screen_y = y + center_offset_y + (row - min_row) * self.block_size
-                    self.screen.blit(self.block_sprites[piece_type], (screen_x, screen_y))
+        self._draw_centered_piece(next_type, x, y, box_width, box_height)
     
     def draw_hold_piece(self, game, x, y, box_width, box_height):
         """Dibuja la pieza en hold centrada en una caja específica"""
         if game.hold_piece_type is None:
             return
             
-        shape = SHAPES[game.hold_piece_type][0]
-        piece_type = game.hold_piece_type + 1
-
-        # Calcular las dimensiones reales ocupadas por la pieza
-        occupied_rows = []
-        occupied_cols = []
-        
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] != 0:
-                    occupied_rows.append(row)
-                    occupied_cols.append(col)
-        
-        if not occupied_rows:
-            return
-            
-        min_row = min(occupied_rows)
-        max_row = max(occupied_rows)
-        min_col = min(occupied_cols)
-        max_col = max(occupied_cols)
+        self._draw_centered_piece(game.hold_piece_type, x, y, box_width, box_height)
+    
+    def _draw_centered_piece(self, piece_index, x, y, box_width, box_height):
+        """Dibuja una pieza en su rotación inicial centrada en una caja (Next y Hold)"""
+        geometry = PIECE_GEOMETRY[piece_index][0]  # Primera rotación
+        sprite = self.block_sprites[piece_index + 1]
         
-        piece_width = (max_col - min_col + 1) * self.block_size
-        piece_height = (max_row - min_row + 1) * self.block_size
+        # La caja envolvente ya viene precalculada en la geometría de la pieza
+        piece_width = geometry.width * self.block_size
+        piece_height = geometry.height * self.block_size
         
         # Calcular offset para centrar la pieza en la caja
-        center_offset_x = (box_width - piece_width) // 2
-        center_offset_y = (box_height - piece_height) // 2
+        origin_x = x + (box_width - piece_width) // 2 - geometry.min_col * self.block_size
+        origin_y = y + (box_height - piece_height) // 2 - geometry.min_row * self.block_size
         
         # Dibujar la pieza centrada
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] != 0:
-                    screen_x = x + center_offset_x + (col - min_col) * self.block_size
-                    screen_y = y + center_offset_y + (row - min_row) * self.block_size
-                    self.screen.blit(self.block_sprites[piece_type], (screen_x, screen_y))
+        for col, row, _ in geometry.cells:
+            self.screen.blit(sprite, (origin_x + col * self.block_size, origin_y + row * self.block_size))
     
     def draw_game_info(self, game, next_piece_x, next_piece_y):
         """Dibuja la información del juego (puntuación, nivel, etc)"""
@@ -311,7 +287,7 @@ class TetrisRenderer:
         # Solo el marco para next1 se mantiene visible
         
         # Dibujar Next2 y Next3 si están disponibles
-        if hasattr(game, 'next_pieces') and len(game.next_pieces) >= 3:
+        if len(game.next_pieces) >= 3:
             # Mover next2 y next3 15 pixels más a la izquierda
             next2_x = next_piece_x + (box_width - next_box_width) // 2 - 15
             next2_y = next_piece_y + frame_height - 20 # Eliminar espaciado vertical
@@ -376,17 +352,17 @@ class TetrisRenderer:
         draw_info_text(f"Líneas: {game.lines_cleared}", info_y + 80)
         
         # Mostrar información específica del modo de juego
-        if hasattr(game, 'mode_name'):
+        if game.mode_name:
             # Mostrar el nombre del modo
             mode_y = info_y + 110
             draw_info_text(f"Modo: {game.mode_name}", mode_y, (255, 255, 100))
             
             # Mostrar información específica del modo
-            if hasattr(game, 'get_time_str') and game.mode_name in ["Contrarreloj", "Ultra"]:
+            if game.mode_name in ["Contrarreloj", "Ultra"]:
                 # Mostrar tiempo restante para modos de tiempo
                 time_str = game.get_time_str()
                 draw_info_text(f"Tiempo: {time_str}", mode_y + 30, (255, 200, 100))
-            elif hasattr(game, 'get_progress_str') and game.mode_name == "Maratón":
+            elif game.mode_name == "Maratón":
                 # Mostrar progreso para modo maratón
                 progress_str = game.get_progress_str()
                 draw_info_text(progress_str, mode_y + 30, (100, 255, 100))
@@ -409,7 +385,7 @@ class TetrisRenderer:
         text_color = WHITE
         
         # Si es un modo específico con mensaje personalizado
-        if hasattr(game, 'game_over_reason'):
+        if game.game_over_reason:
             game_over_text = game.game_over_reason
             
             # Color especial para mensaje de victoria
@@ -418,7 +394,7 @@ class TetrisRenderer:
         
         # Mostrar modo de juego si está disponible
         mode_text = ""
-        if hasattr(game, 'mode_name'):
+        if game.mode_name:
             mode_text = f"Modo: {game.mode_name}"
             draw_text(screen, mode_text, 36, (255, 255, 100), center_x, center_y - 90)
         
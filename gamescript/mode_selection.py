@@ -26,7 +26,8 @@ def draw_mode_description(surface, mode_name, center_y):
         "Clásico": "Modo tradicional de Tetris. ¡Aguanta lo máximo posible!",
         "Contrarreloj": "Consigue la mayor puntuación en 3 minutos.",
         "Maratón": "Completa 150 líneas con dificultad creciente.",
-        "Ultra": "Logra la mayor puntuación posible en 2 minutos."
+        "Ultra": "Logra la mayor puntuación posible en 2 minutos.",
+        "IA": "La máquina juega sola. Pulsa Escape para pausar."
     }
     
     if mode_name in descriptions:
@@ -48,7 +49,7 @@ def mode_selection(screen, settings):
         settings (dict): Configuración del juego
         
     Returns:
-        str: El modo de juego seleccionado ('classic', 'time_attack', 'marathon', 'ultra' o None si se cancela)
+        str: El modo de juego seleccionado ('classic', 'time_attack', 'marathon', 'ultra', 'ai' o None si se cancela)
     """
     clock = pygame.time.Clock()
     
@@ -73,7 +74,7 @@ def mode_selection(screen, settings):
     sfx_back = DummySound("back")
 
     # Opciones de modo de juego
-    mode_items = ["Clásico", "Contrarreloj", "Maratón", "Ultra", "Volver"]
+    mode_items = ["Clásico", "Contrarreloj", "Maratón", "Ultra", "IA", "Volver"]
     selected = 0
     
     # Mapeo de nombres visuales a identificadores de código
@@ -82,6 +83,7 @@ def mode_selection(screen, settings):
         "Contrarreloj": "time_attack",
         "Maratón": "marathon",
         "Ultra": "ultra",
+        "IA": "ai",
         "Volver": None
     }
     
@@ -107,8 +109,8 @@ def mode_selection(screen, settings):
         draw_text(screen, "SELECCIONA MODO DE JUEGO", 56, (255, 255, 255), screen.get_width() // 2, title_y, "assets/fonts/tetrisfont.ttf")
         
         # Menú de modos
-        menu_start_y = 300
-        menu_spacing = 60
+        menu_start_y = 280
+        menu_spacing = 55
         
         for i, item in enumerate(mode_items):
             color = (255, 255, 255) if i == selected else (150, 150, 150)
@@ -27,7 +27,7 @@ def options_menu(screen, settings):
     sfx_enter.set_volume(sfx_vol)
     sfx_back.set_volume(sfx_vol)
 
-    options = ["Volumen General", "Volumen BGM", "Volumen SFX", "Mute", "Resolución", "Controles", "Volver"]
+    options = ["Volumen General", "Volumen BGM", "Volumen SFX", "Mute", "Pista", "Resolución", "Controles", "Volver"]
     selected = 0
 
     resolution_keys = list(resol.keys())
@@ -49,6 +49,8 @@ def options_menu(screen, settings):
                 label += f": {int(settings['volume_sfx'] * 100)}%"
             elif option == "Mute":
                 label += f": {'ON' if settings['mute'] else 'OFF'}"
+            elif option == "Pista":
+                label += f": {'ON' if settings.get('show_hint') else 'OFF'}"
             elif option == "Resolución":
                 label += f": {resolution_keys[current_res_index]}"
 
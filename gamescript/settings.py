@@ -15,5 +15,12 @@ def init_settings():
         'volume_general': 1.0,           # Volumen general por defecto 100%
         'volume_bgm': 0.75,              # Volumen música por defecto 75%
         'volume_sfx': 0.85,              # Volumen efectos por defecto 85%
-        'mute': False                    # Silenciar todo
+        'mute': False,                   # Silenciar todo
+        'rotation_system': None,         # Sistema de rotación ('srs', 'srs+', 'ars', 'nes'); None usa el del modo
+        'show_hint': False,              # Pista con la mejor colocación de la pieza actual
+        'record_training_data': False,   # Guardar las posiciones y jugadas para entrenar modelos (requiere numpy)
+        'training_data_dir': 'training_data',  # Directorio del conjunto de datos
+        'opening_book': True,             # Jugadas precalculadas de la primera bolsa para el bot y la pista
+        'record_replays': False,          # Grabar cada partida en un fichero de repetición
+        'replay_dir': 'replays'           # Directorio de las repeticiones
     }
@@ -0,0 +1,259 @@
+# tournament.py
+# Torneo de bots sin interfaz repartido entre todos los núcleos
+#
+# Uso: python -m gamescript.tournament --games 10000 --bot heuristic --bot beam
+# Solo usa el núcleo (gamescript.core), así que no carga pygame en los procesos.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+
+from .core.ai import DEFAULT_MS_PER_PIECE, HeuristicPlayer, play_headless
+from .core.clock import ManualClock
+from .core.modes import create_game_mode
+from .core.openings import OpeningBook
+from .core.search import BeamSearchPlayer
+
+# Bots disponibles: nombre -> función que recibe las opciones del torneo y crea el jugador
+BOTS = {
+    "heuristic": lambda options: HeuristicPlayer(),
+    "heuristic-nohold": lambda options: HeuristicPlayer(use_hold=False),
+    "beam": lambda options: BeamSearchPlayer(time_budget=options["time_budget"]),
+    "beam-book": lambda options: BeamSearchPlayer(time_budget=options["time_budget"],
+                                                  opening_book=OpeningBook.load()),
+}
+
+# Modos que terminan al agotarse el tiempo: con el reloj parado no acabarían nunca
+TIMED_MODES = ("time_attack", "ultra")
+
+# Jugadores ya creados en este proceso (se reutilizan entre partidas)
+_players = {}
+
+# Exportador de posiciones de este proceso (con --record; cada proceso escribe en su
+# propio subdirectorio)
+_recorder = None
+
+
+def _get_recorder(directory, game):
+    """Crea (una vez por proceso) el PlacementRecorder que escribe en directory/worker-PID"""
+    global _recorder
+    if _recorder is None:
+        # Import diferido: numpy solo hace falta al exportar
+        from .core.dataset import DatasetWriter, PlacementRecorder
+        writer = DatasetWriter(os.path.join(directory, f"worker-{os.getpid()}"),
+                               game.width, game.height, game.preview_count)
+        _recorder = PlacementRecorder(writer)
+    return _recorder
+
+
+def play_game(task):
+    """
+    Juega una partida del torneo (se ejecuta en los procesos del pool).
+
+    Args:
+        task (tuple): (índice, bot, semilla, opciones)
+
+    Returns:
+        dict: Resultado de la partida
+    """
+    index, bot, seed, options = task
+    player = _players.get(bot)
+    if player is None:
+        player = _players[bot] = BOTS[bot](options)
+
+    game = create_game_mode(options["mode"], clock=ManualClock(), seed=seed,
+                            rotation_system=options["rotation_system"])
+    game.start()
+    recorder = None
+    if options.get("record"):
+        recorder = _get_recorder(options["record"], game)
+    start = time.perf_counter()
+    pieces = play_headless(game, player, options["max_pieces"], options["ms_per_piece"], recorder)
+    elapsed = time.perf_counter() - start
+    return {
+        "game": index,
+        "bot": bot,
+        "seed": seed,
+        "mode": options["mode"],
+        "score": game.score,
+        "lines": game.lines_cleared,
+        "level": game.level,
+        "pieces": pieces,
+        # Fin por llegar arriba (no por completar la maratón ni por agotar el tiempo)
+        "topped_out": game.game_over and not game.game_won and not game.time_expired(),
+        "time": round(elapsed, 4),
+    }
+
+
+def summarize(results):
+    """
+    Estadísticas por bot de una lista de resultados.
+
+    Returns:
+        dict: bot -> estadísticas (partidas, puntuación media/mediana/desviación/mín/máx,
+            medias de líneas, nivel y piezas, y tiempo por pieza)
+    """
+    by_bot = {}
+    for result in results:
+        by_bot.setdefault(result["bot"], []).append(result)
+
+    summary = {}
+    for bot, games in by_bot.items():
+        scores = [game["score"] for game in games]
+        pieces = sum(game["pieces"] for game in games)
+        total_time = sum(game["time"] for game in games)
+        summary[bot] = {
+            "games": len(games),
+            "score_mean": statistics.mean(scores),
+            "score_median": statistics.median(scores),
+            "score_stdev": statistics.stdev(scores) if len(scores) > 1 else 0.0,
+            "score_min": min(scores),
+            "score_max": max(scores),
+            "lines_mean": statistics.mean(game["lines"] for game in games),
+            "level_mean": statistics.mean(game["level"] for game in games),
+            "pieces_mean": pieces / len(games),
+            "topped_out": sum(1 for game in games if game["topped_out"]),
+            "ms_per_piece": 1000 * total_time / pieces if pieces else 0.0,
+        }
+    return summary
+
+
+def print_summary(summary, out=sys.stdout):
+    """Muestra el resumen como tabla"""
+    header = f"{'bot':<18}{'partidas':>9}{'media':>12}{'mediana':>12}{'desv.':>11}" \
+             f"{'líneas':>9}{'nivel':>7}{'piezas':>9}{'pierde':>8}{'ms/pieza':>10}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for bot, stats in summary.items():
+        print(f"{bot:<18}{stats['games']:>9}{stats['score_mean']:>12.0f}"
+              f"{stats['score_median']:>12.0f}{stats['score_stdev']:>11.0f}"
+              f"{stats['lines_mean']:>9.1f}{stats['level_mean']:>7.1f}"
+              f"{stats['pieces_mean']:>9.1f}{stats['topped_out']:>8}"
+              f"{stats['ms_per_piece']:>10.3f}", file=out)
+
+
+def run_tournament(bots, games, mode="classic", seed=0, workers=None, max_pieces=500,
+                   ms_per_piece=DEFAULT_MS_PER_PIECE, rotation_system=None, time_budget=None,
+                   on_result=None, record=None):
+    """
+    Reparte las partidas entre un pool de procesos y recoge los resultados según terminan.
+
+    Cada bot juega las mismas semillas (seed, seed + 1, ...), así que las comparaciones
+    entre bots son por parejas.
+
+    Args:
+        bots (list): Nombres de bots de BOTS
+        games (int): Partidas por bot
+        mode (str): Modo de juego para create_game_mode
+        seed (int): Semilla de la primera partida
+        workers (int): Procesos del pool (por defecto, uno por núcleo)
+        max_pieces (int): Piezas por partida como máximo (None = hasta perder)
+        ms_per_piece (float): Milisegundos simulados por pieza (para los combos y los
+            modos con tiempo); 0 para el reloj, y no se admite en TIMED_MODES
+        rotation_system (str): Sistema de rotación (por defecto el del modo)
+        time_budget (float): Segundos por jugada del bot beam (None = sin límite)
+        on_result (callable): Se llama con cada resultado en cuanto llega
+        record (str): Directorio donde se exportan las decisiones de los bots
+            (ver core/dataset.py); None para no exportar
+
+    Returns:
+        list: Resultados de todas las partidas
+    """
+    for bot in bots:
+        if bot not in BOTS:
+            raise ValueError(f"Bot desconocido: {bot}. Disponibles: {', '.join(BOTS)}")
+    if mode in TIMED_MODES and not ms_per_piece:
+        raise ValueError(f"El modo {mode} necesita ms_per_piece > 0: con el reloj parado "
+                         "no se acaba el tiempo")
+    options = {
+        "mode": mode,
+        "max_pieces": max_pieces,
+        "ms_per_piece": ms_per_piece,
+        "rotation_system": rotation_system,
+        "time_budget": time_budget,
+        "record": record,
+    }
+    tasks = [
+        (index * len(bots) + bot_index, bot, seed + index, options)
+        for index in range(games)
+        for bot_index, bot in enumerate(bots)
+    ]
+    workers = workers or os.cpu_count() or 1
+    # Bloques pequeños para repartir bien la carga sin saturar la cola de resultados
+    chunksize = max(1, min(16, len(tasks) // (workers * 8)))
+
+    results = []
+    with Pool(workers) as pool:
+        for result in pool.imap_unordered(play_game, tasks, chunksize):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m gamescript.tournament",
+        description="Torneo de bots sin interfaz repartido entre todos los núcleos.")
+    parser.add_argument("--bot", action="append", choices=sorted(BOTS),
+                        help="Bot participante (se puede repetir; por defecto heuristic)")
+    parser.add_argument("--games", type=int, default=100, help="Partidas por bot")
+    parser.add_argument("--mode", default="classic",
+                        help="Modo de juego (classic, time_attack, marathon, ultra)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de la primera partida")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--max-pieces", type=int, default=500,
+                        help="Piezas por partida como máximo (0 = hasta perder)")
+    parser.add_argument("--ms-per-piece", type=float, default=DEFAULT_MS_PER_PIECE,
+                        help="Milisegundos simulados por pieza, para que caduquen los combos "
+                             "y corra el tiempo en los modos contrarreloj y ultra "
+                             f"(por defecto {DEFAULT_MS_PER_PIECE}; 0 para el reloj)")
+    parser.add_argument("--rotation-system", default=None, help="srs, srs+, ars o nes")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Milisegundos por jugada del bot beam (por defecto sin límite)")
+    parser.add_argument("--output", default=None,
+                        help="Fichero JSON Lines donde se escribe cada partida al terminar")
+    parser.add_argument("--record", default=None,
+                        help="Directorio donde se guardan las posiciones y jugadas de los bots "
+                             "para entrenar modelos (requiere numpy)")
+    args = parser.parse_args(argv)
+    if args.mode in TIMED_MODES and not args.ms_per_piece:
+        parser.error(f"el modo {args.mode} necesita --ms-per-piece mayor que 0")
+
+    bots = args.bot or ["heuristic"]
+    total = args.games * len(bots)
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    done = [0]
+    start = time.perf_counter()
+
+    def on_result(result):
+        done[0] += 1
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+        if done[0] % max(1, total // 100) == 0 or done[0] == total:
+            elapsed = time.perf_counter() - start
+            print(f"\r{done[0]}/{total} partidas ({done[0] / elapsed:.1f}/s)",
+                  end="", file=sys.stderr, flush=True)
+
+    try:
+        results = run_tournament(
+            bots, args.games, mode=args.mode, seed=args.seed, workers=args.workers,
+            max_pieces=args.max_pieces or None, ms_per_piece=args.ms_per_piece,
+            rotation_system=args.rotation_system,
+            time_budget=args.time_budget / 1000 if args.time_budget is not None else None,
+            on_result=on_result, record=args.record)
+    finally:
+        if output is not None:
+            output.close()
+    print(file=sys.stderr)
+    print_summary(summarize(results))
+    print(f"Tiempo total: {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# tuner.py
+# Ajuste de los pesos del evaluador con un algoritmo genético repartido entre todos los núcleos
+#
+# Uso: python -m gamescript.tuner --generations 50 --population 32 --checkpoint pesos.json
+# Con el mismo --checkpoint una ejecución interrumpida continúa donde se quedó.
+# Solo usa el núcleo (gamescript.core), así que no carga pygame en los procesos.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+
+from .core.ai import (
+    HeuristicPlayer, HeuristicWeights, DEFAULT_MS_PER_PIECE, DEFAULT_WEIGHTS, play_headless,
+)
+from .core.clock import ManualClock
+from .core.modes import create_game_mode
+
+TUNER_BACKENDS = ("core", "batch")
+TUNER_METRICS = ("lines", "score")
+
+# Desviación inicial de la mutación, relativa a la escala de cada peso
+MUTATION_SCALE = 0.3
+
+
+def evaluate_task(task):
+    """
+    Juega las partidas de un individuo (se ejecuta en los procesos del pool).
+
+    Args:
+        task (tuple): (índice, pesos, semillas, opciones)
+
+    Returns:
+        tuple: (índice, aptitud, partidas jugadas)
+    """
+    index, weights, seeds, options = task
+    weights = HeuristicWeights(*weights)
+    metric = options["metric"]
+
+    if options["backend"] == "batch":
+        # Import diferido: numpy solo hace falta con este motor
+        from .core.batch import BatchGame
+        values = []
+        for seed in seeds:
+            batch = BatchGame(options["batch_size"], seed=seed)
+            batch.run(weights, options["max_pieces"])
+            values.extend(getattr(batch, "lines_cleared" if metric == "lines" else "score").tolist())
+        return index, statistics.mean(values), len(values)
+
+    player = HeuristicPlayer(weights, use_hold=options["use_hold"])
+    values = []
+    for seed in seeds:
+        game = create_game_mode(options["mode"], clock=ManualClock(), seed=seed)
+        game.start()
+        play_headless(game, player, options["max_pieces"], options["ms_per_piece"])
+        values.append(game.lines_cleared if metric == "lines" else game.score)
+    return index, statistics.mean(values), len(values)
+
+
+class GeneticTuner:
+    """
+    Algoritmo genético sobre vectores de HeuristicWeights.
+
+    Cada generación todos los individuos juegan las mismas semillas (así las
+    diferencias de aptitud se deben a los pesos y no a la suerte con las piezas).
+    Los elite mejores pasan tal cual; el resto nace de dos padres elegidos por
+    torneo, con cruce por mezcla y mutación gaussiana que se reduce poco a poco.
+
+    Todo el estado (población, historial, estado del generador aleatorio y
+    opciones de las partidas) cabe en un dict JSON: save()/load() permiten
+    continuar una ejecución.
+
+    Args:
+        population (int): Individuos por generación
+        elite (int): Mejores que pasan sin cambios a la siguiente generación
+        seed (int): Semilla del algoritmo y de las partidas
+        initial (HeuristicWeights): Pesos de partida (por defecto DEFAULT_WEIGHTS)
+        options (dict): Opciones con las que se evalúa a los individuos (métrica,
+            modo, partidas...); las aptitudes del historial solo son comparables
+            con las mismas opciones
+    """
+
+    def __init__(self, population=32, elite=4, seed=0, initial=None, options=None):
+        self.population_size = max(2, population)
+        self.elite = max(1, min(elite, self.population_size - 1))
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.generation = 0
+        self.mutation = MUTATION_SCALE
+        self.history = []
+        self.options = dict(options) if options is not None else {}
+        initial = list(initial if initial is not None else DEFAULT_WEIGHTS)
+        # Escala de cada peso para la mutación (los pesos van de décimas a unidades)
+        self.scale = [max(abs(value), 0.1) for value in initial]
+        self.population = [initial] + [self._mutate(initial, 1.0)
+                                       for _ in range(self.population_size - 1)]
+
+    def seeds(self, games):
+        """Semillas de las partidas de la generación actual (las mismas para todos)"""
+        base = self.seed * 1000003 + self.generation * games
+        return [base + index for index in range(games)]
+
+    def tell(self, fitness):
+        """
+        Registra la aptitud de la población actual y crea la siguiente generación.
+
+        Args:
+            fitness (list): Aptitud de cada individuo (más alta es mejor)
+        """
+        ranked = sorted(range(len(self.population)), key=lambda i: fitness[i], reverse=True)
+        best = ranked[0]
+        self.history.append({
+            "generation": self.generation,
+            "best": fitness[best],
+            "mean": statistics.mean(fitness),
+            "weights": self.population[best],
+        })
+
+        next_population = [self.population[i] for i in ranked[:self.elite]]
+        while len(next_population) < self.population_size:
+            first = self._tournament(fitness)
+            second = self._tournament(fitness)
+            mix = self.rng.random()
+            child = [a * mix + b * (1 - mix) for a, b in zip(first, second)]
+            next_population.append(self._mutate(child, self.mutation))
+        self.population = next_population
+        self.generation += 1
+        self.mutation = max(0.05, self.mutation * 0.95)
+
+    def best(self):
+        """Mejores pesos vistos hasta ahora (HeuristicWeights) y su aptitud"""
+        if not self.history:
+            return HeuristicWeights(*self.population[0]), None
+        entry = max(self.history, key=lambda item: item["best"])
+        return HeuristicWeights(*entry["weights"]), entry["best"]
+
+    def _tournament(self, fitness, size=3):
+        contenders = [self.rng.randrange(len(self.population)) for _ in range(size)]
+        return self.population[max(contenders, key=lambda i: fitness[i])]
+
+    def _mutate(self, weights, amount):
+        return [round(value + self.rng.gauss(0, amount * scale), 5)
+                for value, scale in zip(weights, self.scale)]
+
+    def state(self):
+        """Estado completo como dict serializable en JSON"""
+        version, internal, gauss = self.rng.getstate()
+        return {
+            "population_size": self.population_size,
+            "elite": self.elite,
+            "seed": self.seed,
+            "generation": self.generation,
+            "mutation": self.mutation,
+            "scale": self.scale,
+            "population": self.population,
+            "history": self.history,
+            "options": self.options,
+            "rng": [version, list(internal), gauss],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstruye un GeneticTuner a partir de state()"""
+        tuner = cls(state["population_size"], state["elite"], state["seed"])
+        tuner.generation = state["generation"]
+        tuner.mutation = state["mutation"]
+        tuner.scale = state["scale"]
+        tuner.population = state["population"]
+        tuner.history = state["history"]
+        tuner.options = state["options"]
+        version, internal, gauss = state["rng"]
+        tuner.rng.setstate((version, tuple(internal), gauss))
+        return tuner
+
+    def save(self, path):
+        """Guarda el estado en path (se escribe aparte y se renombra, para no dejarlo a medias)"""
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.state(), file)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as file:
+            return cls.from_state(json.load(file))
+
+
+def run_generation(tuner, pool, games, options):
+    """
+    Evalúa la población actual en el pool y avanza una generación.
+
+    Returns:
+        list: Aptitud de cada individuo
+    """
+    seeds = tuner.seeds(games)
+    tasks = [(index, weights, seeds, options) for index, weights in enumerate(tuner.population)]
+    fitness = [0.0] * len(tasks)
+    for index, value, _ in pool.imap_unordered(evaluate_task, tasks):
+        fitness[index] = value
+    tuner.tell(fitness)
+    return fitness
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m gamescript.tuner",
+        description="Ajusta los pesos del evaluador con un algoritmo genético en paralelo.")
+    parser.add_argument("--generations", type=int, default=20, help="Generaciones a ejecutar")
+    parser.add_argument("--population", type=int, default=32, help="Individuos por generación")
+    parser.add_argument("--elite", type=int, default=4,
+                        help="Mejores que pasan sin cambios a la siguiente generación")
+    parser.add_argument("--games", type=int, default=8,
+                        help="Partidas por individuo y generación (las mismas semillas para todos)")
+    parser.add_argument("--max-pieces", type=int, default=500,
+                        help="Piezas por partida como máximo (0 = hasta perder)")
+    parser.add_argument("--metric", default="lines", choices=TUNER_METRICS,
+                        help="Qué se maximiza: líneas o puntuación media")
+    parser.add_argument("--backend", default="core", choices=TUNER_BACKENDS,
+                        help="core: TetrisGame con hold; batch: BatchGame con NumPy (sin hold)")
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="Partidas simultáneas por semilla con --backend batch")
+    parser.add_argument("--mode", default="classic", help="Modo de juego con --backend core")
+    parser.add_argument("--ms-per-piece", type=float, default=DEFAULT_MS_PER_PIECE,
+                        help="Milisegundos simulados por pieza con --backend core, para que "
+                             "caduquen los combos y corra el tiempo de los modos contrarreloj")
+    parser.add_argument("--no-hold", action="store_true", help="El jugador no usa hold")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del algoritmo y de las partidas")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--checkpoint", default="tuner_checkpoint.json",
+                        help="Fichero de estado; si existe se continúa desde él")
+    args = parser.parse_args(argv)
+
+    options = {
+        "backend": args.backend,
+        "metric": args.metric,
+        "mode": args.mode,
+        "games": args.games,
+        "max_pieces": args.max_pieces or None,
+        "ms_per_piece": args.ms_per_piece,
+        "use_hold": not args.no_hold,
+        "batch_size": args.batch_size,
+    }
+    tuner = GeneticTuner(args.population, args.elite, args.seed, options=options)
+    if os.path.exists(args.checkpoint):
+        # Con otras opciones o con otro algoritmo la ejecución no sería la interrumpida
+        saved = GeneticTuner.load(args.checkpoint)
+        expected = dict(options, population=tuner.population_size, elite=tuner.elite,
+                        seed=tuner.seed)
+        found = dict(saved.options, population=saved.population_size, elite=saved.elite,
+                     seed=saved.seed)
+        changed = [key for key in expected if found.get(key) != expected[key]]
+        if changed:
+            parser.error(f"{args.checkpoint} se creó con otras opciones ("
+                         + ", ".join(f"{key}={found.get(key)!r}" for key in changed)
+                         + "); repite las mismas o usa otro --checkpoint")
+        tuner = saved
+        print(f"Continuando desde {args.checkpoint} (generación {tuner.generation})")
+
+    workers = args.workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        while tuner.generation < args.generations:
+            generation_start = time.perf_counter()
+            fitness = run_generation(tuner, pool, options["games"], options)
+            tuner.save(args.checkpoint)
+            print(f"Generación {tuner.generation}/{args.generations}: mejor {max(fitness):.1f}, "
+                  f"media {statistics.mean(fitness):.1f} "
+                  f"({time.perf_counter() - generation_start:.1f} s)", file=sys.stderr, flush=True)
+
+    weights, fitness = tuner.best()
+    print(f"Mejores pesos ({args.metric} = {fitness}):")
+    print(json.dumps(weights._asdict(), indent=2))
+    print(f"Tiempo total: {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
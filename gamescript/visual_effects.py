@@ -8,7 +8,7 @@ import time
 import traceback
 import os
 from .debug_utils import debugger
-from .tetris_logic import SHAPES, COLORS
+from .tetris_logic import SHAPES, COLORS, PIECE_GEOMETRY
 
 # Define special font path
 special_font_name = "assets/fonts/tetrisfont.ttf"
@@ -693,82 +693,62 @@ class TetrominoVisualizer:
         if shape_type is None:
             return
             
-        shape = SHAPES[shape_type][rotation]
         piece_type = shape_type + 1  # Los índices de color comienzan desde 1 (0 es vacío)
         
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] != 0:
-                    screen_x = x + col * block_size
-                    screen_y = y + row * block_size
+        for col, row, _ in PIECE_GEOMETRY[shape_type][rotation].cells:
+            screen_x = x + col * block_size
+            screen_y = y + row * block_size
+            
+            if self.block_sprites:
+                # Usar sprites si están disponibles
+                sprite = self.block_sprites[piece_type]
+                
+                # Aplicar transparencia si es necesario
+                if ghost or alpha < 255:
+                    sprite_copy = sprite.copy()
+                    sprite_copy.set_alpha(80 if ghost else alpha)
+                    screen.blit(sprite_copy, (screen_x, screen_y))
+                else:
+                    screen.blit(sprite, (screen_x, screen_y))
+            else:
+                # Fallback a rectángulos coloreados si no hay sprites
+                color = COLORS[piece_type]
+                if ghost:
+                    color = (*color[:3], 80)
+                elif alpha < 255:
+                    color = (*color[:3], alpha)
                     
-                    if self.block_sprites:
-                        # Usar sprites si están disponibles
-                        sprite = self.block_sprites[piece_type]
-                        
-                        # Aplicar transparencia si es necesario
-                        if ghost or alpha < 255:
-                            sprite_copy = sprite.copy()
-                            sprite_copy.set_alpha(80 if ghost else alpha)
-                            screen.blit(sprite_copy, (screen_x, screen_y))
-                        else:
-                            screen.blit(sprite, (screen_x, screen_y))
-                    else:
-                        # Fallback a rectángulos coloreados si no hay sprites
-                        color = COLORS[piece_type]
-                        if ghost:
-                            color = (*color[:3], 80)
-                        elif alpha < 255:
-                            color = (*color[:3], alpha)
-                            
-                        pygame.draw.rect(
-                            screen, 
-                            color,
-                            (screen_x, screen_y, block_size, block_size)
-                        )
-                        
-                        # Borde interno para dar profundidad
-                        pygame.draw.rect(
-                            screen,
-                            (min(color[0] + 40, 255), min(color[1] + 40, 255), min(color[2] + 40, 255)),
-                            (screen_x, screen_y, block_size, block_size),
-                            1
-                        )
+                pygame.draw.rect(
+                    screen, 
+                    color,
+                    (screen_x, screen_y, block_size, block_size)
+                )
+                
+                # Borde interno para dar profundidad
+                pygame.draw.rect(
+                    screen,
+                    (min(color[0] + 40, 255), min(color[1] + 40, 255), min(color[2] + 40, 255)),
+                    (screen_x, screen_y, block_size, block_size),
+                    1
+                )
 
     def draw_centered_shape(self, screen, shape_type, x, y, box_size=4, block_size=30):
         """Dibuja un tetromino centrado en una caja de tamaño específico (para Next y Hold)"""
         if shape_type is None:
             return
             
-        shape = SHAPES[shape_type][0]  # Primera rotación
-        
-        # Calcular dimensiones reales de la pieza
-        rows = len(shape)
-        cols = len(shape[0])
-        min_x, min_y = cols, rows
-        max_x, max_y = 0, 0
-        
-        for row in range(rows):
-            for col in range(cols):
-                if shape[row][col] != 0:
-                    min_x = min(min_x, col)
-                    max_x = max(max_x, col)
-                    min_y = min(min_y, row)
-                    max_y = max(max_y, row)
-        
-        width = max_x - min_x + 1
-        height = max_y - min_y + 1
+        geometry = PIECE_GEOMETRY[shape_type][0]  # Primera rotación
         
         # Centrar la pieza dentro del recuadro
-        offset_x = (box_size - width) // 2
-        offset_y = (box_size - height) // 2
+        offset_x = (box_size - geometry.width) // 2
+        offset_y = (box_size - geometry.height) // 2
         
         self.draw_shape(
             screen,
             shape_type,
             0,  # Primera rotación
-            x - min_x * block_size + offset_x * block_size,
-            y - min_y * block_size + offset_y * block_size,
+            x - geometry.min_col * block_size + offset_x * block_size,
+            y - geometry.min_row * block_size + offset_y * block_size,
             block_size
         )
 
@@ -1,4 +1,5 @@
 import pygame
+import multiprocessing
 import sys
 import time
 from gamescript.menu import main_menu
@@ -99,4 +100,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # En el ejecutable congelado los procesos de la pista arrancan este mismo programa;
+    # freeze_support() hace que ejecuten su tarea en lugar de abrir otra partida
+    multiprocessing.freeze_support()
     main()
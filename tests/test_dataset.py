@@ -0,0 +1,43 @@
+# test_dataset.py
+# Pruebas del conjunto de datos de entrenamiento (requiere numpy)
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from gamescript.core import HeuristicPlayer, ManualClock, create_game_mode, play_headless
+from gamescript.core.dataset import DatasetReader, DatasetWriter, PlacementRecorder
+
+
+def _record(directory, seed, pieces, chunk_size=64):
+    recorder = PlacementRecorder(DatasetWriter(directory, chunk_size=chunk_size))
+    game = create_game_mode("classic", clock=ManualClock(), seed=seed)
+    game.start()
+    placed = play_headless(game, HeuristicPlayer(), pieces, recorder=recorder)
+    recorder.close()
+    return placed, game.score
+
+
+def test_reopen_appends(tmp_path):
+    """Abrir de nuevo el conjunto sigue escribiendo detrás, con episodios nuevos"""
+    directory = str(tmp_path / "datos")
+    first, first_score = _record(directory, seed=1, pieces=100)
+    second, second_score = _record(directory, seed=2, pieces=37)
+
+    reader = DatasetReader(directory)
+    assert len(reader) == first + second
+    rows = reader[:]
+    assert (rows["episode"] == 0).sum() == first
+    assert (rows["episode"] == 1).sum() == second
+    assert rows["reward"][rows["episode"] == 0].sum() == pytest.approx(first_score)
+    assert rows["reward"][rows["episode"] == 1].sum() == pytest.approx(second_score)
+    # Cada episodio empieza con el tablero vacío
+    assert not rows["rows"][0].any() and not rows["rows"][first].any()
+
+
+def test_reopen_rejects_other_dimensions(tmp_path):
+    """Un conjunto no se puede ampliar con otro tamaño de tablero"""
+    directory = str(tmp_path / "datos")
+    DatasetWriter(directory).close()
+    with pytest.raises(ValueError):
+        DatasetWriter(directory, width=8)
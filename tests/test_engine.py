@@ -0,0 +1,111 @@
+# test_engine.py
+# Pruebas del motor: motores de tablero equivalentes, hash de Zobrist e instantáneas
+
+import random
+
+from gamescript.core import (
+    ACTION_HARD_DROP, HeuristicPlayer, ManualClock, TetrisGame, create_game_mode,
+    generate_placements, play_headless,
+)
+
+
+def _steps(game, pieces, seed):
+    """Coloca piezas al azar entre las alcanzables y se detiene (yield) tras cada una"""
+    rng = random.Random(seed)
+    for _ in range(pieces):
+        if game.game_over:
+            return
+        placements = generate_placements(game)
+        if not placements:
+            return
+        game.apply_many(rng.choice(placements).path)
+        yield
+
+
+def test_bitboard_matches_reference_engine():
+    """Los dos motores de tablero dan la misma partida con las mismas jugadas"""
+    player = HeuristicPlayer()
+    for seed in range(3):
+        bitboard = TetrisGame(seed=seed, field_engine="bitboard", clock=ManualClock())
+        reference = TetrisGame(seed=seed, field_engine="reference", clock=ManualClock())
+        for _ in range(150):
+            if bitboard.game_over:
+                break
+            placement = player.choose(bitboard)
+            bitboard.apply_many(placement.path)
+            reference.apply_many(placement.path)
+            assert reference.field == bitboard.field
+            assert reference.column_tops == bitboard.column_tops
+            assert (reference.score, reference.lines_cleared, reference.piece_type) == \
+                (bitboard.score, bitboard.lines_cleared, bitboard.piece_type)
+            assert reference.state_hash == bitboard.state_hash
+        assert reference.game_over == bitboard.game_over
+
+
+def test_zobrist_incremental_matches_recomputed():
+    """El hash del tablero mantenido al fijar y eliminar líneas coincide con el calculado de cero"""
+    for engine in ("bitboard", "reference"):
+        game = TetrisGame(seed=7, field_engine=engine, clock=ManualClock())
+        for _ in _steps(game, 200, seed=1):
+            assert game.field_hash == game.zobrist.field_hash(game.field)
+            if game.use_bitboard:
+                assert game.field_hash == game.zobrist.rows_hash(game.field_rows)
+
+
+def test_snapshot_restore_round_trip():
+    """restore() deja la partida igual que al capturarla, generador de piezas incluido"""
+    game = TetrisGame(seed=3, clock=ManualClock())
+    for _ in _steps(game, 30, seed=2):
+        pass
+    snapshot = game.snapshot()
+    copy = game.clone()
+    for _ in _steps(game, 40, seed=3):
+        pass
+    game.restore(snapshot)
+    assert game.snapshot() == snapshot
+    assert game.state_hash == copy.state_hash
+    # Desde el mismo punto las mismas jugadas dan lo mismo
+    for _ in zip(_steps(game, 40, seed=4), _steps(copy, 40, seed=4)):
+        assert game.field == copy.field
+        assert (game.score, game.piece_type, tuple(game.next_pieces)) == \
+            (copy.score, copy.piece_type, tuple(copy.next_pieces))
+
+
+def test_snapshot_restores_lock_bookkeeping():
+    """restore() devuelve el contador de piezas y la última fijación al punto capturado"""
+    game = TetrisGame(seed=5, clock=ManualClock())
+    for _ in _steps(game, 10, seed=6):
+        pass
+    snapshot = game.snapshot()
+    placed, last_lock = game.pieces_placed, game.last_lock
+    game.drop()
+    game.fix_piece()
+    assert game.pieces_placed == placed + 1
+    game.restore(snapshot)
+    assert (game.pieces_placed, game.last_lock) == (placed, last_lock)
+
+
+def test_snapshot_keeps_mode_timer():
+    """Las instantáneas de los modos con tiempo incluyen el temporizador"""
+    game = create_game_mode("ultra", clock=ManualClock(), seed=1)
+    game.start()
+    play_headless(game, HeuristicPlayer(), 20, ms_per_piece=500)
+    snapshot = game.snapshot()
+    remaining = game.remaining_time
+    play_headless(game, HeuristicPlayer(), 400, ms_per_piece=500)
+    assert game.game_over and game.remaining_time == 0
+    game.restore(snapshot)
+    assert game.remaining_time == remaining
+    assert not game.game_over
+    assert game.time_warnings_played == set()
+
+
+def test_hard_drop_after_restore_matches_clone():
+    """Una copia y la partida restaurada responden igual a la misma acción"""
+    game = TetrisGame(seed=11, clock=ManualClock())
+    snapshot = game.snapshot()
+    copy = game.clone()
+    game.apply_many([ACTION_HARD_DROP])
+    game.restore(snapshot)
+    assert game.apply_many([ACTION_HARD_DROP]) == copy.apply_many([ACTION_HARD_DROP])
+    assert game.field == copy.field
@@ -0,0 +1,112 @@
+# test_movegen.py
+# Pruebas del generador de jugadas: todo lo alcanzable aparece y cada camino lleva a su sitio
+
+import random
+from collections import deque
+
+import pytest
+
+from gamescript.core import (
+    ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_ROTATE_CCW, ACTION_ROTATE_180,
+    ACTION_SONIC_DROP, EVENT_TSPIN, PIECE_GEOMETRY, TSPIN_NONE, ManualClock, TetrisGame,
+    clear_placement_cache, generate_placements,
+)
+
+TRANSLATIONS = (ACTION_LEFT, ACTION_RIGHT, ACTION_SONIC_DROP)
+
+
+def _random_game(seed, rotation_system):
+    """Partida con las filas de abajo llenas al azar (sin líneas completas)"""
+    rng = random.Random(seed)
+    game = TetrisGame(seed=seed, rotation_system=rotation_system, clock=ManualClock())
+    for y in range(game.height - rng.randrange(2, 10), game.height):
+        for x in range(game.width):
+            if rng.random() < 0.6:
+                game.field[y][x] = 1
+                game.field_rows[y] |= 1 << x
+                game.occupied_cells += 1
+        if game.field_rows[y] == game.full_row_mask:
+            game.field[y][0] = 0
+            game.field_rows[y] &= ~1
+            game.occupied_cells -= 1
+    game._rebuild_column_tops()
+    game.field_hash = game.zobrist.rows_hash(game.field_rows)
+    game.field_version += 1
+    return game
+
+
+def _cells(piece_type, x, y, rotation):
+    """Celdas que ocupa la pieza (así las rotaciones con la misma forma son iguales)"""
+    return frozenset((x + col, y + row) for col, row, _ in PIECE_GEOMETRY[piece_type][rotation].cells)
+
+
+def _brute_force(game):
+    """
+    Posiciones de reposo alcanzables moviendo copias de la partida acción a acción.
+
+    Returns:
+        tuple: (celdas de todas las posiciones, celdas de las alcanzadas con un desplazamiento)
+    """
+    actions = TRANSLATIONS + (ACTION_ROTATE_CW, ACTION_ROTATE_CCW)
+    if game.rotation_system.allows_180:
+        actions += (ACTION_ROTATE_180,)
+    start = (game.piece_x, game.piece_y, game.rotation)
+    seen = {start: game}
+    queue = deque([start])
+    resting = set()
+    by_translation = set()
+    while queue:
+        current = seen[queue.popleft()]
+        for action in actions:
+            moved = current.clone()
+            moved.apply_many([action])
+            state = (moved.piece_x, moved.piece_y, moved.rotation)
+            if not moved.is_valid_position(y=moved.piece_y + 1):
+                cells = _cells(moved.piece_type, *state)
+                resting.add(cells)
+                if action in TRANSLATIONS and state != (current.piece_x, current.piece_y, current.rotation):
+                    by_translation.add(cells)
+            if state not in seen:
+                seen[state] = moved
+                queue.append(state)
+    if not game.is_valid_position(y=game.piece_y + 1):
+        resting.add(_cells(game.piece_type, *start))
+        by_translation.add(_cells(game.piece_type, *start))
+    return resting, by_translation
+
+
+@pytest.mark.parametrize("rotation_system", ["srs", "srs+", "ars"])
+def test_placements_match_brute_force(rotation_system):
+    """Cada posición de reposo alcanzable aparece, y solo esas"""
+    for seed in range(6):
+        game = _random_game(seed, rotation_system)
+        for piece_type in range(7):
+            game.piece_type = piece_type
+            game.rotation = 0
+            game.piece_x = game.spawn_columns[piece_type]
+            game.piece_y = 0
+            if not game.is_valid_position():
+                continue
+            clear_placement_cache()
+            placements = generate_placements(game)
+            resting, by_translation = _brute_force(game)
+            found = {_cells(piece_type, p.x, p.y, p.rotation) for p in placements}
+            assert found == resting
+            # La variante sin spin de la T está siempre que se llegue sin girar al final
+            plain = {_cells(piece_type, p.x, p.y, p.rotation)
+                     for p in placements if p.spin == TSPIN_NONE}
+            assert by_translation <= plain
+
+
+def test_paths_lead_to_their_placement():
+    """Al aplicar el camino la pieza se fija donde dice la colocación y con su spin"""
+    for seed in range(20):
+        game = _random_game(seed, "srs")
+        for placement in generate_placements(game):
+            copy = game.clone()
+            events = copy.apply_many(placement.path)
+            piece_type, x, y, rotation, _, spin = copy.last_lock
+            assert (piece_type, x, y, rotation) == \
+                (game.piece_type, placement.x, placement.y, placement.rotation)
+            assert spin == placement.spin
+            assert any(kind == EVENT_TSPIN for _, kind, _ in events) == (spin != TSPIN_NONE)
@@ -0,0 +1,45 @@
+# test_replay.py
+# Pruebas de las repeticiones: grabar una partida y reconstruirla pieza a pieza
+
+from gamescript.core import HeuristicPlayer, ManualClock, create_game_mode
+from gamescript.core.replay import Replay, ReplayWriter
+
+
+def test_replay_round_trip(tmp_path):
+    """La repetición guarda cada pieza fijada y reconstruye el mismo tablero"""
+    path = str(tmp_path / "partida.replay")
+    game = create_game_mode("classic", clock=ManualClock(), seed=5)
+    game.start()
+    writer = ReplayWriter(path, game, "classic")
+    player = HeuristicPlayer()
+    for frame in range(60):
+        # A veces se fijan dos piezas entre dos frames
+        for _ in range(2 if frame % 3 == 0 else 1):
+            game.apply_many(player.choose(game).path)
+        writer.record(game, 0)
+    writer.finish(game)
+    writer.close()
+
+    replay = Replay.load(path)
+    assert (replay.seed, replay.mode) == (5, "classic")
+    assert len(replay.locks()) == game.pieces_placed
+    assert replay.result == (game.score, game.lines_cleared, game.level)
+    rebuilt = None
+    for _, rebuilt in replay.positions():
+        pass
+    assert rebuilt.field == game.field
+    assert rebuilt.lines_cleared == game.lines_cleared
+    assert (rebuilt.piece_type, rebuilt.hold_piece_type, tuple(rebuilt.next_pieces)) == \
+        (game.piece_type, game.hold_piece_type, tuple(game.next_pieces))
+
+
+def test_clone_is_not_recorded(tmp_path):
+    """Las copias de una partida grabada (las de la búsqueda) no añaden piezas a la repetición"""
+    game = create_game_mode("classic", clock=ManualClock(), seed=2)
+    game.start()
+    writer = ReplayWriter(str(tmp_path / "partida.replay"), game, "classic")
+    copy = game.clone()
+    copy.apply_many(HeuristicPlayer().choose(copy).path)
+    assert copy.lock_history is None
+    assert game.lock_history == []
+    writer.close()